@@ -0,0 +1,4 @@
+# Django가 시작될 때 Celery 앱도 로드되어 @shared_task가 이 앱을 사용하도록 한다
+from .celery import app as celery_app
+
+__all__ = ("celery_app",)
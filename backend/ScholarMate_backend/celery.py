@@ -0,0 +1,14 @@
+# ScholarMate_backend/celery.py
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ScholarMate_backend.settings")
+
+app = Celery("ScholarMate_backend")
+
+# settings.py의 CELERY_* 설정을 사용
+app.config_from_object("django.conf:settings", namespace="CELERY")
+
+# 각 앱의 tasks.py를 자동으로 등록
+app.autodiscover_tasks()
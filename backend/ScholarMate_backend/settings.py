@@ -6,6 +6,7 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 from corsheaders.defaults import default_headers  # ✅ CORS 기본 헤더 확장용
+from celery.schedules import crontab
 
 # .env 로드
 load_dotenv()
@@ -223,5 +224,54 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Asia/Seoul"
+CELERY_BEAT_SCHEDULE = {
+    # 매일 새벽 4시, 프로필이 있는 모든 사용자의 추천을 코호트 단위로 미리 계산
+    "precompute-recommendations": {
+        "task": "scholarships.tasks.precompute_recommendations",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    # 요청 경로에서 생긴 단건 장학금 변경(찜 목록에서 추가된 장학금의 지역 처리)을 10분마다 한 번의 카탈로그 버전 증가로 반영
+    "flush-catalog-changes": {
+        "task": "scholarships.tasks.flush_catalog_changes",
+        "schedule": crontab(minute="*/10"),
+    },
+}
+
+# 사용자별 추천 결과 캐시 유지 시간(초). 프로필 변경/카탈로그 버전 변경 시에는 그 전에 무효화됩니다.
+RECOMMENDATION_CACHE_TIMEOUT = int(os.environ.get("RECOMMENDATION_CACHE_TIMEOUT", 60 * 60 * 6))
+# 카탈로그 버전(원본은 DB)의 Redis 읽기 캐시 유지 시간(초)
+RECOMMENDATION_CATALOG_VERSION_CACHE_SECONDS = int(os.environ.get("RECOMMENDATION_CATALOG_VERSION_CACHE_SECONDS", 30))
+# 특성 벡터와 후보군이 같은 사용자들이 공유하는 GPT 랭킹 캐시 (scholarships/ranking_cache.py): 유지 시간(초), 프로세스 내 LRU 항목 수
+RECOMMENDATION_RANKING_CACHE_TIMEOUT = int(os.environ.get("RECOMMENDATION_RANKING_CACHE_TIMEOUT", 60 * 60 * 6))
+RECOMMENDATION_RANKING_CACHE_SIZE = int(os.environ.get("RECOMMENDATION_RANKING_CACHE_SIZE", 1024))
+
+# ===== LLM 클라이언트 (scholarships/llm.py) =====
+# "fake"면 네트워크 없이 결정적인 가짜 응답을 씁니다 (테스트/벤치마크용)
+# "record"면 OpenAI 응답을 LLM_RECORD_DIR에 저장하고, "replay"면 저장된 응답만으로 (네트워크 없이) 재생합니다
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "openai")
+LLM_FAKE_LATENCY = float(os.environ.get("LLM_FAKE_LATENCY", 0))
+LLM_RECORD_DIR = os.environ.get("LLM_RECORD_DIR", os.path.join(BASE_DIR, "llm_records"))
+# 재생 지연(초). 비워 두면 녹화 당시 측정한 지연을 그대로 재현
+LLM_REPLAY_LATENCY = float(os.environ["LLM_REPLAY_LATENCY"]) if os.environ.get("LLM_REPLAY_LATENCY") else None
+# 호출 하나(재시도 포함)의 기본 데드라인(초). 추천 랭킹은 사용자가 기다리므로 더 짧게
+LLM_DEADLINE_SECONDS = float(os.environ.get("LLM_DEADLINE_SECONDS", 30))
+LLM_RANKING_DEADLINE_SECONDS = float(os.environ.get("LLM_RANKING_DEADLINE_SECONDS", 20))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+# 프로세스당 동시 호출 상한
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 8))
+# 연속 실패 N회면 M초 동안 호출하지 않고 바로 폴백
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("LLM_CIRCUIT_FAILURE_THRESHOLD", 5))
+LLM_CIRCUIT_RESET_SECONDS = float(os.environ.get("LLM_CIRCUIT_RESET_SECONDS", 30))
+
+# GPT를 호출하는 추천 API의 워커(프로세스)당 동시 처리 수. 넘으면 wait초까지만 기다린 뒤 503 + Retry-After
+LLM_VIEW_MAX_CONCURRENCY = int(os.environ.get("LLM_VIEW_MAX_CONCURRENCY", 4))
+LLM_VIEW_GATE_WAIT_SECONDS = float(os.environ.get("LLM_VIEW_GATE_WAIT_SECONDS", 0.5))
+LLM_VIEW_RETRY_AFTER_SECONDS = int(os.environ.get("LLM_VIEW_RETRY_AFTER_SECONDS", 5))
+# 같은 추천 계산의 동시 요청 합류(single-flight): 락 유지 시간, 다른 요청 결과를 기다리는 최대 시간(초)
+RECOMMENDATION_SINGLEFLIGHT_LOCK_SECONDS = int(os.environ.get("RECOMMENDATION_SINGLEFLIGHT_LOCK_SECONDS", 60))
+RECOMMENDATION_SINGLEFLIGHT_WAIT_SECONDS = float(os.environ.get("RECOMMENDATION_SINGLEFLIGHT_WAIT_SECONDS", 30))
+
+# GPT가 보완한 성적/소득 기준(신뢰도 medium)도 후보 제외에 사용할지 여부 (False면 규칙으로 확정된 값만 사용)
+ELIGIBILITY_TRUST_LLM = os.environ.get("ELIGIBILITY_TRUST_LLM", "True") == "True"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -0,0 +1,31 @@
+# gunicorn.conf.py
+# gunicorn은 작업 디렉터리의 이 파일을 기본 설정으로 읽습니다 (Dockerfile / docker-compose의 gunicorn 명령).
+import gc
+import os
+
+# 앱을 마스터에서 한 번 로드한 뒤 fork → 워커들이 모듈과 카탈로그 스냅샷을 copy-on-write로 공유
+preload_app = True
+
+# 스레드 워커: GPT 응답을 기다리는 요청이 워커 전체를 막지 않도록 워커마다 여러 요청을 받는다.
+# GPT를 호출하는 추천 요청은 그중 LLM_VIEW_MAX_CONCURRENCY개까지만 (scholarships/singleflight.py, 넘으면 503)
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+
+
+def when_ready(server):
+    """fork 전에 카탈로그 스냅샷을 만들어 두고, 상속되면 안 되는 DB 연결은 닫는다."""
+    try:
+        from django.db import connections
+        from scholarships.catalog import get_catalog_snapshot
+
+        snapshot = get_catalog_snapshot()
+        server.log.info("catalog snapshot v%s preloaded: %d scholarships", snapshot.version, len(snapshot.entries))
+        connections.close_all()
+    except Exception as e:
+        # DB가 아직 준비되지 않았으면 워커가 첫 요청 때 만든다
+        server.log.warning("catalog snapshot preload skipped: %s", e)
+
+    # 이후 GC가 공유 객체의 참조 정보를 건드려 페이지가 복사되는 것을 막는다
+    gc.freeze()
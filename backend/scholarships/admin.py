@@ -1,6 +1,10 @@
 # scholarships/admin.py
 from django.contrib import admin
-from .models import Scholarship # Scholarship 모델 임포트 확인
+from django.db import transaction
+from .models import Scholarship, SyncChangeSet, RegionResolution, Region, PrecomputedRecommendation # Scholarship 모델 임포트 확인
+from .recommendation_cache import bump_catalog_version
+from .region_cache import apply_residency_text_hash, cache_put, cache_evict, get_metrics, scholarship_ids_for_hashes
+from .region_tree import link_scholarship_regions
 
 class ScholarshipAdmin(admin.ModelAdmin):
     list_display = (
@@ -24,6 +28,11 @@ class ScholarshipAdmin(admin.ModelAdmin):
         'product_type', 
         'region', 
         'is_region_processed',
+        'eligibility_confidence',
+        'targets_multicultural',
+        'targets_single_parent',
+        'targets_multiple_children',
+        'targets_national_merit',
         'recommendation_required',
     )
     
@@ -51,6 +60,12 @@ class ScholarshipAdmin(admin.ModelAdmin):
         ('대상 조건', {
             'fields': ('university_type', 'academic_year_type', 'major_field','region','is_region_processed',) 
         }),
+        ('정형화된 자격 기준', {
+            'fields': ('min_gpa', 'gpa_scale', 'max_income_decile', 'academic_year_mask', 'eligibility_confidence')
+        }),
+        ('특정 자격 대상', {
+            'fields': ('targets_multicultural', 'targets_single_parent', 'targets_multiple_children', 'targets_national_merit')
+        }),
         ('상세 기준', {
             'fields': ('grade_criteria_details', 'income_criteria_details', 'specific_qualification_details', 'residency_requirement_details', 'eligibility_restrictions')
         }),
@@ -59,4 +74,131 @@ class ScholarshipAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        apply_residency_text_hash(obj)
+        super().save_model(request, obj, form, change)
+        # region 문자열을 고치면 지역 필터링용 연결(Scholarship.regions)도 다시 만든다
+        if 'region' in form.changed_data:
+            link_scholarship_regions({obj.id: obj.region})
+            bump_catalog_version()
+
 admin.site.register(Scholarship, ScholarshipAdmin)
+
+
+class RegionAdmin(admin.ModelAdmin):
+    list_display = ('code', 'full_name', 'depth')
+    list_filter = ('depth',)
+    search_fields = ('code', 'full_name')
+    readonly_fields = ('code', 'parent', 'depth')
+
+admin.site.register(Region, RegionAdmin)
+
+
+class SyncChangeSetAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'finished_at', 'is_complete', 'inserted_count', 'updated_count', 'unchanged_count', 'disappeared_count')
+    readonly_fields = ('started_at', 'finished_at', 'is_complete', 'inserted', 'updated', 'unchanged', 'disappeared')
+
+    @admin.display(description='신규')
+    def inserted_count(self, obj):
+        return len(obj.inserted)
+
+    @admin.display(description='변경')
+    def updated_count(self, obj):
+        return len(obj.updated)
+
+    @admin.display(description='변경 없음')
+    def unchanged_count(self, obj):
+        return len(obj.unchanged)
+
+    @admin.display(description='사라짐')
+    def disappeared_count(self, obj):
+        return len(obj.disappeared)
+
+admin.site.register(SyncChangeSet, SyncChangeSetAdmin)
+
+
+class RegionResolutionAdmin(admin.ModelAdmin):
+    list_display = ('normalized_text', 'region', 'source', 'is_override', 'hit_count', 'updated_at')
+    list_filter = ('source', 'is_override')
+    search_fields = ('normalized_text', 'region')
+    readonly_fields = ('text_hash', 'normalized_text', 'hit_count', 'created_at', 'updated_at')
+    actions = ('purge_entries', 'mark_as_override', 'unmark_override')
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context['title'] = f"지역 해석 캐시 (누적 지표: {get_metrics()})"
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def save_model(self, request, obj, form, change):
+        # 관리자가 지역 값을 고치면 수동 지정(override)으로 고정하고 Redis도 즉시 갱신
+        region_changed = change and 'region' in form.changed_data
+        if region_changed:
+            obj.source = RegionResolution.SOURCE_MANUAL
+            obj.is_override = True
+        super().save_model(request, obj, form, change)
+        cache_put(obj.text_hash, obj.region)
+        if region_changed:
+            count = self.relink_scholarships(obj)
+            self.message_user(request, f"이 원문을 쓰는 장학금 {count}개의 지역을 '{obj.region}'(으)로 다시 연결했습니다.")
+
+    def relink_scholarships(self, obj) -> int:
+        """이 원문으로 해석된 장학금의 region / regions를 새 값으로 바꾸고 추천 캐시를 무효화한다."""
+        ids = scholarship_ids_for_hashes([obj.text_hash])
+        if not ids:
+            return 0
+        with transaction.atomic():
+            Scholarship.objects.filter(id__in=ids).update(region=obj.region, is_region_processed=True)
+            link_scholarship_regions({pk: obj.region for pk in ids})
+        bump_catalog_version()
+        return len(ids)
+
+    def reset_scholarships(self, text_hashes) -> int:
+        """지운 캐시 항목으로 해석된 장학금을 미처리로 되돌린다 (process_scholarship_regions가 다시 해석)."""
+        ids = scholarship_ids_for_hashes(text_hashes)
+        if not ids:
+            return 0
+        Scholarship.objects.filter(id__in=ids).update(is_region_processed=False)
+        bump_catalog_version()
+        return len(ids)
+
+    def delete_model(self, request, obj):
+        cache_evict([obj.text_hash])
+        super().delete_model(request, obj)
+        self.reset_scholarships([obj.text_hash])
+
+    def delete_queryset(self, request, queryset):
+        text_hashes = list(queryset.values_list('text_hash', flat=True))
+        cache_evict(text_hashes)
+        super().delete_queryset(request, queryset)
+        self.reset_scholarships(text_hashes)
+
+    @admin.action(description='선택한 캐시 항목 삭제 (관리자 지정 항목 제외, 다음 처리 시 다시 해석)')
+    def purge_entries(self, request, queryset):
+        # 관리자가 고정한 값은 일괄 삭제로 잃지 않게 건너뛴다 (지우려면 고정 해제 후 삭제)
+        pinned = queryset.filter(is_override=True).count()
+        queryset = queryset.filter(is_override=False)
+        count = queryset.count()
+        self.delete_queryset(request, queryset)
+        message = f"{count}개 항목을 삭제했습니다."
+        if pinned:
+            message += f" 관리자 지정 항목 {pinned}개는 건너뛰었습니다."
+        self.message_user(request, message)
+
+    @admin.action(description='선택한 항목을 관리자 지정 값으로 고정')
+    def mark_as_override(self, request, queryset):
+        updated = queryset.update(is_override=True, source=RegionResolution.SOURCE_MANUAL)
+        self.message_user(request, f"{updated}개 항목을 고정했습니다.")
+
+    @admin.action(description='관리자 지정 해제')
+    def unmark_override(self, request, queryset):
+        updated = queryset.update(is_override=False)
+        self.message_user(request, f"{updated}개 항목의 고정을 해제했습니다.")
+
+admin.site.register(RegionResolution, RegionResolutionAdmin)
+
+
+class PrecomputedRecommendationAdmin(admin.ModelAdmin):
+    list_display = ('cohort_key', 'user_count', 'catalog_version', 'computed_at')
+    readonly_fields = ('cohort_key', 'user_count', 'catalog_version', 'scholarships', 'computed_at')
+
+admin.site.register(PrecomputedRecommendation, PrecomputedRecommendationAdmin)
@@ -0,0 +1,143 @@
+# scholarships/bulk.py
+"""
+청크 단위 bulk upsert 헬퍼.
+
+행마다 update_or_create(SELECT + INSERT/UPDATE)를 호출하는 대신, 행을 chunk_size만큼 모았다가
+bulk_create(update_conflicts=True)로 한 번에 씁니다. 버퍼는 한 청크 분량만 유지하므로
+전체 카탈로그 크기와 관계없이 메모리 사용량이 일정합니다.
+"""
+import time
+
+from django.db import connections, router, transaction
+
+
+class BulkUpserter:
+    def __init__(
+        self,
+        model,
+        update_fields,
+        unique_field="product_id",
+        chunk_size=500,
+        fingerprint_field=None,
+        track_keys=False,
+        prepare=None,
+        log=None,
+    ):
+        self.model = model
+        self.update_fields = list(update_fields)
+        self.unique_field = unique_field
+        self.chunk_size = max(1, chunk_size)
+        # fingerprint_field가 주어지면 DB에 저장된 값과 같은 행은 쓰지 않고 건너뛴다.
+        self.fingerprint_field = fingerprint_field
+        self.track_keys = track_keys
+        # prepare(rows): 청크를 쓰기 직전에 호출되는 훅 (기존 행을 참고해 값을 보정할 때 사용)
+        self.prepare = prepare
+        self.log = log or (lambda msg: None)
+
+        self._buffer = {}  # unique 값 -> 모델 인스턴스 (같은 청크 안의 중복 키는 마지막 값이 우선)
+        self.chunk_count = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+        # track_keys=True일 때 변경 내역(change-set)을 만들기 위한 키 목록
+        self.created_keys = []
+        self.updated_keys = []
+        self.unchanged_keys = []
+
+    def add(self, obj):
+        self._buffer[getattr(obj, self.unique_field)] = obj
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        rows = list(self._buffer.values())
+        self._buffer = {}
+        self.chunk_count += 1
+
+        started = time.perf_counter()
+        if self.prepare:
+            self.prepare(rows)
+        try:
+            created, updated, unchanged = self._write_chunk(rows)
+        except Exception as e:
+            # 청크 전체가 실패하면 문제 행만 걸러내도록 행 단위로 다시 시도
+            self.log(f"⚠️ 청크 {self.chunk_count} bulk 저장 실패, 행 단위로 재시도합니다: {e}")
+            created, updated = self._write_rows_individually(rows)
+            unchanged = []
+        took = time.perf_counter() - started
+
+        self.created += len(created)
+        self.updated += len(updated)
+        self.unchanged += len(unchanged)
+        self.elapsed += took
+        if self.track_keys:
+            self.created_keys.extend(created)
+            self.updated_keys.extend(updated)
+            self.unchanged_keys.extend(unchanged)
+        self.log(
+            f"  [{self.model.__name__}] 청크 {self.chunk_count}: {len(rows)}행 "
+            f"(생성 {len(created)} / 갱신 {len(updated)} / 변경없음 {len(unchanged)}) {took * 1000:.0f}ms"
+        )
+
+    def close(self):
+        self.flush()
+        return self
+
+    def _write_chunk(self, rows):
+        keys = [getattr(obj, self.unique_field) for obj in rows]
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db):
+            qs = self.model.objects.using(db).filter(**{f"{self.unique_field}__in": keys})
+            if self.fingerprint_field:
+                existing = dict(qs.values_list(self.unique_field, self.fingerprint_field))
+            else:
+                existing = dict.fromkeys(qs.values_list(self.unique_field, flat=True))
+
+            created, updated, unchanged, to_write = [], [], [], []
+            for obj in rows:
+                key = getattr(obj, self.unique_field)
+                if key not in existing:
+                    created.append(key)
+                elif self.fingerprint_field and existing[key] and existing[key] == getattr(obj, self.fingerprint_field):
+                    unchanged.append(key)
+                    continue
+                else:
+                    updated.append(key)
+                to_write.append(obj)
+
+            if to_write:
+                kwargs = {"update_conflicts": True, "update_fields": self.update_fields}
+                # MySQL은 ON DUPLICATE KEY UPDATE라 충돌 대상 컬럼을 지정할 수 없다(지정하면 NotSupportedError).
+                if connections[db].features.supports_update_conflicts_with_target:
+                    kwargs["unique_fields"] = [self.unique_field]
+                self.model.objects.using(db).bulk_create(to_write, **kwargs)
+        return created, updated, unchanged
+
+    def _write_rows_individually(self, rows):
+        created, updated = [], []
+        for obj in rows:
+            defaults = {f: getattr(obj, f) for f in self.update_fields}
+            try:
+                _, was_created = self.model.objects.update_or_create(
+                    **{self.unique_field: getattr(obj, self.unique_field)},
+                    defaults=defaults,
+                )
+            except Exception as e:
+                self.failed += 1
+                self.log(f"❌ {self.model.__name__} 저장 중 오류 ({getattr(obj, self.unique_field)}): {e}")
+                continue
+            key = getattr(obj, self.unique_field)
+            (created if was_created else updated).append(key)
+        return created, updated
+
+    def summary(self) -> str:
+        return (
+            f"{self.model.__name__}: 생성 {self.created} / 갱신 {self.updated} / "
+            f"변경없음 {self.unchanged} / 실패 {self.failed} "
+            f"(청크 {self.chunk_count}개, 쓰기 {self.elapsed:.2f}s)"
+        )
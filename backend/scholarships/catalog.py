@@ -0,0 +1,184 @@
+# scholarships/catalog.py
+"""
+추천 사전 필터링용 인메모리 장학금 카탈로그 스냅샷.
+
+카탈로그는 수천 건 규모이고 동기화 때만 바뀌므로, 자격 판정에 필요한 컬럼만 __slots__ 레코드로 프로세스 메모리에 올려두고
+자격 필터링 규칙(CatalogSnapshot.filter)을 쿼리 없이 메모리에서 적용합니다.
+
+- 카탈로그 버전(recommendation_cache)이 바뀌면 다음 조회 때 다시 만듭니다 (쿼리 3번).
+- gunicorn preload_app 환경에서는 마스터가 fork 전에 만들어 두므로(gunicorn.conf.py) 워커들이 copy-on-write로 공유합니다.
+"""
+import threading
+import time
+
+from .models import Scholarship, Region
+from .recommendation_cache import get_catalog_version
+from .eligibility import fails_thresholds, user_eligibility
+from .qualifications import qualification_flags
+from .scoring import ScoringMatrix
+from .region_tree import ROOT_CODE, ancestor_codes, user_region_full_name
+
+# 학과 조건에서 '전공 무관'으로 취급하는 값
+OPEN_MAJOR_KEYWORDS = ("해당없음", "제한없음", "전공무관", "특정학과")
+
+
+class CatalogEntry:
+    __slots__ = (
+        "id",
+        "product_id",
+        "university_type",
+        "university_type_key",   # '-' → '~' (odcloud 원문 표기 정규화)
+        "academic_year_type",
+        "academic_year_key",     # 공백 제거
+        "major_field",
+        "major_field_key",       # 소문자 (icontains 대응)
+        "region",
+        "is_region_processed",
+        "region_codes",          # Scholarship.regions의 Region.code 집합
+        "min_gpa",
+        "gpa_scale",
+        "max_income_decile",
+        "academic_year_mask",
+        "eligibility_confidence",
+        "recruitment_end",
+        "qualification_flags",   # 값이 True인 특정 자격 플래그 이름 집합
+    )
+
+    def __init__(self, id, product_id, university_type, academic_year_type, major_field, region, is_region_processed, region_codes,
+                 min_gpa=None, gpa_scale=None, max_income_decile=None, academic_year_mask=0, eligibility_confidence="",
+                 recruitment_end=None, qualification_flags=frozenset()):
+        self.id = id
+        self.product_id = product_id
+        self.university_type = university_type or ""
+        self.university_type_key = self.university_type.replace("-", "~")
+        self.academic_year_type = academic_year_type or ""
+        self.academic_year_key = self.academic_year_type.replace(" ", "")
+        self.major_field = major_field or ""
+        self.major_field_key = self.major_field.lower()
+        self.region = region or ""
+        self.is_region_processed = is_region_processed
+        self.region_codes = region_codes
+        self.min_gpa = min_gpa
+        self.gpa_scale = gpa_scale
+        self.max_income_decile = max_income_decile
+        self.academic_year_mask = academic_year_mask
+        self.eligibility_confidence = eligibility_confidence
+        self.recruitment_end = recruitment_end
+        self.qualification_flags = qualification_flags
+
+
+class CatalogSnapshot:
+    def __init__(self, entries: tuple, region_codes: dict[str, str], version: int):
+        self.entries = entries
+        self.region_codes = region_codes  # Region.full_name → code
+        self.version = version
+        self.built_at = time.time()
+        self.position_by_id = {e.id: i for i, e in enumerate(entries)}
+        # 점수 계산용 컬럼 배열 (scholarships/scoring.py). 스냅샷과 함께 만들어 fork 전에 공유되도록 한다
+        self.scoring = ScoringMatrix(entries, OPEN_MAJOR_KEYWORDS)
+
+    @classmethod
+    def build(cls, version: int) -> "CatalogSnapshot":
+        codes_by_scholarship = {}
+        for scholarship_id, code in Scholarship.regions.through.objects.values_list("scholarship_id", "region__code"):
+            codes_by_scholarship.setdefault(scholarship_id, set()).add(code)
+
+        flag_names = list(qualification_flags())
+        entries = tuple(
+            CatalogEntry(
+                row["id"], row["product_id"], row["university_type"], row["academic_year_type"], row["major_field"],
+                row["region"], row["is_region_processed"], frozenset(codes_by_scholarship.get(row["id"], ())),
+                row["min_gpa"], row["gpa_scale"], row["max_income_decile"], row["academic_year_mask"],
+                row["eligibility_confidence"], row["recruitment_end"],
+                frozenset(f for f in flag_names if row[f]),
+            )
+            for row in Scholarship.objects.order_by("id").values(
+                "id", "product_id", "university_type", "academic_year_type", "major_field", "region", "is_region_processed",
+                "min_gpa", "gpa_scale", "max_income_decile", "academic_year_mask", "eligibility_confidence",
+                "recruitment_end", *flag_names,
+            )
+        )
+        return cls(entries, dict(Region.objects.values_list("full_name", "code")), version)
+
+    def user_region_codes(self, region: str | None, district: str | None) -> tuple:
+        """사용자 지역의 조상 코드 (전국 → 시/도 → 시/군/구 순)."""
+        code = self.region_codes.get(user_region_full_name(region, district))
+        return tuple(ancestor_codes(code) if code else [ROOT_CODE])
+
+    def filter(self, user_profile) -> list[CatalogEntry]:
+        """
+        사용자가 자격이 있는 장학금을 쿼리 없이 돌려준다 (id 순). 규칙은 위에서부터 차례로 적용한다.
+
+        1. 대학 유형: 사용자 값('-'는 '~'로 정규화)을 포함하는 유형이 하나라도 있으면 그 장학금들로 좁힌다 (없으면 그대로).
+        2. 학년 유형: 같은 방식으로 공백을 무시하고 포함 여부를 본다.
+        3. 학과: 사용자 전공을 포함(대소문자 무시)하거나 OPEN_MAJOR_KEYWORDS('전공 무관' 계열)인 장학금만 남긴다.
+        4. 성적/소득/학년: 수집 때 정형화한 기준(eligibility.fails_thresholds)에 명백히 미달하면 제외한다.
+        5. 지역: 지역 처리가 끝났고, 연결된 Region 코드가 사용자 지역의 조상 코드(전국 포함)와 겹치는 장학금만 남긴다.
+        """
+        entries = self.entries
+
+        # 대학 유형: 사용자 값이 포함된 유형이 하나라도 있으면 그 유형들로만 좁힌다
+        user_univ = (getattr(user_profile, "university_type", "") or "").strip()
+        if user_univ:
+            user_univ = user_univ.replace("-", "~")
+            matched = [e for e in entries if user_univ in e.university_type_key]
+            if matched:
+                entries = matched
+
+        # 학년 유형: 같은 방식 (공백 무시)
+        user_year = (getattr(user_profile, "academic_year_type", "") or "").strip()
+        if user_year:
+            user_year = user_year.replace(" ", "")
+            matched = [e for e in entries if user_year in e.academic_year_key]
+            if matched:
+                entries = matched
+
+        # 학과: 사용자 전공을 포함하거나 '전공 무관' 계열인 장학금
+        user_major = (getattr(user_profile, "major_field", "") or "").strip()
+        if user_major:
+            user_major = user_major.lower()
+            entries = [e for e in entries if user_major in e.major_field_key or e.major_field in OPEN_MAJOR_KEYWORDS]
+
+        # 성적/소득/학년 기준에 명백히 미달하는 장학금 제외
+        user = user_eligibility(user_profile)
+        if user.gpa is not None or user.income_decile is not None or user.year_bit:
+            entries = [e for e in entries if not fails_thresholds(e, user)]
+
+        # 지역: 사용자 지역의 조상(전국 포함) 코드와 겹치는 처리 완료 장학금
+        codes = self.user_region_codes(getattr(user_profile, "region", ""), getattr(user_profile, "district", ""))
+        return [e for e in entries if e.is_region_processed and not e.region_codes.isdisjoint(codes)]
+
+    def rank(self, user_profile, ids=None) -> list[int]:
+        """scoring.ScoringMatrix 점수 내림차순으로 정렬한 장학금 id 목록. ids를 주면 그 후보만 (스냅샷에 없는 id는 제외)."""
+        codes = self.user_region_codes(getattr(user_profile, "region", ""), getattr(user_profile, "district", ""))
+        positions = None if ids is None else [self.position_by_id[i] for i in ids if i in self.position_by_id]
+        return self.scoring.ids[self.scoring.rank(user_profile, codes, positions)].tolist()
+
+    def explain(self, user_profile, ids) -> dict[int, tuple[CatalogEntry, dict[str, float]]]:
+        """id별 (스냅샷 항목, 점수 특성 값). 추천 사유 템플릿(reasons.py)이 어떤 조건이 맞았는지 보는 데 쓴다."""
+        codes = self.user_region_codes(getattr(user_profile, "region", ""), getattr(user_profile, "district", ""))
+        features = self.scoring.features(user_profile, codes)
+        out = {}
+        for pk in ids:
+            position = self.position_by_id.get(pk)
+            if position is not None:
+                out[pk] = (self.entries[position], {name: float(values[position]) for name, values in features.items()})
+        return out
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """현재 카탈로그 버전의 스냅샷. 버전이 바뀌었으면 다시 만든다."""
+    global _snapshot
+    version = get_catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = CatalogSnapshot.build(version)
+            print(f"DEBUG: [카탈로그 스냅샷] v{version} 재생성: {len(_snapshot.entries)}건")
+        return _snapshot
@@ -0,0 +1,38 @@
+# scholarships/counters.py
+"""
+캐시(Redis)에 누적하는 운영 지표 카운터.
+
+모든 워커가 같은 키("{prefix}:metrics:{이름}")를 cache.incr로 올리므로 프로세스를 합산한 값이 남습니다.
+지표 기록/조회 실패는 조용히 무시합니다 (카운터 때문에 요청이나 배치가 실패하면 안 된다).
+"""
+from django.core.cache import cache
+
+
+class CacheCounters:
+    def __init__(self, prefix: str, names: tuple[str, ...]):
+        self.prefix = prefix
+        self.names = names
+
+    def key(self, name: str) -> str:
+        return f"{self.prefix}:metrics:{name}"
+
+    def bump(self, name: str):
+        try:
+            cache.incr(self.key(name))
+        except ValueError:
+            cache.add(self.key(name), 1, timeout=None)
+        except Exception:
+            pass
+
+    def get(self) -> dict[str, int]:
+        try:
+            values = cache.get_many([self.key(n) for n in self.names])
+        except Exception:
+            values = {}
+        return {n: values.get(self.key(n), 0) for n in self.names}
+
+    def reset(self):
+        try:
+            cache.delete_many([self.key(n) for n in self.names])
+        except Exception:
+            pass
@@ -0,0 +1,307 @@
+# scholarships/eligibility.py
+"""
+성적/소득/학년 자격 기준을 수집 시점에 정형화된 값으로 뽑아내는 파서.
+
+'성적기준 상세내용', '소득기준 상세내용'은 자유 서술이라 지금까지는 GPT가 프롬프트에서 읽고 판단했습니다.
+여기서 최소 평점(+만점 기준), 최대 소득분위, 대상 학년(비트마스크)을 Scholarship 컬럼으로 뽑아두면
+기준에 '명백히' 미달하는 사용자에게는 후보 단계에서 미리 제외할 수 있습니다.
+
+- 규칙으로 확실히 읽히는 값만 저장하고, "또는"/"단," 같은 예외 문구가 붙은 항목은 비워 둔 채 신뢰도를 LOW로 남깁니다.
+- LOW 항목은 process_scholarship_eligibility --llm 으로 GPT에게 보완시킬 수 있으며, 이때 신뢰도는 MEDIUM이 됩니다.
+- 제외 판정은 값이 있는 기준에 대해서만, 사용자 값도 있을 때만 합니다 (모르면 통과).
+"""
+import json
+import re
+import unicodedata
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .llm import LLMError, fake_responder, get_llm_client
+
+CONFIDENCE_HIGH = "high"      # 규칙으로 모두 확정 (기준 없음 포함)
+CONFIDENCE_MEDIUM = "medium"  # 규칙으로 못 읽은 항목을 GPT가 보완
+CONFIDENCE_LOW = "low"        # 일부 항목 미해석 (그 항목 값은 비어 있음)
+CONFIDENCE_CHOICES = [
+    (CONFIDENCE_HIGH, "높음 (규칙)"),
+    (CONFIDENCE_MEDIUM, "중간 (GPT)"),
+    (CONFIDENCE_LOW, "낮음 (일부 미해석)"),
+]
+
+# 사용자 평점(UserScholarship.gpa_*)은 4.5 만점으로 입력받는다
+USER_GPA_SCALE = 4.5
+GPA_SCALES = (4.0, 4.3, 4.5)
+# 학기 비트: 0 = 신입생, 1~8 = 대학 N학기 (8은 '8학기 이상')
+MAX_SEMESTER = 8
+ALL_YEARS_MASK = (1 << (MAX_SEMESTER + 1)) - 1
+
+NO_REQUIREMENT_PATTERN = re.compile(r"^(?:-|없음|해당\s*없음|제한\s*없음|무관|성적\s*무관|소득\s*무관|별도\s*기준\s*없음)?$")
+# 이 문구가 있으면 숫자를 읽었더라도 절대 기준으로 보지 않는다 (대안 조건/예외)
+AMBIGUOUS_PATTERN = re.compile(r"또는|이거나|혹은|단[,\s]|예외|제외|우대|권장|가산|고려|참고|석차|백분위|상위\s*\d+\s*%")
+
+GPA_SCALE_PATTERN = re.compile(r"(4\.[035])\s*(?:점\s*)?만점|/\s*(4\.[035])")
+GPA_PATTERN = re.compile(r"(?<![\d./])([0-4]\.\d{1,2})(?!\s*(?:점\s*)?만점)(?![\d.])(?=[^,;]{0,20}?이상)")
+PERCENT_PATTERN = re.compile(r"(?<![\d.])(\d{2,3})\s*점\s*이상")
+LETTER_PATTERN = re.compile(r"(?<![A-Za-z])([ABC])\s*([+0])?\s*(?:학점|등급)?\s*이상")
+LETTER_GRADES = {("A", "+"): 4.5, ("A", ""): 4.0, ("B", "+"): 3.5, ("B", ""): 3.0, ("C", "+"): 2.5, ("C", ""): 2.0}
+
+INCOME_RANGE_PATTERN = re.compile(r"(\d{1,2})\s*[~\-]\s*(\d{1,2})\s*(?:분위|구간)")
+INCOME_CAP_PATTERN = re.compile(r"(\d{1,2})\s*(?:분위|구간)\s*(?:이내|이하|까지|내)")
+INCOME_UNPARSED_HINT = re.compile(r"분위|구간|중위소득|기초|차상위|저소득|수급")
+
+SEMESTER_PATTERN = re.compile(r"(\d{1,2})\s*학기\s*(이상)?")
+SCHOOL_YEAR_PATTERN = re.compile(r"(\d)\s*학년\s*(이상)?")
+
+
+class EligibilityThresholds(NamedTuple):
+    min_gpa: float | None
+    gpa_scale: float | None   # None이면 만점 기준이 명시되지 않음 (사용자 값과 그대로 비교)
+    max_income_decile: int | None
+    academic_year_mask: int   # 0이면 학년 제한 없음
+    confidence: str
+
+
+def _normalize(text: str | None) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "")).strip(" .·,")
+
+
+def parse_grade_criteria(text: str | None) -> tuple[float | None, float | None, bool]:
+    """성적 기준 원문 → (최소 평점, 만점 기준, 확정 여부). 기준이 없으면 (None, None, True)."""
+    t = _normalize(text)
+    if NO_REQUIREMENT_PATTERN.match(t):
+        return None, None, True
+
+    candidates = []
+    scale_match = GPA_SCALE_PATTERN.search(t)
+    scale = float(scale_match.group(1) or scale_match.group(2)) if scale_match else None
+    for m in GPA_PATTERN.finditer(t):
+        value = float(m.group(1))
+        if 0 < value <= (scale or USER_GPA_SCALE):
+            candidates.append((value, scale))
+    for m in LETTER_PATTERN.finditer(t):
+        candidates.append((LETTER_GRADES[(m.group(1), "+" if m.group(2) == "+" else "")], 4.5))
+    for m in PERCENT_PATTERN.finditer(t):
+        value = float(m.group(1))
+        if 50 <= value <= 100:
+            candidates.append((value, 100.0))
+
+    if not candidates or AMBIGUOUS_PATTERN.search(t):
+        return None, None, False
+    # 직전학기/전체 등 기준이 여러 개면 가장 낮은 값을 바닥으로 본다 (명백한 미달만 제외하기 위해)
+    if len({c[1] for c in candidates}) > 1:
+        return None, None, False
+    value, scale = min(candidates)
+    return value, scale, True
+
+
+def parse_income_criteria(text: str | None) -> tuple[int | None, bool]:
+    """소득 기준 원문 → (최대 소득분위, 확정 여부). 기준이 없으면 (None, True)."""
+    t = _normalize(text)
+    if NO_REQUIREMENT_PATTERN.match(t):
+        return None, True
+
+    caps = [int(m.group(2)) for m in INCOME_RANGE_PATTERN.finditer(t)]
+    caps += [int(m.group(1)) for m in INCOME_CAP_PATTERN.finditer(t)]
+    caps = [c for c in caps if 1 <= c <= 10]
+    if not caps:
+        # 소득 관련 문구가 있는데 분위를 못 읽었으면(중위소득 %, 기초/차상위 등) 미해석, 아니면 소득 기준이 아닌 내용
+        return None, not INCOME_UNPARSED_HINT.search(t)
+    if AMBIGUOUS_PATTERN.search(t):
+        return None, False
+    # 신입생/재학생별 기준처럼 여러 개면 가장 넓은 값
+    return max(caps), True
+
+
+def academic_year_mask(text: str | None) -> int:
+    """
+    학년 구분 문자열 → 학기 비트마스크. 제한이 없거나 읽을 수 없으면 0.
+    예) "대학신입생, 대학2학기" → 0b101, "대학8학기이상" → 1 << 8, "3학년 이상" → 5~8학기
+    """
+    t = _normalize(text).replace(" ", "")
+    if not t or NO_REQUIREMENT_PATTERN.match(t):
+        return 0
+    mask = 0
+    if "신입생" in t:
+        mask |= 1
+    for m in SEMESTER_PATTERN.finditer(t):
+        n = min(int(m.group(1)), MAX_SEMESTER)
+        if n >= 1:
+            mask |= ALL_YEARS_MASK & ~((1 << n) - 1) if m.group(2) else 1 << n
+    for m in SCHOOL_YEAR_PATTERN.finditer(t):
+        year = int(m.group(1))
+        if 1 <= year <= 4:
+            first = 2 * year - 1
+            mask |= ALL_YEARS_MASK & ~((1 << first) - 1) if m.group(2) else (1 << first) | (1 << (first + 1))
+    return mask
+
+
+def extract_thresholds(grade_text: str | None, income_text: str | None, academic_year_type: str | None) -> EligibilityThresholds:
+    min_gpa, gpa_scale, grade_ok = parse_grade_criteria(grade_text)
+    max_decile, income_ok = parse_income_criteria(income_text)
+    return EligibilityThresholds(
+        min_gpa,
+        gpa_scale,
+        max_decile,
+        academic_year_mask(academic_year_type),
+        CONFIDENCE_HIGH if grade_ok and income_ok else CONFIDENCE_LOW,
+    )
+
+
+def apply_thresholds(scholarship) -> EligibilityThresholds:
+    """Scholarship 인스턴스의 원문 필드로 기준을 뽑아 해당 컬럼에 채운다 (저장은 호출 측)."""
+    thresholds = extract_thresholds(
+        scholarship.grade_criteria_details, scholarship.income_criteria_details, scholarship.academic_year_type
+    )
+    scholarship.min_gpa = thresholds.min_gpa
+    scholarship.gpa_scale = thresholds.gpa_scale
+    scholarship.max_income_decile = thresholds.max_income_decile
+    scholarship.academic_year_mask = thresholds.academic_year_mask
+    scholarship.eligibility_confidence = thresholds.confidence
+    return thresholds
+
+
+# ---------- 사용자 쪽 값 / 제외 판정 ----------
+class UserEligibility(NamedTuple):
+    gpa: float | None
+    income_decile: int | None
+    year_bit: int  # 0이면 학년을 모름
+
+
+def user_eligibility(user_profile) -> UserEligibility:
+    gpas = [g for g in (getattr(user_profile, "gpa_last_semester", None), getattr(user_profile, "gpa_overall", None)) if g]
+    income = re.search(r"\d{1,2}", getattr(user_profile, "income_level", "") or "")
+    decile = int(income.group()) if income and 1 <= int(income.group()) <= 10 else None
+    year_mask = academic_year_mask(getattr(user_profile, "academic_year_type", ""))
+    # 사용자 학년은 하나여야 한다 (여러 비트면 판단하지 않음)
+    year_bit = year_mask if year_mask and year_mask & (year_mask - 1) == 0 else 0
+    return UserEligibility(max(gpas) if gpas else None, decile, year_bit)
+
+
+def trusted_confidences() -> tuple[str, ...]:
+    if getattr(settings, "ELIGIBILITY_TRUST_LLM", True):
+        return CONFIDENCE_HIGH, CONFIDENCE_LOW, CONFIDENCE_MEDIUM
+    return CONFIDENCE_HIGH, CONFIDENCE_LOW
+
+
+def fails_thresholds(entry, user: UserEligibility) -> bool:
+    """entry(Scholarship 또는 CatalogEntry)의 기준에 사용자가 명백히 미달하면 True."""
+    if entry.eligibility_confidence not in trusted_confidences():
+        return False
+    if user.gpa is not None and entry.min_gpa is not None:
+        if entry.gpa_scale is None:
+            if entry.min_gpa > user.gpa + 1e-6:
+                return True
+        elif entry.gpa_scale <= USER_GPA_SCALE and entry.min_gpa > entry.gpa_scale * (user.gpa / USER_GPA_SCALE) + 1e-6:
+            return True
+    if user.income_decile is not None and entry.max_income_decile is not None and entry.max_income_decile < user.income_decile:
+        return True
+    if user.year_bit and entry.academic_year_mask and not entry.academic_year_mask & user.year_bit:
+        return True
+    return False
+
+
+# ---------- GPT 보완 (규칙으로 못 읽은 항목) ----------
+ELIGIBILITY_BATCH_SYSTEM_PROMPT = """
+당신은 한국 대학 장학금 공고의 자격 기준을 정형화하는 AI입니다.
+입력은 [{"id": 번호, "grade": "성적 기준 원문", "income": "소득 기준 원문"}] 형태의 JSON 배열입니다.
+각 항목에 대해 모든 지원자에게 예외 없이 적용되는 최소 기준만 뽑아 다음 형태의 JSON 배열로만 반환하세요.
+[{"id": 번호, "min_gpa": 숫자 또는 null, "gpa_scale": 4.0/4.3/4.5/100 또는 null, "max_income_decile": 1~10 정수 또는 null}]
+
+**규칙:**
+1.  평점 기준이 "또는" 등으로 다른 조건과 선택 관계이거나, 석차/백분위로만 주어지면 min_gpa는 null입니다.
+2.  만점 기준이 적혀 있지 않으면 gpa_scale은 null입니다. "B학점 이상"은 min_gpa 3.0, gpa_scale 4.5입니다.
+3.  소득은 '소득분위'와 '학자금 지원구간'을 같은 값으로 봅니다. "8구간 이내" → 8. 기초생활수급자/차상위계층만 대상이면 1입니다.
+4.  중위소득 비율처럼 분위로 바꿀 수 없거나 소득 기준이 없으면 max_income_decile은 null입니다.
+5.  입력의 모든 id를 빠짐없이 한 번씩 포함하고, 다른 설명은 쓰지 마세요.
+"""
+
+
+def parse_eligibility_batch_response(content: str, expected_ids) -> dict:
+    """배치 응답 → {id: (min_gpa, gpa_scale, max_income_decile)}. 형식이 맞지 않는 항목은 버린다."""
+    content = re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip())
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        return {}
+    if not isinstance(payload, list):
+        return {}
+
+    def number(value, allowed=None):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return value if allowed is None or value in allowed else None
+
+    expected = set(expected_ids)
+    results = {}
+    for item in payload:
+        if not isinstance(item, dict):
+            continue
+        try:
+            item_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if item_id not in expected:
+            continue
+        scale = number(item.get("gpa_scale"), GPA_SCALES + (100,))
+        min_gpa = number(item.get("min_gpa"))
+        if min_gpa is not None and not 0 < min_gpa <= (scale or USER_GPA_SCALE):
+            min_gpa = None
+        decile = number(item.get("max_income_decile"))
+        if decile is not None and not (float(decile).is_integer() and 1 <= decile <= 10):
+            decile = None
+        results[item_id] = (
+            float(min_gpa) if min_gpa is not None else None,
+            float(scale) if scale is not None and min_gpa is not None else None,
+            int(decile) if decile is not None else None,
+        )
+    return results
+
+
+class OpenAIEligibilityExtractor:
+    """공용 LLM 클라이언트(llm.py)로 못 읽은 기준을 보완한다. timeout은 재시도를 포함한 호출 하나의 데드라인(초)."""
+
+    def __init__(self, model: str = "gpt-4o", timeout: float = 30, log=None, client=None):
+        self.model = model
+        self.timeout = timeout
+        self.log = log or print
+        self.client = client or get_llm_client()
+        self.request_count = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def extract_batch(self, items: dict) -> dict:
+        """items: {id: (성적 원문, 소득 원문)}. 응답에 포함된 항목만 돌려주며, 호출이 실패하면 빈 dict."""
+        payload = json.dumps(
+            [{"id": i, "grade": grade or "", "income": income or ""} for i, (grade, income) in items.items()],
+            ensure_ascii=False,
+        )
+        try:
+            response = self.client.complete(
+                [
+                    {"role": "system", "content": ELIGIBILITY_BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": payload},
+                ],
+                purpose="eligibility_batch",
+                deadline=self.timeout,
+                model=self.model,
+                temperature=0.0,
+                max_tokens=40 * len(items) + 50,
+            )
+        except LLMError as e:
+            self.log(f"GPT 자격 기준 배치 호출 중 오류 발생 ({len(items)}건): {e}")
+            return {}
+        self.request_count += 1
+        self.prompt_tokens += response.prompt_tokens
+        self.completion_tokens += response.completion_tokens
+        return parse_eligibility_batch_response(response.content, items.keys())
+
+
+@fake_responder("eligibility_batch")
+def _fake_eligibility_batch_response(messages) -> str:
+    """FakeBackend용: 규칙 파서가 읽는 값만 채우고 나머지는 null로 답한다."""
+    results = []
+    for item in json.loads(messages[-1]["content"]):
+        min_gpa, gpa_scale, _ = parse_grade_criteria(item["grade"])
+        max_decile, _ = parse_income_criteria(item["income"])
+        results.append({"id": item["id"], "min_gpa": min_gpa, "gpa_scale": gpa_scale, "max_income_decile": max_decile})
+    return json.dumps(results)
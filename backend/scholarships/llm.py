@@ -0,0 +1,489 @@
+# scholarships/llm.py
+"""
+OpenAI ChatCompletion 호출을 한곳에서 처리하는 공용 LLM 클라이언트.
+
+추천(recommendation.call_gpt / call_gpt_stream), 지역 추출(region_extraction), 자격 기준 보완(eligibility)이
+모두 get_llm_client()를 거칩니다.
+
+- 데드라인: 호출 하나(재시도·대기 포함)에 쓸 수 있는 총 시간. 각 시도의 HTTP 타임아웃(request_timeout)은 남은 시간으로 줄어듭니다.
+- 재시도: 타임아웃/연결 오류/429/5xx만, 지터를 준 지수 백오프로 데드라인 안에서만.
+- 서킷 브레이커: 일시적 오류가 연속으로 쌓이면 reset_seconds 동안 호출하지 않고 바로 LLMUnavailable을 던집니다.
+  (추천은 점수 순 결과로, 지역/자격 추출은 '응답 없음'으로 처리되어 다음 실행에서 재시도)
+- 동시 호출 상한: 프로세스당 세마포어. 자리가 나지 않으면 데드라인까지만 기다리고 LLMUnavailable.
+- settings.LLM_BACKEND = "fake"면 네트워크 없이 결정적인 응답을 돌려주는 FakeBackend를 씁니다.
+  용도(purpose)별 가짜 응답은 각 모듈이 @fake_responder("...")로 등록합니다.
+- settings.LLM_BACKEND = "record"면 실제 응답을 정규화한 프롬프트의 해시로 LLM_RECORD_DIR에 저장하고(RecordingBackend),
+  "replay"면 저장된 응답을 녹화 당시 지연(또는 LLM_REPLAY_LATENCY)으로 재생합니다(ReplayBackend).
+  파이프라인 변경 전후의 속도를 네트워크 없이 같은 응답으로 비교할 때 씁니다.
+"""
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+
+import openai
+from django.conf import settings
+
+from .tokens import count_message_tokens, count_tokens
+
+openai.api_key = settings.OPENAI_API_KEY
+
+# 재시도/서킷 집계 대상 (업스트림 상태 문제). 잘못된 요청/인증 오류는 바로 실패로 돌려준다.
+TRANSIENT_ERRORS = (
+    openai.error.Timeout,
+    openai.error.APIConnectionError,
+    openai.error.RateLimitError,
+    openai.error.ServiceUnavailableError,
+    openai.error.APIError,
+    openai.error.TryAgain,
+)
+
+
+class LLMError(Exception):
+    """LLM 호출 실패 (재시도 후에도 실패했거나 재시도할 수 없는 오류)."""
+
+
+class LLMUnavailable(LLMError):
+    """서킷이 열려 있거나 동시 호출 자리가 나지 않아 호출하지 않은 경우."""
+
+
+class LLMReplayMiss(LLMError):
+    """재생 모드에서 저장된 응답이 없는 프롬프트 (재시도/서킷 집계 대상이 아님)."""
+
+
+class LLMResponse(NamedTuple):
+    content: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class CircuitBreaker:
+    """
+    연속 실패 failure_threshold회 → 열림(reset_seconds 동안 즉시 실패) → 반열림(시험 호출 하나만 통과)
+    → 성공하면 닫힘, 실패하면 다시 열림.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._probing:
+                return False
+            self._probing = True  # 반열림: 이 호출 하나만 통과시킨다
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self):
+        """시험 호출이 업스트림 상태와 무관한 이유로 끝났을 때 (다음 호출이 다시 시험하도록)."""
+        with self._lock:
+            self._probing = False
+
+
+class OpenAIBackend:
+    def complete(self, messages, model, timeout, purpose=None, **params) -> LLMResponse:
+        response = openai.ChatCompletion.create(model=model, messages=messages, request_timeout=timeout, **params)
+        usage = response.get("usage") or {}
+        return LLMResponse(
+            response["choices"][0]["message"]["content"] or "",
+            usage.get("prompt_tokens", 0),
+            usage.get("completion_tokens", 0),
+        )
+
+    def stream(self, messages, model, timeout, purpose=None, **params):
+        response = openai.ChatCompletion.create(
+            model=model, messages=messages, request_timeout=timeout, stream=True, **params
+        )
+        for chunk in response:
+            delta = chunk["choices"][0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+_FAKE_RESPONDERS = {}
+
+
+def fake_responder(purpose: str):
+    """FakeBackend가 purpose 호출에 쓸 응답 함수(messages → 응답 텍스트)를 등록하는 데코레이터."""
+    def register(func):
+        _FAKE_RESPONDERS[purpose] = func
+        return func
+    return register
+
+
+class FakeBackend:
+    """
+    네트워크 없이 고정 지연 뒤 등록된 응답 함수의 결정적인 결과를 돌려준다 (테스트/벤치마크용).
+    토큰 사용량은 로컬 토크나이저로 계산한다. 등록되지 않은 purpose는 빈 응답.
+    """
+
+    def __init__(self, latency: float = 0.0, chunk_chars: int = 16):
+        self.latency = latency
+        self.chunk_chars = max(1, chunk_chars)
+
+    def complete(self, messages, model, timeout, purpose=None, **params) -> LLMResponse:
+        if self.latency:
+            time.sleep(min(self.latency, timeout))
+            if self.latency > timeout:
+                raise openai.error.Timeout("fake backend: latency exceeds request timeout")
+        responder = _FAKE_RESPONDERS.get(purpose)
+        content = responder(messages) if responder else ""
+        return LLMResponse(content, count_message_tokens(messages, model), count_tokens(content, model))
+
+    def stream(self, messages, model, timeout, purpose=None, **params):
+        content = self.complete(messages, model, timeout, purpose=purpose, **params).content
+        for start in range(0, len(content), self.chunk_chars):
+            yield content[start:start + self.chunk_chars]
+
+
+def prompt_key(messages, model: str, params: dict | None = None) -> str:
+    """녹화/재생 키: 공백을 정규화한 메시지 + 모델 + 호출 파라미터의 SHA-256."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": [(m.get("role"), " ".join((m.get("content") or "").split())) for m in messages],
+            "params": params or {},
+        },
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMRecordStore:
+    """프롬프트 키 → 녹화된 응답. 키마다 JSON 파일 하나 (여러 프로세스가 함께 녹화해도 파일 단위로 원자적으로 쓴다)."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        record = self._loaded.get(key)
+        if record is None:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    record = json.load(f)
+            except FileNotFoundError:
+                return None
+            with self._lock:
+                self._loaded[key] = record
+        return record
+
+    def put(self, key: str, record: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self._loaded[key] = record
+
+
+class RecordingBackend:
+    """inner 백엔드(기본 OpenAI)의 응답을 그대로 돌려주면서 store에 녹화한다. 스트리밍은 끝까지 받은 응답만 저장한다."""
+
+    def __init__(self, store: LLMRecordStore, inner=None):
+        self.store = store
+        self.inner = inner or OpenAIBackend()
+
+    def _save(self, messages, model, purpose, params, content, prompt_tokens, completion_tokens, latency, first_chunk_latency):
+        self.store.put(prompt_key(messages, model, params), {
+            "purpose": purpose,
+            "model": model,
+            "messages": messages,
+            "params": params,
+            "content": content,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency": round(latency, 4),
+            "first_chunk_latency": round(first_chunk_latency, 4),
+        })
+
+    def complete(self, messages, model, timeout, purpose=None, **params) -> LLMResponse:
+        started = time.monotonic()
+        response = self.inner.complete(messages, model, timeout, purpose=purpose, **params)
+        latency = time.monotonic() - started
+        self._save(messages, model, purpose, params, response.content, response.prompt_tokens, response.completion_tokens, latency, latency)
+        return response
+
+    def stream(self, messages, model, timeout, purpose=None, **params):
+        started = time.monotonic()
+        first_chunk_latency = None
+        chunks = []
+        for chunk in self.inner.stream(messages, model, timeout, purpose=purpose, **params):
+            if first_chunk_latency is None:
+                first_chunk_latency = time.monotonic() - started
+            chunks.append(chunk)
+            yield chunk
+        content = "".join(chunks)
+        self._save(
+            messages, model, purpose, params, content, count_message_tokens(messages, model), count_tokens(content, model),
+            time.monotonic() - started, first_chunk_latency or 0.0,
+        )
+
+
+class ReplayBackend:
+    """
+    store에 녹화된 응답을 네트워크 없이 돌려준다. latency가 None이면 녹화 당시 지연(스트리밍은 첫 조각까지의 지연 +
+    나머지를 조각마다 나눠서)을, 숫자면 그 고정 지연을 재현한다. 녹화되지 않은 프롬프트는 LLMReplayMiss.
+    """
+
+    def __init__(self, store: LLMRecordStore, latency: float | None = None, chunk_chars: int = 16):
+        self.store = store
+        self.latency = latency
+        self.chunk_chars = max(1, chunk_chars)
+
+    def _record(self, messages, model, purpose, params) -> dict:
+        record = self.store.get(prompt_key(messages, model, params))
+        if record is None:
+            raise LLMReplayMiss(f"녹화된 응답이 없습니다 ({purpose or 'LLM'}, 모델 {model})")
+        return record
+
+    @staticmethod
+    def _sleep(seconds: float, timeout: float):
+        if seconds > 0:
+            time.sleep(min(seconds, timeout))
+            if seconds > timeout:
+                raise openai.error.Timeout("replay backend: recorded latency exceeds request timeout")
+
+    def complete(self, messages, model, timeout, purpose=None, **params) -> LLMResponse:
+        record = self._record(messages, model, purpose, params)
+        self._sleep(record.get("latency", 0.0) if self.latency is None else self.latency, timeout)
+        return LLMResponse(record["content"], record.get("prompt_tokens", 0), record.get("completion_tokens", 0))
+
+    def stream(self, messages, model, timeout, purpose=None, **params):
+        record = self._record(messages, model, purpose, params)
+        content = record["content"]
+        chunks = [content[i:i + self.chunk_chars] for i in range(0, len(content), self.chunk_chars)]
+        if self.latency is None:
+            first = record.get("first_chunk_latency", 0.0)
+            gap = max(record.get("latency", 0.0) - first, 0.0) / max(len(chunks) - 1, 1)
+        else:
+            first, gap = self.latency, 0.0
+        self._sleep(first, timeout)
+        for i, chunk in enumerate(chunks):
+            if i and gap:
+                time.sleep(gap)
+            yield chunk
+
+
+class LLMClient:
+    def __init__(
+        self,
+        backend=None,
+        model: str = "gpt-4o",
+        deadline: float = 30,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8,
+        max_concurrency: int = 8,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.backend = backend or OpenAIBackend()
+        self.model = model
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.max_concurrency = max(1, max_concurrency)
+        self.set_concurrency_limit(None)
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "calls": 0, "succeeded": 0, "failed": 0, "retries": 0,
+            "short_circuited": 0, "concurrency_rejected": 0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+        }
+
+    def set_concurrency_limit(self, semaphore):
+        """
+        동시 호출 상한으로 쓸 세마포어를 바꾼다 (precompute_recommendations처럼 프로세스 간에 공유할 때).
+        None이면 이 프로세스 전용 BoundedSemaphore(max_concurrency)로 되돌린다.
+        """
+        self._semaphore = semaphore or threading.BoundedSemaphore(self.max_concurrency)
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: 여러 워커가 동시에 재시도해 몰리지 않도록
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _attempts(self, deadline: float | None):
+        """시도마다 (남은 시간, 시도 번호)를 내보낸다. 남은 시간이 없으면 멈춘다."""
+        expires = time.monotonic() + (deadline or self.deadline)
+        for attempt in range(self.max_retries + 1):
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                return
+            yield remaining, attempt, expires
+
+    def _acquire(self, timeout: float):
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise LLMUnavailable("LLM 서킷이 열려 있어 호출하지 않았습니다")
+        # 공유 세마포어(multiprocessing)도 acquire(block, timeout) 시그니처가 같다
+        if not self._semaphore.acquire(True, max(timeout, 0)):
+            self.breaker.release()
+            self._count("concurrency_rejected")
+            raise LLMUnavailable("LLM 동시 호출 상한에 걸려 데드라인 안에 자리가 나지 않았습니다")
+
+    def release_slot(self):
+        self._semaphore.release()
+
+    def _run(self, call, deadline, purpose, keep_slot=False):
+        """
+        call(timeout)을 데드라인 안에서 재시도하며 실행한다.
+        keep_slot이면 성공했을 때 동시 호출 자리를 반납하지 않는다 (호출 측이 release_slot()으로 반납).
+        """
+        self._count("calls")
+        last_error = None
+        for remaining, attempt, expires in self._attempts(deadline):
+            if attempt:
+                self._count("retries")
+            self._acquire(remaining)
+            succeeded = False
+            try:
+                result = call(max(expires - time.monotonic(), 0.1))
+                succeeded = True
+            except TRANSIENT_ERRORS as e:
+                self.breaker.record_failure()
+                last_error = e
+            except openai.error.OpenAIError as e:
+                self.breaker.release()
+                self._count("failed")
+                raise LLMError(f"{purpose or 'LLM'} 호출 실패: {e}") from e
+            except Exception:
+                # LLMError나 예상하지 못한 예외(응답 파싱 등): 업스트림 장애로 치지 않고 시험 호출만 풀어 준다
+                self.breaker.release()
+                self._count("failed")
+                raise
+            finally:
+                if not (succeeded and keep_slot):
+                    self.release_slot()
+            if succeeded:
+                self.breaker.record_success()
+                return result
+            if attempt < self.max_retries:
+                time.sleep(min(self._backoff(attempt), max(expires - time.monotonic(), 0)))
+        self._count("failed")
+        raise LLMError(f"{purpose or 'LLM'} 호출 실패 (재시도 {self.max_retries}회 소진 또는 데드라인 초과): {last_error}")
+
+    def complete(self, messages, purpose: str | None = None, deadline: float | None = None, model: str | None = None, **params) -> LLMResponse:
+        """응답 전체를 받아 돌려준다. 실패하면 LLMError (서킷/동시성 때문이면 LLMUnavailable)."""
+        model = model or self.model
+        response = self._run(
+            lambda timeout: self.backend.complete(messages, model, timeout, purpose=purpose, **params), deadline, purpose
+        )
+        self._count("succeeded")
+        self._count("prompt_tokens", response.prompt_tokens)
+        self._count("completion_tokens", response.completion_tokens)
+        return response
+
+    def stream(self, messages, purpose: str | None = None, deadline: float | None = None, model: str | None = None, **params):
+        """
+        응답 텍스트 조각을 도착하는 대로 내보낸다. 재시도는 첫 조각을 받기 전까지만 하며,
+        그 뒤에 끊기면 받은 데까지로 끝낸다 (이미 내보낸 조각을 되돌릴 수 없으므로).
+        """
+        model = model or self.model
+
+        def first_chunk(timeout):
+            chunks = self.backend.stream(messages, model, timeout, purpose=purpose, **params)
+            return chunks, next(chunks, None)
+
+        # 동시 호출 자리는 스트림이 끝날 때까지 잡고 있는다
+        chunks, first = self._run(first_chunk, deadline, purpose, keep_slot=True)
+        self._count("succeeded")
+        try:
+            if first is None:
+                return
+            yield first
+            yield from chunks
+        except openai.error.OpenAIError as e:
+            self.breaker.record_failure()
+            print(f"DEBUG: 오류: LLM 스트리밍 중단 ({purpose}): {e}")
+        finally:
+            self.release_slot()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def build_llm_client() -> LLMClient:
+    """settings의 LLM_* 값으로 클라이언트를 만든다."""
+    backend_name = getattr(settings, "LLM_BACKEND", "openai")
+    if backend_name == "fake":
+        backend = FakeBackend(latency=getattr(settings, "LLM_FAKE_LATENCY", 0.0))
+    elif backend_name in ("record", "replay"):
+        store = LLMRecordStore(getattr(settings, "LLM_RECORD_DIR", "llm_records"))
+        if backend_name == "record":
+            backend = RecordingBackend(store)
+        else:
+            backend = ReplayBackend(store, latency=getattr(settings, "LLM_REPLAY_LATENCY", None))
+    else:
+        backend = OpenAIBackend()
+    return LLMClient(
+        backend=backend,
+        deadline=getattr(settings, "LLM_DEADLINE_SECONDS", 30),
+        max_retries=getattr(settings, "LLM_MAX_RETRIES", 2),
+        max_concurrency=getattr(settings, "LLM_MAX_CONCURRENCY", 8),
+        breaker=CircuitBreaker(
+            failure_threshold=getattr(settings, "LLM_CIRCUIT_FAILURE_THRESHOLD", 5),
+            reset_seconds=getattr(settings, "LLM_CIRCUIT_RESET_SECONDS", 30),
+        ),
+    )
+
+
+def get_llm_client() -> LLMClient:
+    """프로세스당 하나인 공용 클라이언트 (서킷 상태와 동시 호출 상한을 모든 호출 지점이 공유)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build_llm_client()
+    return _client
+
+
+def set_llm_client(client: LLMClient | None) -> LLMClient | None:
+    """공용 클라이언트를 바꾸고 이전 클라이언트를 반환한다 (벤치마크처럼 한 프로세스에서 백엔드를 바꿔 쓸 때). None이면 다음 조회 때 settings로 새로 만든다."""
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
@@ -0,0 +1,206 @@
+# scholarships/management/commands/benchmark_recommendations.py
+import contextlib
+import datetime
+import io
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from scholarships.catalog import get_catalog_snapshot
+from scholarships.llm import build_llm_client, set_llm_client
+from scholarships.models import Scholarship
+from scholarships.ranking_cache import get_metrics as get_ranking_cache_metrics
+from scholarships.recommendation import recommend
+from scholarships.recommendation_cache import bump_catalog_version
+from scholarships.region_tree import link_scholarship_regions, sync_region_table
+from scholarships.synthetic import (
+    frontend_data_dir,
+    is_eligible,
+    load_frontend_list,
+    synthetic_catalog,
+    synthetic_profile_values,
+)
+from userinfor.models import UserScholarship
+
+BENCHMARK_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark"}}
+
+
+def _percentile(values, q: float):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else None
+
+
+def _distribution(values) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "mean": None, "max": None}
+    return {
+        "p50": round(statistics.median(values), 2),
+        "p95": round(_percentile(values, 0.95), 2),
+        "mean": round(statistics.fmean(values), 2),
+        "max": round(max(values), 2),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "합성 카탈로그와 합성 사용자로 recommend()를 끝까지 실행해 지연(p50/p95), 호출당 DB 쿼리 수, 프롬프트 토큰, "
+        "정답 자격 라벨 대비 정확도를 잽니다. 임시 테스트 DB와 로컬 메모리 캐시를 쓰므로 운영 MySQL/Redis에 접근하지 않고, "
+        "LLM은 가짜 응답(fake) 또는 녹화된 응답(replay)으로 대신합니다 (record는 실제 OpenAI를 호출하며 응답을 녹화). "
+        "결과는 JSON으로 저장되어 실행 간 비교(diff)할 수 있습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50, help="합성 사용자 수 (= 측정할 recommend() 호출 수)")
+        parser.add_argument("--catalog", type=int, default=3000, help="합성 장학금 수")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--llm", choices=["fake", "record", "replay"], default="fake",
+            help="fake: 규칙 기반 가짜 응답 / record: OpenAI 호출 + 녹화 / replay: 녹화된 응답만 사용 (네트워크 없음)",
+        )
+        parser.add_argument("--llm-records", default=None, help="녹화 디렉터리 (기본: settings.LLM_RECORD_DIR)")
+        parser.add_argument(
+            "--llm-latency", type=float, default=None,
+            help="LLM 응답마다 재현할 지연(초). fake 기본 0, replay 기본은 녹화 당시 지연",
+        )
+        parser.add_argument("--output", default="recommendation_benchmark.json", help="결과 JSON 경로")
+        parser.add_argument(
+            "--frontend-data", default=None,
+            help="majorFields.js / universities.js가 있는 디렉터리 (기본: frontend/src/data)",
+        )
+
+    def handle(self, *args, **options):
+        data_dir = options["frontend_data"] or frontend_data_dir()
+        try:
+            majors = load_frontend_list(f"{data_dir}/majorFields.js")
+            universities = load_frontend_list(f"{data_dir}/universities.js")
+        except (OSError, ValueError) as e:
+            raise CommandError(f"프론트엔드 데이터 파일을 읽을 수 없습니다 ({e}). --frontend-data로 위치를 지정하세요.")
+
+        old_name = connection.settings_dict["NAME"]
+        llm_settings = {
+            "LLM_BACKEND": options["llm"],
+            "LLM_FAKE_LATENCY": options["llm_latency"] or 0.0,
+            "LLM_REPLAY_LATENCY": options["llm_latency"],
+        }
+        if options["llm_records"]:
+            llm_settings["LLM_RECORD_DIR"] = options["llm_records"]
+        with override_settings(CACHES=BENCHMARK_CACHES, **llm_settings):
+            client = build_llm_client()
+            previous_client = set_llm_client(client)
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                report = self._run(options, client, majors, universities)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                set_llm_client(previous_client)
+
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+        self._print_summary(report["summary"])
+        self.stdout.write(f"결과 저장: {options['output']}")
+
+    def _run(self, options, client, majors, universities) -> dict:
+        # 1) 합성 데이터 (수집 파이프라인과 같은 규칙 파서로 정형화 컬럼까지 채움)
+        started = time.perf_counter()
+        catalog = synthetic_catalog(options["catalog"], options["seed"], majors)
+        Scholarship.objects.bulk_create([s for s, _ in catalog], batch_size=500)
+        criteria_by_product = {s.product_id: c for s, c in catalog}
+        ids = dict(Scholarship.objects.values_list("product_id", "id"))
+        link_scholarship_regions({ids[s.product_id]: s.region for s, _ in catalog}, sync_region_table())
+        bump_catalog_version()
+
+        User = get_user_model()
+        User.objects.bulk_create([User(username=f"benchmark{i}") for i in range(options["users"])])
+        users = list(User.objects.filter(username__startswith="benchmark").order_by("id"))
+        UserScholarship.objects.bulk_create([
+            UserScholarship(user=user, **values)
+            for user, values in zip(users, synthetic_profile_values(options["users"], options["seed"], majors, universities))
+        ])
+        profiles = list(UserScholarship.objects.order_by("user_id"))
+        setup_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        get_catalog_snapshot()
+        snapshot_ms = (time.perf_counter() - started) * 1000
+
+        # 2) 사용자마다 recommend()를 끝까지 실행 (DEBUG 출력은 -v 2 이상에서만)
+        calls = []
+        for profile in profiles:
+            eligible = {pid for pid, criteria in criteria_by_product.items() if is_eligible(criteria, profile)}
+            before = dict(client.stats)
+            quiet = contextlib.redirect_stdout(io.StringIO()) if options["verbosity"] < 2 else contextlib.nullcontext()
+            with quiet, CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                recommended = [s.product_id for s in recommend(profile.user_id)]
+                latency_ms = (time.perf_counter() - started) * 1000
+            correct = [pid for pid in recommended if pid in eligible]
+            calls.append({
+                "user_id": profile.user_id,
+                "latency_ms": round(latency_ms, 2),
+                "queries": len(queries.captured_queries),
+                "llm_calls": client.stats["calls"] - before["calls"],
+                "llm_failed": client.stats["failed"] - before["failed"],
+                "prompt_tokens": client.stats["prompt_tokens"] - before["prompt_tokens"],
+                "completion_tokens": client.stats["completion_tokens"] - before["completion_tokens"],
+                "recommended": recommended,
+                "eligible_count": len(eligible),
+                "correct": len(correct),
+                "precision": round(len(correct) / len(recommended), 3) if recommended else None,
+                "recall_at_5": round(len(correct) / min(5, len(eligible)), 3) if eligible else None,
+            })
+
+        recommended_total = sum(len(c["recommended"]) for c in calls)
+        precisions = [c["precision"] for c in calls if c["precision"] is not None]
+        recalls = [c["recall_at_5"] for c in calls if c["recall_at_5"] is not None]
+        with_llm = [c for c in calls if c["llm_calls"]]
+        summary = {
+            "calls": len(calls),
+            "latency_ms": _distribution([c["latency_ms"] for c in calls]),
+            "queries_per_call": _distribution([c["queries"] for c in calls]),
+            "prompt_tokens_per_llm_call": _distribution([c["prompt_tokens"] / c["llm_calls"] for c in with_llm]),
+            "llm_calls": sum(c["llm_calls"] for c in calls),
+            "llm_failed": sum(c["llm_failed"] for c in calls),
+            "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+            "completion_tokens": sum(c["completion_tokens"] for c in calls),
+            "precision": round(sum(c["correct"] for c in calls) / recommended_total, 3) if recommended_total else None,
+            "mean_precision": round(statistics.fmean(precisions), 3) if precisions else None,
+            "mean_recall_at_5": round(statistics.fmean(recalls), 3) if recalls else None,
+            "empty_with_eligible": sum(1 for c in calls if not c["recommended"] and c["eligible_count"]),
+            "ranking_cache": get_ranking_cache_metrics(),
+            "snapshot_build_ms": round(snapshot_ms, 2),
+            "setup_seconds": round(setup_seconds, 2),
+        }
+        return {
+            "config": {
+                "users": options["users"],
+                "catalog": options["catalog"],
+                "seed": options["seed"],
+                "llm_backend": options["llm"],
+                "llm_latency": options["llm_latency"],
+                "database": connection.vendor,
+                "run_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            },
+            "summary": summary,
+            "calls": calls,
+        }
+
+    def _print_summary(self, summary: dict):
+        latency, queries = summary["latency_ms"], summary["queries_per_call"]
+        self.stdout.write(self.style.SUCCESS(
+            f"recommend() {summary['calls']}회: 지연 p50 {latency['p50']}ms / p95 {latency['p95']}ms, "
+            f"쿼리 p50 {queries['p50']} / p95 {queries['p95']}"
+        ))
+        self.stdout.write(
+            f"LLM 호출 {summary['llm_calls']}회 (실패 {summary['llm_failed']}), 프롬프트 토큰 {summary['prompt_tokens']} "
+            f"(호출당 p50 {summary['prompt_tokens_per_llm_call']['p50']}), 완료 토큰 {summary['completion_tokens']}"
+        )
+        self.stdout.write(
+            f"정확도(정답 자격 라벨 대비): precision {summary['precision']} / 사용자 평균 {summary['mean_precision']}, "
+            f"recall@5 {summary['mean_recall_at_5']}, 자격 있는데 빈 결과 {summary['empty_with_eligible']}명"
+        )
+        self.stdout.write(f"랭킹 캐시: {summary['ranking_cache']}")
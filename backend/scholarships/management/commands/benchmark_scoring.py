@@ -0,0 +1,86 @@
+# scholarships/management/commands/benchmark_scoring.py
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from scholarships.catalog import CatalogSnapshot, get_catalog_snapshot
+from scholarships.models import Scholarship
+from scholarships.region_tree import link_scholarship_regions, sync_region_table
+from scholarships.synthetic import frontend_data_dir, load_frontend_list, synthetic_catalog, synthetic_profile_values
+from userinfor.models import UserScholarship
+
+
+class Command(BaseCommand):
+    help = (
+        "카탈로그 전체를 사용자 한 명 기준으로 점수 정렬하는 데 걸리는 시간을 잽니다 (scholarships/scoring.py). "
+        "기본은 임시 테스트 DB에 만든 합성 카탈로그(운영 규모)로 재고, --live면 현재 DB의 카탈로그로 잽니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200, help="측정할 사용자 수 (--live에서 DB 프로필이 모자라면 합성 프로필로 채움)")
+        parser.add_argument("--catalog", type=int, default=3000, help="합성 장학금 수")
+        parser.add_argument("--live", action="store_true", help="합성 카탈로그 대신 현재 DB의 카탈로그 스냅샷으로 측정 (비어 있으면 중단)")
+        parser.add_argument("--repeat", type=int, default=5, help="사용자마다 반복 측정 횟수 (최솟값 사용)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--frontend-data", default=None,
+            help="majorFields.js / universities.js가 있는 디렉터리 (기본: frontend/src/data)",
+        )
+
+    def handle(self, *args, **options):
+        data_dir = options["frontend_data"] or frontend_data_dir()
+        try:
+            majors = load_frontend_list(f"{data_dir}/majorFields.js")
+            universities = load_frontend_list(f"{data_dir}/universities.js")
+        except (OSError, ValueError) as e:
+            raise CommandError(f"프론트엔드 데이터 파일을 읽을 수 없습니다 ({e}). --frontend-data로 위치를 지정하세요.")
+
+        if options["live"]:
+            snapshot = get_catalog_snapshot()
+            if not snapshot.entries:
+                raise CommandError(
+                    "카탈로그 스냅샷이 비어 있어 측정할 수 없습니다. sync_scholarships로 카탈로그를 채우거나 --live 없이 실행하세요."
+                )
+            profiles = list(UserScholarship.objects.all()[:options["users"]])
+        else:
+            snapshot = self.synthetic_snapshot(options, majors)
+            profiles = []
+        self.stdout.write(f"카탈로그 스냅샷 v{snapshot.version}: {len(snapshot.entries)}건")
+
+        # 모자란 프로필은 프론트엔드 선택지로 만든 합성 프로필(저장하지 않음)로 채운다
+        missing = options["users"] - len(profiles)
+        if missing > 0:
+            profiles += [
+                UserScholarship(**values)
+                for values in synthetic_profile_values(missing, options["seed"], majors, universities)
+            ]
+
+        timings = []
+        for profile in profiles:
+            best = None
+            for _ in range(max(1, options["repeat"])):
+                started = time.perf_counter()
+                snapshot.rank(profile)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best * 1e6)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(self.style.SUCCESS(
+            f"전체 카탈로그 정렬 ({len(profiles)}명): p50 {statistics.median(timings):.0f}µs / "
+            f"p95 {p95:.0f}µs / 최대 {timings[-1]:.0f}µs"
+        ))
+
+    def synthetic_snapshot(self, options, majors) -> CatalogSnapshot:
+        """임시 테스트 DB에 합성 카탈로그를 넣고 스냅샷을 만든다 (운영 DB와 스냅샷 캐시는 건드리지 않음)."""
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            catalog = synthetic_catalog(options["catalog"], options["seed"], majors)
+            Scholarship.objects.bulk_create([s for s, _ in catalog], batch_size=500)
+            ids = dict(Scholarship.objects.values_list("product_id", "id"))
+            link_scholarship_regions({ids[s.product_id]: s.region for s, _ in catalog}, sync_region_table())
+            return CatalogSnapshot.build(version=0)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,142 @@
+# scholarships/management/commands/precompute_recommendations.py
+import multiprocessing
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from scholarships.bulk import BulkUpserter
+from scholarships.models import PrecomputedRecommendation
+from scholarships.llm import get_llm_client
+from scholarships.ranking_cache import get_metrics as get_ranking_cache_metrics
+from scholarships.recommendation import recommend_with_reasons
+from scholarships.recommendation_cache import cohort_features, cohort_key, get_catalog_version
+from userinfor.models import UserScholarship
+
+
+def _init_worker(semaphore):
+    """풀 워커 초기화: (spawn 방식이면) Django 설정 로드 + 공유 GPT 세마포어 지정."""
+    django.setup()
+    get_llm_client().set_concurrency_limit(semaphore)
+
+
+def _rank_cohort(key: str, features: dict):
+    """
+    코호트 대표 프로필(추천에 영향을 주는 항목만 채운 저장되지 않은 객체)로 추천을 실행해
+    응답 형식(항목마다 reason 포함)으로 직렬화한 목록과 폴백 여부를 돌려준다.
+    """
+    from scholarships.views import _serialize_with_reasons
+
+    profile = UserScholarship(**{k: v for k, v in features.items() if v is not None})
+    result = recommend_with_reasons(profile)
+    return key, _serialize_with_reasons(result), result["fallback"]
+
+
+class Command(BaseCommand):
+    help = "프로필이 있는 모든 사용자의 추천 결과를 코호트 단위로 미리 계산해 저장합니다 (읽기 경로에서 그대로 사용)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="동시에 계산할 코호트 수 (프로세스/스레드 수)")
+        parser.add_argument(
+            "--executor", choices=["process", "thread"], default="process",
+            help="process: 프로세스 풀 / thread: 스레드 풀 (Celery 워커처럼 자식 프로세스를 만들 수 없는 환경용)",
+        )
+        parser.add_argument("--gpt-concurrency", type=int, default=2, help="동시에 진행할 GPT 호출 수 상한")
+        parser.add_argument("--limit", type=int, default=None, help="처리할 사용자 수 제한 (테스트용, 지정 시 오래된 결과를 지우지 않음)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        run_started_at = timezone.now()
+        catalog_version = get_catalog_version()
+
+        # 1) 사용자 → 코호트
+        profiles = UserScholarship.objects.all().order_by("user_id")
+        if options["limit"]:
+            profiles = profiles[:options["limit"]]
+        cohorts = {}
+        members = defaultdict(int)
+        for profile in profiles.iterator():
+            key = cohort_key(profile)
+            cohorts.setdefault(key, cohort_features(profile))
+            members[key] += 1
+        user_count = sum(members.values())
+        if not user_count:
+            self.stdout.write("프로필이 있는 사용자가 없습니다.")
+            return
+        self.stdout.write(
+            f"사용자 {user_count}명 → 코호트 {len(cohorts)}개 (압축률 {user_count / len(cohorts):.1f}배), "
+            f"카탈로그 버전 v{catalog_version}"
+        )
+
+        # 2) 코호트별 추천 계산 (풀 + GPT 동시 호출 상한)
+        if options["executor"] == "process":
+            ctx = multiprocessing.get_context()
+            semaphore = ctx.BoundedSemaphore(max(1, options["gpt_concurrency"]))
+            connections.close_all()  # fork된 자식이 부모의 DB 연결을 공유하지 않도록
+            pool = ProcessPoolExecutor(
+                max_workers=max(1, options["workers"]), mp_context=ctx,
+                initializer=_init_worker, initargs=(semaphore,),
+            )
+        else:
+            get_llm_client().set_concurrency_limit(threading.BoundedSemaphore(max(1, options["gpt_concurrency"])))
+            pool = ThreadPoolExecutor(max_workers=max(1, options["workers"]))
+
+        results = {}
+        fallbacks = 0
+        with pool:
+            futures = [pool.submit(_rank_cohort, key, features) for key, features in cohorts.items()]
+            for i, future in enumerate(futures, 1):
+                try:
+                    key, scholarships, fallback = future.result()
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f"❌ 코호트 계산 실패: {e}"))
+                    continue
+                if fallback:
+                    # GPT 실패로 빠른 모드 결과가 나온 코호트는 저장하지 않는다 (읽기 경로에서 다시 계산)
+                    fallbacks += 1
+                    continue
+                results[key] = scholarships
+                if i % 50 == 0:
+                    self.stdout.write(f"  {i}/{len(futures)} 코호트 완료")
+        if options["executor"] == "thread":
+            get_llm_client().set_concurrency_limit(None)
+
+        # 3) 저장 (워커가 이미 응답 형식으로 직렬화함)
+        writer = BulkUpserter(
+            PrecomputedRecommendation,
+            update_fields=["catalog_version", "scholarships", "user_count", "computed_at"],
+            unique_field="cohort_key",
+        )
+        for key, scholarships in results.items():
+            writer.add(PrecomputedRecommendation(
+                cohort_key=key,
+                catalog_version=catalog_version,
+                scholarships=scholarships,
+                user_count=members[key],
+            ))
+        writer.close()
+
+        if not options["limit"]:
+            removed, _ = PrecomputedRecommendation.objects.filter(computed_at__lt=run_started_at).delete()
+            if removed:
+                self.stdout.write(f"더 이상 사용자가 없는 코호트 결과 {removed}개 삭제")
+
+        elapsed = time.perf_counter() - started
+        # 후보가 있는 코호트만 GPT를 호출하므로, 사용자별로 돌렸다면 (코호트 인원 - 1)번씩 더 호출했을 것
+        gpt_calls = sum(1 for scholarships in results.values() if scholarships)
+        gpt_saved = sum(members[key] - 1 for key, scholarships in results.items() if scholarships)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 사전 계산 완료: 사용자 {user_count}명 / 코호트 {len(results)}개 / {elapsed:.1f}s "
+            f"({user_count / elapsed if elapsed else 0:.1f}명/s)"
+            + (f", GPT 실패로 저장하지 않은 코호트 {fallbacks}개" if fallbacks else "")
+        ))
+        self.stdout.write(
+            f"코호트 압축률 {user_count / len(cohorts):.2f}배, GPT 호출 {gpt_calls}회 (절약 {gpt_saved}회), "
+            f"{writer.summary()}"
+        )
+        self.stdout.write(f"GPT 랭킹 코호트 캐시 누적 지표: {get_ranking_cache_metrics()}")
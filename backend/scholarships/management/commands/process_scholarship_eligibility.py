@@ -0,0 +1,97 @@
+# scholarships/management/commands/process_scholarship_eligibility.py
+from collections import Counter, defaultdict
+from django.core.management.base import BaseCommand
+from scholarships.models import Scholarship
+from scholarships.eligibility import (
+    OpenAIEligibilityExtractor,
+    apply_thresholds,
+    parse_grade_criteria,
+    parse_income_criteria,
+    CONFIDENCE_LOW,
+    CONFIDENCE_MEDIUM,
+)
+from scholarships.ratelimit import TokenBucket
+from scholarships.recommendation_cache import bump_catalog_version
+
+ELIGIBILITY_FIELDS = ["min_gpa", "gpa_scale", "max_income_decile", "academic_year_mask", "eligibility_confidence"]
+
+
+class Command(BaseCommand):
+    help = "장학금의 성적/소득/학년 기준 원문을 정형화된 기준 컬럼(최소 평점, 최대 소득분위, 대상 학기)으로 변환합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="이미 처리된 장학금까지 규칙으로 다시 추출 (GPT 보완값은 지워짐)")
+        parser.add_argument("--llm", action="store_true", help="규칙으로 못 읽은(신뢰도 낮음) 항목을 GPT로 보완")
+        parser.add_argument("--batch-size", type=int, default=20, help="GPT 요청 하나에 묶을 고유 원문 수")
+        parser.add_argument("--rpm", type=float, default=300, help="분당 최대 GPT 요청 수")
+
+    def handle(self, *args, **options):
+        # 1) 규칙 기반 추출 (수집 시 sync_scholarships가 이미 채우므로 보통은 새 컬럼 도입 직후나 --all일 때만 할 일이 있음)
+        qs = Scholarship.objects.all() if options["all"] else Scholarship.objects.filter(eligibility_confidence="")
+        confidences = Counter()
+        batch = []
+        for scholarship in qs.only("id", "grade_criteria_details", "income_criteria_details", "academic_year_type").iterator(chunk_size=1000):
+            confidences[apply_thresholds(scholarship).confidence] += 1
+            batch.append(scholarship)
+            if len(batch) >= 1000:
+                Scholarship.objects.bulk_update(batch, ELIGIBILITY_FIELDS)
+                batch = []
+        Scholarship.objects.bulk_update(batch, ELIGIBILITY_FIELDS)
+        changed = sum(confidences.values())
+        self.stdout.write(f"규칙 기반 추출: {changed}건 {dict(confidences)}")
+
+        # 2) GPT 보완: 같은 (성적, 소득) 원문 쌍은 한 번만 보낸다
+        if options["llm"]:
+            changed += self.fill_with_llm(max(1, options["batch_size"]), options["rpm"])
+
+        if changed:
+            self.stdout.write(f"추천 캐시 카탈로그 버전 → {bump_catalog_version()}")
+        remaining = Scholarship.objects.filter(eligibility_confidence=CONFIDENCE_LOW).count()
+        self.stdout.write(self.style.SUCCESS(f"✅ 완료. 미해석 항목이 남은 장학금 {remaining}개"))
+
+    def fill_with_llm(self, batch_size: int, rpm: float) -> int:
+        ids_by_texts = defaultdict(list)
+        for pk, grade, income in Scholarship.objects.filter(eligibility_confidence=CONFIDENCE_LOW).values_list(
+            "id", "grade_criteria_details", "income_criteria_details"
+        ):
+            ids_by_texts[(grade or "", income or "")].append(pk)
+        pairs = list(ids_by_texts)
+        self.stdout.write(f"GPT 보완 대상: 장학금 {sum(len(v) for v in ids_by_texts.values())}개 (고유 원문 {len(pairs)}개)")
+
+        extractor = OpenAIEligibilityExtractor(log=lambda msg: self.stdout.write(self.style.ERROR(msg)))
+        bucket = TokenBucket(rpm)
+        updated = 0
+        for start in range(0, len(pairs), batch_size):
+            chunk = pairs[start:start + batch_size]
+            bucket.acquire()
+            results = extractor.extract_batch(dict(enumerate(chunk)))
+
+            rows = []
+            for i, (min_gpa, gpa_scale, max_decile) in results.items():
+                grade, income = chunk[i]
+                # 규칙으로 확정된 항목은 그대로 두고, 못 읽은 항목만 GPT 값으로 채운다
+                rule_gpa, rule_scale, grade_ok = parse_grade_criteria(grade)
+                rule_decile, income_ok = parse_income_criteria(income)
+                if grade_ok:
+                    min_gpa, gpa_scale = rule_gpa, rule_scale
+                if income_ok:
+                    max_decile = rule_decile
+                rows.extend(
+                    Scholarship(
+                        id=pk,
+                        min_gpa=min_gpa,
+                        gpa_scale=gpa_scale,
+                        max_income_decile=max_decile,
+                        eligibility_confidence=CONFIDENCE_MEDIUM,
+                    )
+                    for pk in ids_by_texts[chunk[i]]
+                )
+            Scholarship.objects.bulk_update(rows, ["min_gpa", "gpa_scale", "max_income_decile", "eligibility_confidence"])
+            updated += len(rows)
+            self.stdout.write(f"  GPT 보완 저장: 누적 {updated}건 (응답 누락 {len(chunk) - len(results)}개는 다음 실행에서 재시도)")
+
+        self.stdout.write(
+            f"GPT 요청 {extractor.request_count}회, 프롬프트 토큰 {extractor.prompt_tokens}, "
+            f"출력 토큰 {extractor.completion_tokens}"
+        )
+        return updated
@@ -1,77 +1,221 @@
 # scholarships/management/commands/process_scholarship_regions.py
-import openai
-import os
 import time
-from django.conf import settings
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from django.core.management.base import BaseCommand
-from scholarships.models import Scholarship
+from django.db import transaction
+from scholarships.models import Scholarship, RegionResolution
+from scholarships.regions import get_resolver
+from scholarships.region_cache import lookup_residency_region, store_residency_region, get_metrics
+from scholarships.region_extraction import OpenAIRegionExtractor, FakeRegionExtractor, plan_batches
+from scholarships.ratelimit import TokenBucket
+from scholarships.region_tree import sync_region_table, link_scholarship_regions
+from scholarships.recommendation_cache import bump_catalog_version
+
 
-# 중요: settings.py에서 API 키를 불러오도록 수정하는 것을 강력히 권장합니다.
-openai.api_key = settings.OPENAI_API_KEY
 class Command(BaseCommand):
     help = "GPT를 사용하여 장학금의 비정형 지역 텍스트를 정형화된 지역명으로 변환합니다."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--coverage", action="store_true",
+            help="DB에 쓰지 않고, 규칙 기반 파서가 네트워크 호출 없이 처리하는 비율만 리포트합니다.",
+        )
+        parser.add_argument("--all", action="store_true", help="--coverage 시 처리 완료된 장학금까지 포함")
+        parser.add_argument("--workers", type=int, default=8, help="동시에 진행할 GPT 호출 수")
+        parser.add_argument("--rpm", type=float, default=300, help="분당 최대 GPT 요청 수 (API 한도에 맞춰 설정)")
+        parser.add_argument(
+            "--flush-every", type=int, default=50,
+            help="처리 결과를 몇 건마다 bulk_update로 저장할지 (중단 시 저장된 지점부터 재개)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=25,
+            help="한 요청에 묶을 최대 원문 수 (1이면 원문마다 개별 요청)",
+        )
+        parser.add_argument(
+            "--batch-token-budget", type=int, default=4000,
+            help="배치 요청 하나의 최대 토큰 수 (시스템 프롬프트 + 입력 + 예상 출력)",
+        )
+        parser.add_argument(
+            "--max-requeue", type=int, default=2,
+            help="배치 응답에서 빠진 원문을 다시 요청할 최대 횟수",
+        )
+        parser.add_argument(
+            "--fake-llm-latency", type=float, default=None,
+            help="지정하면 OpenAI 대신 이 지연(초)을 갖는 가짜 추출기를 사용합니다 (오프라인 벤치마크용).",
+        )
+        parser.add_argument(
+            "--fake-llm-drop-rate", type=float, default=0.0,
+            help="가짜 추출기가 배치 응답에서 항목을 빠뜨릴 비율 (재요청 경로 확인용)",
+        )
+
     def handle(self, *args, **options):
-        # 아직 처리되지 않은 장학금만 대상으로 함
-        scholarships_to_process = Scholarship.objects.filter(is_region_processed=False)
-        
-        self.stdout.write(f"총 {scholarships_to_process.count()}개의 장학금 지역 정보를 처리합니다.")
-
-        for scholarship in scholarships_to_process:
-            text_to_process = scholarship.residency_requirement_details
-            
-            if not text_to_process or text_to_process.strip() in ["", "해당없음", "없음"]:
-                processed_regions = "전국"
-            else:
-                processed_regions = self.get_regions_from_gpt(text_to_process)
+        if options["coverage"]:
+            return self.report_coverage(include_processed=options["all"])
 
-            scholarship.region = processed_regions
-            scholarship.is_region_processed = True
-            scholarship.save(update_fields=['region', 'is_region_processed'])
+        if options["fake_llm_latency"] is not None:
+            extractor = FakeRegionExtractor(
+                latency=options["fake_llm_latency"], drop_rate=options["fake_llm_drop_rate"]
+            )
+        else:
+            extractor = OpenAIRegionExtractor(log=lambda msg: self.stdout.write(self.style.ERROR(msg)))
+        bucket = TokenBucket(options["rpm"])
+        batch_size = max(1, options["batch_size"])
 
-            self.stdout.write(self.style.SUCCESS(
-                f"✅ '{scholarship.name}' 처리 완료: -> '{processed_regions}'"
-            ))
-            time.sleep(0.5)
-
-
-        self.stdout.write(self.style.SUCCESS("모든 장학금 지역 정보 처리가 완료되었습니다."))
-
-    def get_regions_from_gpt(self, text: str) -> str:
-        # --- [핵심 수정] ---
-        # 시스템 프롬프트를 새롭고 정교한 버전으로 교체합니다.
-        system_prompt = """
-        당신은 한국 행정구역 전문가이며, 장학금 공고문에서 지역 조건을 분석하는 AI입니다.
-        주어진 텍스트에서 해당하는 모든 지역명을 '특별시/광역시/도' 뿐만 아니라 '시/군/구' 단위까지 포함하여, **가장 구체적인 전체 경로(full path)로** 쉼표(,)로 구분된 단일 문자열로 반환해야 합니다.
-
-        **규칙 및 예시:**
-        1.  **전체 경로로 변환:** '영월군' -> '강원도 영월군', '수원시' -> '경기도 수원시'
-        2.  **약어 변환:** '서울' -> '서울특별시', '충남' -> '충청남도'
-        3.  **복합 경로 처리:** '충청남북도' -> '충청남도,충청북도'
-        4.  **구체적인 주소 유지:**
-            - "강원도 영월군 주천면" -> "강원도 영월군 주천면"
-            - "전라남도 화순군 거주" -> "전라남도 화순군"
-        5.  **예외 조건 처리:**
-            - "서울, 광역시 제외 전국" -> 경기도,강원도,충청북도,충청남도,전라북도,전라남도,경상북도,경상남도,제주특별자치도,세종특별자치시
-            - "온라인 과정 이수자" 또는 "해외 유학생" -> "온라인" 또는 "해외"
-        6.  **지역명 미포함 시:** 특정 지역이 명시되지 않았으면 "전국"으로 간주합니다.
-        7.  **출력 형식:** 다른 설명 없이 오직 쉼표로 구분된 지역명 문자열만 반환하세요.
-
-        이제 분석을 시작합니다.
-        """
-        # --- [수정 끝] ---
-        
+        def call_gpt(texts):
+            """원문 목록 → {원문: 지역}. 응답에 없는(실패한) 원문은 결과에서 빠진다."""
+            bucket.acquire()
+            if batch_size == 1:
+                region = extractor.extract(texts[0])
+                return {texts[0]: region} if region else {}
+            results = extractor.extract_batch(dict(enumerate(texts)))
+            return {texts[i]: region for i, region in results.items()}
+
+        # 아직 처리되지 않은 장학금만 대상으로 함 (이전 실행이 중단됐다면 저장된 지점 이후부터 재개됨)
+        # 처리/GPT 호출 순서가 실행마다 같아야 녹화(record)한 응답을 재생(replay)할 수 있다
+        pending_rows = Scholarship.objects.filter(is_region_processed=False).order_by("id").values_list(
+            "id", "residency_requirement_details"
+        )
+        ids_by_text = defaultdict(list)
+        for pk, text in pending_rows:
+            ids_by_text[text or ""].append(pk)
+        total = sum(len(ids) for ids in ids_by_text.values())
+        self.stdout.write(f"총 {total}개의 장학금 지역 정보를 처리합니다. (고유 원문 {len(ids_by_text)}개)")
+
+        self.sources = Counter()
+        self.done = 0
+        self.buffer = []
+        self.region_ids = sync_region_table()
+        started = time.perf_counter()
+
+        # 1) 캐시/규칙으로 바로 끝나는 원문은 메인 스레드에서 처리하고, GPT가 필요한 것만 모은다
+        gpt_jobs = []
+        for text, ids in ids_by_text.items():
+            normalized, resolved = lookup_residency_region(text)
+            if resolved is None:
+                gpt_jobs.append((normalized, ids))
+            else:
+                self.record(ids, resolved.region, resolved.source, options["flush_every"])
+        self.flush()
+        self.stdout.write(f"캐시/규칙으로 {self.done}건 처리, GPT 대상 고유 원문 {len(gpt_jobs)}개")
+
+        # 2) GPT 호출은 원문을 토큰 예산 안에서 배치로 묶어 스레드 풀 + 토큰 버킷으로 동시에 보내고,
+        #    결과 저장은 메인 스레드에서 모아서 한다. 응답에서 빠진 원문은 다음 라운드에 다시 묶어 보낸다.
+        ids_by_normalized = dict(gpt_jobs)
+        pending = list(ids_by_normalized)
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text}
-                ],
-                temperature=0.0
-            )
-            result = response.choices[0].message['content'].strip()
-            return result.split('\n')[0]
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"GPT API 호출 중 오류 발생: {e}"))
-            return ""
\ No newline at end of file
+            with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+                for round_no in range(options["max_requeue"] + 1):
+                    if not pending:
+                        break
+                    batches = list(plan_batches(pending, options["batch_token_budget"], batch_size))
+                    if round_no:
+                        self.stdout.write(f"누락된 원문 {len(pending)}개를 {len(batches)}개 요청으로 다시 보냅니다.")
+                    futures = {pool.submit(call_gpt, batch): batch for batch in batches}
+                    missing = []
+                    try:
+                        not_done = set(futures)
+                        while not_done:
+                            finished, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                results = future.result()
+                                for normalized in futures[future]:
+                                    if normalized not in results:
+                                        missing.append(normalized)
+                                        continue
+                                    region = store_residency_region(
+                                        normalized, results[normalized], RegionResolution.SOURCE_GPT
+                                    )
+                                    self.record(ids_by_normalized[normalized], region, "gpt", options["flush_every"])
+                    except KeyboardInterrupt:
+                        for future in futures:
+                            future.cancel()
+                        raise
+                    # 완료 순서는 스레드마다 달라지므로 원래 순서대로 다시 묶는다
+                    missing = set(missing)
+                    pending = [normalized for normalized in pending if normalized in missing]
+            for normalized in pending:
+                self.record(ids_by_normalized[normalized], "", "gpt", options["flush_every"])
+        except KeyboardInterrupt:
+            self.finish()
+            self.stdout.write(self.style.WARNING(
+                f"중단됨: {self.done}/{total}건까지 저장했습니다. 다시 실행하면 나머지부터 이어서 처리합니다."
+            ))
+            return
+        self.finish()
+
+        elapsed = time.perf_counter() - started
+        summary = ", ".join(f"{k} {v}건" for k, v in self.sources.most_common())
+        self.stdout.write(self.style.SUCCESS(
+            f"모든 장학금 지역 정보 처리가 완료되었습니다. ({summary}) "
+            f"{elapsed:.1f}s, {self.done / elapsed if elapsed else 0:.1f}건/s, 레이트 리밋 대기 {bucket.wait_time:.1f}s"
+        ))
+        self.stdout.write(
+            f"GPT 요청 {extractor.request_count}회, 프롬프트 토큰 {extractor.prompt_tokens}, "
+            f"출력 토큰 {extractor.completion_tokens}"
+        )
+        stats = extractor.client.stats
+        self.stdout.write(
+            f"LLM 재시도 {stats['retries']}회, 실패 {stats['failed']}회, 서킷 차단 {stats['short_circuited']}회 "
+            f"(서킷 상태: {extractor.client.breaker.state})"
+        )
+        self.stdout.write(f"지역 캐시 누적 지표: {get_metrics()}")
+
+    def record(self, ids, region, source, flush_every):
+        if not region:
+            # GPT 호출 실패 → 처리 완료로 표시하지 않고 다음 실행에서 다시 시도
+            self.sources["failed"] += len(ids)
+            self.stdout.write(self.style.WARNING(f"⚠️ 지역 해석 실패 ({len(ids)}건), 다음 실행으로 미룹니다."))
+            return
+        self.sources[source] += len(ids)
+        self.buffer.extend(Scholarship(id=pk, region=region, is_region_processed=True) for pk in ids)
+        if len(self.buffer) >= flush_every:
+            self.flush()
+
+    def flush(self):
+        """버퍼에 모인 결과를 한 번에 저장한다. 저장된 행은 is_region_processed=True라 재실행 시 건너뛴다."""
+        if not self.buffer:
+            return
+        with transaction.atomic():
+            Scholarship.objects.bulk_update(self.buffer, ["region", "is_region_processed"], batch_size=500)
+            link_scholarship_regions({s.id: s.region for s in self.buffer}, self.region_ids)
+        self.done += len(self.buffer)
+        self.stdout.write(f"  저장: 누적 {self.done}건")
+        self.buffer = []
+
+    def finish(self):
+        """남은 버퍼를 저장하고, 이번 실행에서 저장한 행이 있으면 카탈로그 버전을 한 번만 올린다.
+        (flush마다 올리면 실행 내내 추천 캐시·사전 계산 결과·워커 스냅샷이 계속 무효화된다)"""
+        self.flush()
+        if self.done:
+            bump_catalog_version()  # 지역이 채워진 장학금이 추천 후보에 들어오므로 추천 캐시 무효화
+
+    def report_coverage(self, include_processed: bool):
+        resolver = get_resolver()
+        qs = Scholarship.objects.all() if include_processed else Scholarship.objects.filter(is_region_processed=False)
+        texts = list(qs.values_list("residency_requirement_details", flat=True))
+        if not texts:
+            self.stdout.write("대상 장학금이 없습니다.")
+            return
+
+        reasons = Counter()
+        escalated_examples = Counter()
+        started = time.perf_counter()
+        for text in texts:
+            result = resolver.resolve(text)
+            reasons[result.reason] += 1
+            if result.regions is None:
+                escalated_examples[(text or "").strip()[:60]] += 1
+        elapsed = time.perf_counter() - started
+
+        resolved = sum(n for reason, n in reasons.items() if reason in ("empty", "no_region", "matched"))
+        self.stdout.write(self.style.SUCCESS(
+            f"규칙 기반 처리율: {resolved}/{len(texts)} ({resolved / len(texts):.1%}), "
+            f"고유 텍스트 {len(set(texts))}개, 평균 {elapsed / len(texts) * 1e6:.1f}µs/건"
+        ))
+        for reason, n in reasons.most_common():
+            self.stdout.write(f"  - {reason}: {n}")
+        if escalated_examples:
+            self.stdout.write("GPT로 넘어가는 주요 텍스트:")
+            for text, n in escalated_examples.most_common(10):
+                self.stdout.write(f"  {n:4d} × {text}")
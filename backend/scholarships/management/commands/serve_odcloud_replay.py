@@ -0,0 +1,79 @@
+# scholarships/management/commands/serve_odcloud_replay.py
+import glob
+import json
+import os
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "sync_scholarships --record-dir 로 저장한 odcloud 응답 페이지를 로컬 HTTP 서버로 재생합니다. "
+        "네트워크 없이 수집 단계의 속도를 비교할 때 사용합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", required=True, help="page_XXXX.json 파일이 저장된 디렉터리")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--latency", type=float, default=0.3,
+            help="요청마다 추가할 인위적 지연(초). 실제 API 왕복 시간을 흉내냅니다.",
+        )
+
+    def handle(self, *args, **options):
+        pages = {}
+        for path in glob.glob(os.path.join(options["dir"], "page_*.json")):
+            m = re.search(r"page_(\d+)\.json$", path)
+            if not m:
+                continue
+            with open(path, encoding="utf-8") as f:
+                pages[int(m.group(1))] = json.load(f)
+        if not pages:
+            raise CommandError(f"{options['dir']}에 재생할 페이지가 없습니다.")
+
+        latency = options["latency"]
+        template = pages[min(pages)]
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive 지원
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                try:
+                    page = int(query.get("page", ["1"])[0])
+                except ValueError:
+                    page = 1
+                payload = pages.get(page) or {**template, "page": page, "currentCount": 0, "data": []}
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+                if latency > 0:
+                    time.sleep(latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((options["host"], options["port"]), ReplayHandler)
+        server.daemon_threads = True
+        self.stdout.write(self.style.SUCCESS(
+            f"odcloud 재생 서버 시작: http://{options['host']}:{options['port']}/ "
+            f"(페이지 {len(pages)}개, 지연 {latency:.2f}s)"
+        ))
+        self.stdout.write(
+            f"예) python manage.py sync_scholarships --api-url http://{options['host']}:{options['port']}/ --fetch-only"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -1,12 +1,61 @@
 from django.core.management.base import BaseCommand
-from scholarships.models import Scholarship, RawScholarship
-import requests
+from scholarships.models import Scholarship, RawScholarship, SyncChangeSet
+from scholarships.odcloud import API_URL, OdcloudPageFetcher
+from scholarships.bulk import BulkUpserter
+from scholarships.recommendation_cache import bump_catalog_version
+from scholarships.eligibility import apply_thresholds, CONFIDENCE_HIGH, CONFIDENCE_MEDIUM
+from scholarships.qualifications import apply_qualification_flags, qualification_flags
+from scholarships.region_cache import apply_residency_text_hash
+import hashlib
+import json
+import time
 from datetime import datetime
 from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
 
-API_URL = "https://api.odcloud.kr/api/15028252/v1/uddi:ccd5ddd5-754a-4eb8-90f0-cb9bce54870b"
 SERVICE_KEY = settings.SERVICE_KEY
 
+# RawScholarship → Scholarship 으로 그대로 복사되는 컬럼
+SCHOLARSHIP_COPY_FIELDS = [
+    "name",
+    "foundation_name",
+    "recruitment_start",
+    "recruitment_end",
+    "university_type",
+    "product_type",
+    "grade_criteria_details",
+    "income_criteria_details",
+    "support_details",
+    "specific_qualification_details",
+    "residency_requirement_details",
+    "selection_method_details",
+    "number_of_recipients_details",
+    "eligibility_restrictions",
+    "required_documents_details",
+    "recommendation_required",
+    "major_field",
+    "academic_year_type",
+    "managing_organization_type",
+]
+
+# eligibility.apply_thresholds가 원문에서 채우는 정형화 기준 컬럼
+ELIGIBILITY_FIELDS = ["min_gpa", "gpa_scale", "max_income_decile", "academic_year_mask", "eligibility_confidence"]
+
+
+def content_fingerprint(raw: "RawScholarship", fields: list[str]) -> str:
+    """정규화된 API 필드 값으로 계산한 SHA-256. 값이 같으면 upstream 내용이 바뀌지 않은 것으로 본다."""
+    values = {}
+    for f in fields:
+        v = getattr(raw, f)
+        if isinstance(v, str):
+            v = v.strip()
+        elif hasattr(v, "isoformat"):
+            v = v.isoformat()
+        values[f] = v if v != "" else None
+    payload = json.dumps(values, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
 # ---------- URL 유틸 ----------
 def normalize_url(u: str | None) -> str | None:
@@ -39,134 +88,312 @@ def pick_homepage(item: dict) -> str | None:
 class Command(BaseCommand):
     help = "공공 API에서 장학금 정보를 가져와 RawScholarship에 저장하고, 이를 기반으로 Scholarship 테이블을 동기화합니다."
 
+    def add_arguments(self, parser):
+        parser.add_argument("--api-url", default=API_URL, help="odcloud API 주소 (로컬 재생 서버로 바꿔 벤치마크 가능)")
+        parser.add_argument("--per-page", type=int, default=100, help="페이지당 항목 수")
+        parser.add_argument("--concurrency", type=int, default=4, help="동시에 요청할 페이지 수")
+        parser.add_argument("--max-retries", type=int, default=3, help="페이지별 최대 재시도 횟수")
+        parser.add_argument("--backoff", type=float, default=0.5, help="재시도 백오프 기본 간격(초)")
+        parser.add_argument("--record-dir", default=None, help="받은 페이지 응답을 JSON으로 저장할 디렉터리 (serve_odcloud_replay 용)")
+        parser.add_argument("--fetch-only", action="store_true", help="수집만 하고 DB에는 쓰지 않음 (수집 단계 벤치마크용)")
+        parser.add_argument("--chunk-size", type=int, default=500, help="bulk upsert 한 번에 쓸 행 수")
+        parser.add_argument("--full", action="store_true", help="변경 여부와 관계없이 모든 RawScholarship을 Scholarship으로 다시 반영")
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.NOTICE("API에서 원본 장학금 데이터를 가져오는 중..."))
-        page = 1
 
         # 모델 필드 존재 여부(동적으로 체크해 존재하는 컬럼에만 채움)
         raw_fields = {f.name for f in RawScholarship._meta.get_fields()}
         sch_fields = {f.name for f in Scholarship._meta.get_fields()}
 
         # ---------- 1단계: RawScholarship 적재 ----------
-        while True:
-            url = f"{API_URL}?serviceKey={SERVICE_KEY}&page={page}&perPage=100&returnType=JSON"
-            try:
-                response = requests.get(url, timeout=30)
-                response.raise_for_status()
-            except requests.exceptions.RequestException as e:
-                self.stdout.write(self.style.ERROR(f"API 요청 실패: {e}"))
-                break
-
-            data = response.json().get("data", [])
-            if not data:
-                break
-
-            for item in data:
-                try:
-                    product_name = (item.get("상품명") or "").strip()
-                    org_name = (item.get("운영기관명") or "").strip()
-
-                    if not product_name or not org_name:
-                        self.stdout.write(self.style.WARNING(f"⚠️ '상품명' 또는 '운영기관명'이 없어 스킵: {item}"))
-                        continue
-
-                    product_id = f"{product_name}_{org_name}"
-                    recruitment_start_parsed = self.safe_parse_date(item.get("모집시작일"))
-                    recruitment_end_parsed = self.safe_parse_date(item.get("모집종료일"))
-
-                    defaults = {
-                        "name": product_name,
-                        "foundation_name": org_name,
-                        "recruitment_start": recruitment_start_parsed,
-                        "recruitment_end": recruitment_end_parsed,
-                        "university_type": item.get("대학구분", ""),
-                        "product_type": item.get("학자금유형구분", ""),
-                        "grade_criteria_details": item.get("성적기준 상세내용", ""),
-                        "income_criteria_details": item.get("소득기준 상세내용", ""),
-                        "support_details": item.get("지원내역 상세내용", ""),
-                        "specific_qualification_details": item.get("특정자격 상세내용", ""),
-                        "residency_requirement_details": item.get("지역거주여부 상세내용", ""),
-                        "selection_method_details": item.get("선발방법 상세내용", ""),
-                        "number_of_recipients_details": item.get("선발인원 상세내용", ""),
-                        "eligibility_restrictions": item.get("자격제한 상세내용", ""),
-                        "required_documents_details": item.get("제출서류 상세내용", ""),
-                        "recommendation_required": item.get("추천필요여부 상세내용", "") == "필요",
-                        "major_field": item.get("학과구분", ""),
-                        "academic_year_type": item.get("학년구분", ""),
-                        "managing_organization_type": item.get("운영기관구분", ""),
-                    }
-
-                    # ✅ 홈페이지 URL 추출 → RawScholarship에 저장
-                    homepage = pick_homepage(item)
-                    if homepage:
-                        if "url" in raw_fields:
-                            defaults["url"] = homepage
-                        elif "homepage_url" in raw_fields:
-                            defaults["homepage_url"] = homepage
-
-                    RawScholarship.objects.update_or_create(
-                        product_id=product_id,
-                        defaults=defaults,
-                    )
-                except Exception as e:
-                    self.stdout.write(self.style.WARNING(f"❌ RawScholarship 저장 중 오류: {e}"))
-
-            self.stdout.write(f"페이지 {page} 저장 완료...")
-            page += 1
+        fetcher = OdcloudPageFetcher(
+            SERVICE_KEY,
+            api_url=options["api_url"],
+            per_page=options["per_page"],
+            concurrency=options["concurrency"],
+            max_retries=options["max_retries"],
+            backoff=options["backoff"],
+            record_dir=options["record_dir"],
+        )
+        url_field = "url" if "url" in raw_fields else ("homepage_url" if "homepage_url" in raw_fields else None)
+        self.hashed_fields = SCHOLARSHIP_COPY_FIELDS + ([url_field] if url_field else [])
+        self.raw_url_field = url_field
+        raw_writer = BulkUpserter(
+            RawScholarship,
+            update_fields=self.hashed_fields + ["content_hash"],
+            chunk_size=options["chunk_size"],
+            fingerprint_field="content_hash",
+            track_keys=True,
+            prepare=self.preserve_raw_urls if url_field else None,
+            log=self.stdout.write,
+        )
+        changeset = None if options["fetch_only"] else SyncChangeSet.objects.create()
+        fetch_started = time.perf_counter()
+        page_count = 0
+        item_count = 0
+        failed_pages = []
+        try:
+            for page, data, error in fetcher.iter_pages():
+                if error:
+                    failed_pages.append(page)
+                    self.stdout.write(self.style.ERROR(f"API 요청 실패: {error}"))
+                    continue
+
+                page_count += 1
+                item_count += len(data)
+                if options["fetch_only"]:
+                    continue
+
+                for item in data:
+                    self.add_raw_item(raw_writer, item, url_field)
+
+                self.stdout.write(f"페이지 {page} 수집 완료...")
+            raw_writer.close()
+        finally:
+            fetcher.close()
+
+        elapsed = time.perf_counter() - fetch_started
+        self.stdout.write(
+            f"수집 통계: 페이지 {page_count}개 / 항목 {item_count}개 / 요청 {fetcher.request_count}회 "
+            f"(재시도 {fetcher.retry_count}회) / {elapsed:.2f}s (동시 요청 {fetcher.concurrency})"
+        )
+        if failed_pages:
+            self.stdout.write(self.style.WARNING(f"⚠️ 실패한 페이지: {failed_pages}"))
+        if options["fetch_only"]:
+            return
+        self.stdout.write(raw_writer.summary())
+
+        # ---------- 변경 내역(change-set) 기록 ----------
+        changeset.inserted = raw_writer.created_keys
+        changeset.updated = raw_writer.updated_keys
+        changeset.unchanged = raw_writer.unchanged_keys
+        changeset.is_complete = not failed_pages
+        if changeset.is_complete:
+            # 일부 페이지가 실패했다면 '사라짐'을 판단할 수 없으므로 전체 수집에 성공했을 때만 계산
+            seen = set(raw_writer.created_keys) | set(raw_writer.updated_keys) | set(raw_writer.unchanged_keys)
+            changeset.disappeared = sorted(
+                pid for pid in RawScholarship.objects.values_list("product_id", flat=True).iterator()
+                if pid not in seen
+            )
+        changeset.finished_at = timezone.now()
+        changeset.save()
+        self.stdout.write(f"변경 내역 #{changeset.pk}: {changeset}")
 
         self.stdout.write("\n✅ 원본 데이터 동기화 완료. 이제 추천 시스템 데이터를 가공합니다.")
 
         # ---------- 2단계: Scholarship 동기화 ----------
-        created_count = 0
-        updated_count = 0
-        raw_scholarships = RawScholarship.objects.all()
-
-        for raw_item in raw_scholarships:
-            try:
-                # 마감일 지난 장학금 제외
-                if raw_item.recruitment_end and raw_item.recruitment_end < datetime.now().date():
-                    continue
+        sch_url_field = "url" if "url" in sch_fields else None
+        self.sch_url_field = sch_url_field
+        scholarship_writer = BulkUpserter(
+            Scholarship,
+            update_fields=SCHOLARSHIP_COPY_FIELDS + ["region", "is_region_processed", "residency_text_hash"] + ELIGIBILITY_FIELDS + list(qualification_flags()) + ([sch_url_field] if sch_url_field else []),
+            chunk_size=options["chunk_size"],
+            prepare=self.prepare_scholarships,
+            log=self.stdout.write,
+        )
+        self.region_reused = 0
+        self.region_requeued = 0
+        self.eligibility_unresolved = 0
+        self.eligibility_reused = 0
+
+        # 필요한 컬럼만 dict로 읽는다 (모델 인스턴스 생성 비용/메모리 절감)
+        raw_url_field = "url" if "url" in raw_fields else ("homepage_url" if "homepage_url" in raw_fields else None)
+        columns = ["id", "product_id"] + SCHOLARSHIP_COPY_FIELDS + ([raw_url_field] if raw_url_field else [])
+
+        promote_started = time.perf_counter()
+        promoted = 0
+        for row in self.iter_promotion_rows(changeset, options["full"], options["chunk_size"], columns):
+            scholarship = Scholarship(
+                product_id=row["product_id"],
+                region="",
+                is_region_processed=False,
+                **{f: row[f] for f in SCHOLARSHIP_COPY_FIELDS},
+            )
+            # 성적/소득/학년 기준은 규칙 기반 파서로 바로 정형화 (GPT 보완은 process_scholarship_eligibility --llm)
+            apply_thresholds(scholarship)
+            apply_qualification_flags(scholarship)  # 다문화/한부모/다자녀/국가유공자 대상 여부 (키워드)
+            apply_residency_text_hash(scholarship)  # 지역 해석 캐시 항목 → 장학금 조회용
+
+            # ✅ Raw의 URL → Scholarship.url로 복사(필드가 있을 때만)
+            if sch_url_field and raw_url_field:
+                setattr(scholarship, sch_url_field, normalize_url(row[raw_url_field]))
+
+            scholarship_writer.add(scholarship)
+            promoted += 1
+        scholarship_writer.close()
+
+        promote_elapsed = time.perf_counter() - promote_started
+        self.stdout.write(
+            f"반영 통계: {promoted}행 / {promote_elapsed:.2f}s "
+            f"({promoted / promote_elapsed if promote_elapsed else 0:.0f}행/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"\n✅ 동기화 완료: {scholarship_writer.summary()}"))
+        if scholarship_writer.created or scholarship_writer.updated:
+            self.stdout.write(f"추천 캐시 카탈로그 버전 → {bump_catalog_version()}")
+        self.stdout.write(
+            f"지역 정보: 재사용 {self.region_reused}개 / 재처리 대기 {self.region_requeued}개 "
+            f"(process_scholarship_regions 대상)"
+        )
+        self.stdout.write(
+            f"자격 기준: GPT 보완값 유지 {self.eligibility_reused}개 / 규칙 미해석 {self.eligibility_unresolved}개 "
+            f"(process_scholarship_eligibility --llm 대상)"
+        )
+
+    def prepare_scholarships(self, rows: list[Scholarship]):
+        self.preserve_regions(rows)
+        self.preserve_eligibility(rows)
+        if self.sch_url_field:
+            self.preserve_urls(Scholarship, rows, self.sch_url_field)
+
+    def preserve_raw_urls(self, rows: list[RawScholarship]):
+        # URL을 되살린 행은 지문도 다시 계산해야 이전 실행과 같은 내용이 '변경 없음'으로 잡힌다
+        for raw in self.preserve_urls(RawScholarship, rows, self.raw_url_field):
+            raw.content_hash = content_fingerprint(raw, self.hashed_fields)
+
+    @staticmethod
+    def preserve_urls(model, rows: list, url_field: str) -> list:
+        """
+        이번 응답에서 홈페이지 주소를 못 읽은 행(None)은 DB에 있던 URL을 그대로 둔다 (NULL로 덮어쓰지 않음).
+        URL을 되살린 행 목록을 반환한다.
+        """
+        missing = {obj.product_id: obj for obj in rows if not getattr(obj, url_field)}
+        if not missing:
+            return []
+        existing = (
+            model.objects.filter(product_id__in=list(missing))
+            .exclude(Q(**{f"{url_field}__isnull": True}) | Q(**{url_field: ""}))
+            .values_list("product_id", url_field)
+        )
+        restored = []
+        for pid, url in existing:
+            setattr(missing[pid], url_field, url)
+            restored.append(missing[pid])
+        return restored
+
+    def preserve_regions(self, rows: list[Scholarship]):
+        """
+        지역 조건 원문이 바이트 단위로 같고 이미 처리된 행은 기존 region을 그대로 유지한다.
+        원문이 바뀌었거나 새로 생긴 행만 is_region_processed=False로 돌려 GPT 재처리 대상으로 만든다.
+        """
+        existing = {
+            pid: (text or "", region, processed)
+            for pid, text, region, processed in Scholarship.objects.filter(
+                product_id__in=[s.product_id for s in rows]
+            ).values_list("product_id", "residency_requirement_details", "region", "is_region_processed")
+        }
+        for scholarship in rows:
+            prev = existing.get(scholarship.product_id)
+            if prev and prev[2] and prev[0] == (scholarship.residency_requirement_details or ""):
+                scholarship.region = prev[1]
+                scholarship.is_region_processed = True
+                self.region_reused += 1
+            else:
+                scholarship.region = ""
+                scholarship.is_region_processed = False
+                self.region_requeued += 1
+
+    def preserve_eligibility(self, rows: list[Scholarship]):
+        """성적/소득 원문이 그대로인 행은 GPT가 보완해 둔 기준(medium)을 규칙 결과로 덮어쓰지 않는다."""
+        unresolved = [s for s in rows if s.eligibility_confidence != CONFIDENCE_HIGH]
+        if not unresolved:
+            return
+        existing = {
+            row["product_id"]: row
+            for row in Scholarship.objects.filter(
+                product_id__in=[s.product_id for s in unresolved], eligibility_confidence=CONFIDENCE_MEDIUM
+            ).values("product_id", "grade_criteria_details", "income_criteria_details", *ELIGIBILITY_FIELDS)
+        }
+        for scholarship in unresolved:
+            prev = existing.get(scholarship.product_id)
+            if (
+                prev
+                and (prev["grade_criteria_details"] or "") == (scholarship.grade_criteria_details or "")
+                and (prev["income_criteria_details"] or "") == (scholarship.income_criteria_details or "")
+            ):
+                for f in ELIGIBILITY_FIELDS:
+                    if f != "academic_year_mask":  # 학년은 정형 컬럼(학년구분)에서 규칙으로만 읽는다
+                        setattr(scholarship, f, prev[f])
+                self.eligibility_reused += 1
+            else:
+                self.eligibility_unresolved += 1
+
+    def iter_promotion_rows(self, changeset: SyncChangeSet, full: bool, chunk_size: int, columns: list[str]):
+        """
+        Scholarship으로 반영할 RawScholarship 행을 dict로 내보낸다. 마감일 필터는 SQL에서 처리한다.
+        기본은 이번 실행에서 신규/변경된 행 + 아직 Scholarship에 없는 행만, --full이면 전체.
+        """
+        today = timezone.localdate()
+        active = RawScholarship.objects.filter(
+            Q(recruitment_end__isnull=True) | Q(recruitment_end__gte=today)
+        )
+
+        if full:
+            yield from self.stream_values(active, columns, chunk_size)
+            return
+
+        changed = changeset.changed_product_ids()
+        for i in range(0, len(changed), chunk_size):
+            yield from active.filter(product_id__in=changed[i:i + chunk_size]).values(*columns)
+
+        changed_set = set(changed)
+        missing = active.exclude(product_id__in=Scholarship.objects.values("product_id"))
+        for row in self.stream_values(missing, columns, chunk_size):
+            if row["product_id"] not in changed_set:
+                yield row
+
+    @staticmethod
+    def stream_values(queryset, columns: list[str], chunk_size: int):
+        """
+        id 기준 keyset 페이지네이션으로 chunk_size행씩 읽는다.
+        mysqlclient는 iterator()를 써도 결과 전체를 클라이언트에 버퍼링하므로,
+        청크마다 별도 쿼리를 보내야 메모리 사용량이 카탈로그 크기와 무관하게 일정하다.
+        """
+        last_id = 0
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).order_by("id").values(*columns)[:chunk_size])
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1]["id"]
+
+    def add_raw_item(self, writer: BulkUpserter, item: dict, url_field: str | None):
+        product_name = (item.get("상품명") or "").strip()
+        org_name = (item.get("운영기관명") or "").strip()
+
+        if not product_name or not org_name:
+            self.stdout.write(self.style.WARNING(f"⚠️ '상품명' 또는 '운영기관명'이 없어 스킵: {item}"))
+            return
+
+        raw = RawScholarship(
+            product_id=f"{product_name}_{org_name}",
+            name=product_name,
+            foundation_name=org_name,
+            recruitment_start=self.safe_parse_date(item.get("모집시작일")),
+            recruitment_end=self.safe_parse_date(item.get("모집종료일")),
+            university_type=item.get("대학구분", ""),
+            product_type=item.get("학자금유형구분", ""),
+            grade_criteria_details=item.get("성적기준 상세내용", ""),
+            income_criteria_details=item.get("소득기준 상세내용", ""),
+            support_details=item.get("지원내역 상세내용", ""),
+            specific_qualification_details=item.get("특정자격 상세내용", ""),
+            residency_requirement_details=item.get("지역거주여부 상세내용", ""),
+            selection_method_details=item.get("선발방법 상세내용", ""),
+            number_of_recipients_details=item.get("선발인원 상세내용", ""),
+            eligibility_restrictions=item.get("자격제한 상세내용", ""),
+            required_documents_details=item.get("제출서류 상세내용", ""),
+            recommendation_required=item.get("추천필요여부 상세내용", "") == "필요",
+            major_field=item.get("학과구분", ""),
+            academic_year_type=item.get("학년구분", ""),
+            managing_organization_type=item.get("운영기관구분", ""),
+        )
+
+        # ✅ 홈페이지 URL 추출 → RawScholarship에 저장
+        if url_field:
+            setattr(raw, url_field, pick_homepage(item))
 
-                defaults = {
-                    "name": raw_item.name,
-                    "foundation_name": raw_item.foundation_name,
-                    "recruitment_start": raw_item.recruitment_start,
-                    "recruitment_end": raw_item.recruitment_end,
-                    "university_type": raw_item.university_type,
-                    "product_type": raw_item.product_type,
-                    "grade_criteria_details": raw_item.grade_criteria_details,
-                    "income_criteria_details": raw_item.income_criteria_details,
-                    "support_details": raw_item.support_details,
-                    "specific_qualification_details": raw_item.specific_qualification_details,
-                    "residency_requirement_details": raw_item.residency_requirement_details,
-                    "selection_method_details": raw_item.selection_method_details,
-                    "number_of_recipients_details": raw_item.number_of_recipients_details,
-                    "eligibility_restrictions": raw_item.eligibility_restrictions,
-                    "required_documents_details": raw_item.required_documents_details,
-                    "recommendation_required": raw_item.recommendation_required,
-                    "major_field": raw_item.major_field,
-                    "academic_year_type": raw_item.academic_year_type,
-                    "managing_organization_type": raw_item.managing_organization_type,
-                    "region": "",
-                    "is_region_processed": False,
-                }
-
-                # ✅ Raw의 URL → Scholarship.url로 복사(필드가 있을 때만)
-                raw_url = getattr(raw_item, "url", None) or getattr(raw_item, "homepage_url", None)
-                raw_url = normalize_url(raw_url)
-                if raw_url and "url" in sch_fields:
-                    defaults["url"] = raw_url
-
-                Scholarship.objects.update_or_create(
-                    product_id=raw_item.product_id,
-                    defaults=defaults,
-                )
-                created_count += 1
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f"❌ Scholarship 저장 중 오류: {e}"))
-
-        self.stdout.write(self.style.SUCCESS(f"\n✅ 동기화 완료: {created_count}개 생성/업데이트."))
-        # (updated_count를 따로 세고 싶으면 위 update_or_create 결과로 분기해도 됩니다.)
+        raw.content_hash = content_fingerprint(raw, self.hashed_fields)
+        writer.add(raw)
 
     def safe_parse_date(self, date_str):
         if not date_str:
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0011_rawscholarship_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChangeSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='시작 시각')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='종료 시각')),
+                ('is_complete', models.BooleanField(default=False, help_text='모든 페이지를 수집했는지 여부 (False면 disappeared는 비어 있음)')),
+                ('inserted', models.JSONField(default=list, verbose_name='신규')),
+                ('updated', models.JSONField(default=list, verbose_name='변경')),
+                ('unchanged', models.JSONField(default=list, verbose_name='변경 없음')),
+                ('disappeared', models.JSONField(default=list, verbose_name='사라짐')),
+            ],
+            options={
+                'verbose_name': '동기화 변경 내역',
+                'verbose_name_plural': '동기화 변경 내역 목록',
+                'ordering': ['-started_at'],
+                'get_latest_by': 'started_at',
+            },
+        ),
+        migrations.AddField(
+            model_name='rawscholarship',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='내용 해시'),
+        ),
+    ]
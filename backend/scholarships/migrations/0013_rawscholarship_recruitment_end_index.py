@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0012_rawscholarship_content_hash_syncchangeset'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rawscholarship',
+            index=models.Index(fields=['recruitment_end'], name='scholarship_recruit_ac55b8_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0013_rawscholarship_recruitment_end_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegionResolution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_hash', models.CharField(max_length=64, unique=True, verbose_name='원문 해시')),
+                ('normalized_text', models.TextField(verbose_name='정규화된 원문')),
+                ('region', models.CharField(blank=True, max_length=512, verbose_name='지역')),
+                ('source', models.CharField(choices=[('rule', '규칙 기반'), ('gpt', 'GPT'), ('manual', '관리자 지정')], default='gpt', max_length=10, verbose_name='출처')),
+                ('is_override', models.BooleanField(default=False, help_text='관리자가 지정한 값 (자동 처리로 덮어쓰지 않음)')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='DB 조회 적중 수')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': '지역 해석 캐시',
+                'verbose_name_plural': '지역 해석 캐시 목록',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0014_regionresolution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Region',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=32, unique=True, verbose_name='경로 코드')),
+                ('name', models.CharField(max_length=50, verbose_name='지역명')),
+                ('full_name', models.CharField(max_length=100, unique=True, verbose_name='전체 지역명')),
+                ('depth', models.PositiveSmallIntegerField(default=0, help_text='0=전국, 1=시/도, 2=시/군/구')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='scholarships.region', verbose_name='상위 지역')),
+            ],
+            options={
+                'verbose_name': '지역',
+                'verbose_name_plural': '지역 목록',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='regions',
+            field=models.ManyToManyField(blank=True, related_name='scholarships', to='scholarships.region', verbose_name='대상 지역'),
+        ),
+    ]
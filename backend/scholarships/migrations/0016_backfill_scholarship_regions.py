@@ -0,0 +1,166 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:57
+
+from django.db import migrations
+
+# 마이그레이션 시점의 지역 표와 파싱 규칙을 고정한다 (scholarships.regions / region_tree가 바뀌어도
+# 이 마이그레이션은 처음 적용될 때와 같은 노드 코드와 연결을 만든다)
+NATIONWIDE = "전국"
+ROOT_CODE = "KR"
+
+REGIONS = {
+    "서울특별시": ["강남구", "강동구", "강북구", "강서구", "관악구", "광진구", "구로구", "금천구", "노원구", "도봉구", "동대문구", "동작구", "마포구", "서대문구", "서초구", "성동구", "성북구", "송파구", "양천구", "영등포구", "용산구", "은평구", "종로구", "중구", "중랑구"],
+    "부산광역시": ["강서구", "금정구", "기장군", "남구", "동구", "동래구", "부산진구", "북구", "사상구", "사하구", "서구", "수영구", "연제구", "영도구", "중구", "해운대구"],
+    "대구광역시": ["군위군", "남구", "달서구", "달성군", "동구", "북구", "서구", "수성구", "중구"],
+    "인천광역시": ["강화군", "계양구", "남동구", "동구", "미추홀구", "부평구", "서구", "연수구", "옹진군", "중구"],
+    "광주광역시": ["광산구", "남구", "동구", "북구", "서구"],
+    "대전광역시": ["대덕구", "동구", "서구", "유성구", "중구"],
+    "울산광역시": ["남구", "동구", "북구", "울주군", "중구"],
+    "세종특별자치시": ["세종시"],
+    "경기도": ["가평군", "고양시", "과천시", "광명시", "광주시", "구리시", "군포시", "김포시", "남양주시", "동두천시", "부천시", "성남시", "수원시", "시흥시", "안산시", "안성시", "안양시", "양주시", "양평군", "여주시", "연천군", "오산시", "용인시", "의왕시", "의정부시", "이천시", "파주시", "평택시", "포천시", "하남시", "화성시"],
+    "강원도": ["강릉시", "고성군", "동해시", "삼척시", "속초시", "양구군", "양양군", "영월군", "원주시", "인제군", "정선군", "철원군", "춘천시", "태백시", "평창군", "홍천군", "화천군", "횡성군"],
+    "충청북도": ["괴산군", "단양군", "보은군", "영동군", "옥천군", "음성군", "제천시", "진천군", "청주시", "충주시"],
+    "충청남도": ["계룡시", "공주시", "금산군", "논산시", "당진시", "보령시", "부여군", "서산시", "서천군", "아산시", "예산군", "천안시", "청양군", "태안군", "홍성군"],
+    "전라북도": ["고창군", "군산시", "김제시", "남원시", "무주군", "부안군", "순창군", "완주군", "익산시", "임실군", "장수군", "전주시", "정읍시", "진안군"],
+    "전라남도": ["강진군", "고흥군", "곡성군", "광양시", "구례군", "나주시", "담양군", "목포시", "무안군", "보성군", "순천시", "신안군", "여수시", "영광군", "영암군", "완도군", "장성군", "장흥군", "진도군", "함평군", "해남군", "화순군"],
+    "경상북도": ["경산시", "경주시", "고령군", "구미시", "군위군", "김천시", "문경시", "봉화군", "상주시", "성주군", "안동시", "영덕군", "영양군", "영주시", "영천시", "예천군", "울릉군", "울진군", "의성군", "청도군", "청송군", "칠곡군", "포항시"],
+    "경상남도": ["거제시", "거창군", "고성군", "김해시", "남해군", "밀양시", "사천시", "산청군", "양산시", "의령군", "진주시", "창녕군", "창원시", "통영시", "하동군", "함안군", "함양군", "합천군"],
+    "제주특별자치도": ["서귀포시", "제주시"],
+}
+
+SIDO_ALIASES = {
+    "서울특별시": ["서울", "서울시"],
+    "부산광역시": ["부산", "부산시"],
+    "대구광역시": ["대구", "대구시"],
+    "인천광역시": ["인천", "인천시"],
+    "광주광역시": [],  # "광주"/"광주시"는 경기도 광주시와 겹치므로 아래에서 따로 처리
+    "대전광역시": ["대전", "대전시"],
+    "울산광역시": ["울산", "울산시"],
+    "세종특별자치시": ["세종", "세종시"],
+    "경기도": ["경기"],
+    "강원도": ["강원", "강원특별자치도"],
+    "충청북도": ["충북"],
+    "충청남도": ["충남"],
+    "전라북도": ["전북", "전북특별자치도"],
+    "전라남도": ["전남"],
+    "경상북도": ["경북"],
+    "경상남도": ["경남"],
+    "제주특별자치도": ["제주", "제주도"],
+}
+
+COMPOUND_ALIASES = {
+    "충청남북도": ["충청남도", "충청북도"],
+    "충청도": ["충청남도", "충청북도"],
+    "전라남북도": ["전라남도", "전라북도"],
+    "전라도": ["전라남도", "전라북도"],
+    "경상남북도": ["경상남도", "경상북도"],
+    "경상도": ["경상남도", "경상북도"],
+    "충남북": ["충청남도", "충청북도"],
+    "전남북": ["전라남도", "전라북도"],
+    "경남북": ["경상남도", "경상북도"],
+}
+
+
+def region_paths(region, sido_by_name, sidos_by_district):
+    paths = set()
+    for token in (region or "").split(","):
+        words = token.split()
+        if not words:
+            continue
+        head = words[0]
+        if head == NATIONWIDE:
+            paths.add(())
+            continue
+        if head in COMPOUND_ALIASES:
+            paths.update((sido,) for sido in COMPOUND_ALIASES[head])
+            continue
+        sido = sido_by_name.get(head)
+        if sido is None:
+            sidos = sidos_by_district.get(head, [])
+            if len(sidos) == 1:
+                paths.add((sidos[0], head))
+            continue
+        if len(words) > 1 and words[1] in REGIONS[sido]:
+            paths.add((sido, words[1]))
+        else:
+            paths.add((sido,))
+    return paths
+
+
+def path_full_name(path):
+    return " ".join(path) if path else NATIONWIDE
+
+
+def sync_region_table(Region):
+    nodes = {r.full_name: r for r in Region.objects.all()}
+
+    def ensure(path, parent, width):
+        full_name = path_full_name(path)
+        node = nodes.get(full_name)
+        if node is not None:
+            return node
+        if parent is None:
+            code = ROOT_CODE
+        else:
+            siblings = [n.code for n in nodes.values() if n.parent_id == parent.id]
+            last = max((int(c.rsplit(".", 1)[1]) for c in siblings), default=0)
+            code = f"{parent.code}.{last + 1:0{width}d}"
+        node = Region.objects.create(
+            code=code, name=path[-1] if path else NATIONWIDE, full_name=full_name, parent=parent, depth=len(path),
+        )
+        nodes[full_name] = node
+        return node
+
+    root = ensure((), None, 0)
+    for sido, districts in REGIONS.items():
+        sido_node = ensure((sido,), root, 2)
+        for district in districts:
+            ensure((sido, district), sido_node, 3)
+    return {name: node.id for name, node in nodes.items()}
+
+
+def link_scholarship_regions(batch, region_ids, through, sido_by_name, sidos_by_district):
+    if not batch:
+        return
+    links = []
+    for scholarship_id, region in batch.items():
+        for path in region_paths(region, sido_by_name, sidos_by_district):
+            region_id = region_ids.get(path_full_name(path))
+            if region_id is not None:
+                links.append(through(scholarship_id=scholarship_id, region_id=region_id))
+    through.objects.filter(scholarship_id__in=list(batch)).delete()
+    through.objects.bulk_create(links, batch_size=500, ignore_conflicts=True)
+
+
+def backfill_regions(apps, schema_editor):
+    Region = apps.get_model("scholarships", "Region")
+    Scholarship = apps.get_model("scholarships", "Scholarship")
+    through = Scholarship.regions.through
+
+    sido_by_name = {sido: sido for sido in REGIONS}
+    for sido, aliases in SIDO_ALIASES.items():
+        for alias in aliases:
+            sido_by_name.setdefault(alias, sido)
+    sidos_by_district = {}
+    for sido, districts in REGIONS.items():
+        for district in districts:
+            sidos_by_district.setdefault(district, []).append(sido)
+
+    region_ids = sync_region_table(Region)
+    batch = {}
+    for pk, region in Scholarship.objects.filter(is_region_processed=True).values_list("id", "region").iterator():
+        batch[pk] = region
+        if len(batch) >= 500:
+            link_scholarship_regions(batch, region_ids, through, sido_by_name, sidos_by_district)
+            batch = {}
+    link_scholarship_regions(batch, region_ids, through, sido_by_name, sidos_by_district)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0015_region_scholarship_regions'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_regions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0016_backfill_scholarship_regions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrecomputedRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort_key', models.CharField(max_length=64, unique=True, verbose_name='코호트 키')),
+                ('catalog_version', models.PositiveIntegerField(default=0, verbose_name='카탈로그 버전')),
+                ('scholarships', models.JSONField(default=list, verbose_name='추천 장학금')),
+                ('user_count', models.PositiveIntegerField(default=0, verbose_name='사용자 수')),
+                ('computed_at', models.DateTimeField(auto_now=True, verbose_name='계산 시각')),
+            ],
+            options={
+                'verbose_name': '사전 계산된 추천',
+                'verbose_name_plural': '사전 계산된 추천 목록',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0017_precomputedrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarship',
+            name='academic_year_mask',
+            field=models.PositiveIntegerField(default=0, verbose_name='대상 학기 비트마스크'),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='eligibility_confidence',
+            field=models.CharField(blank=True, choices=[('high', '높음 (규칙)'), ('medium', '중간 (GPT)'), ('low', '낮음 (일부 미해석)')], default='', max_length=10, verbose_name='자격 기준 신뢰도'),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='gpa_scale',
+            field=models.FloatField(blank=True, null=True, verbose_name='평점 만점 기준'),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='max_income_decile',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='최대 소득분위'),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='min_gpa',
+            field=models.FloatField(blank=True, null=True, verbose_name='최소 평점'),
+        ),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:10
+
+import re
+import unicodedata
+
+from django.db import migrations
+
+# 마이그레이션 시점의 자격 기준 파서를 고정한다 (scholarships.eligibility의 규칙이 바뀌어도
+# 이 마이그레이션은 0018에서 만든 컬럼을 처음 적용될 때와 같은 값으로 채운다)
+CONFIDENCE_HIGH = "high"
+CONFIDENCE_LOW = "low"
+
+# 사용자 평점(UserScholarship.gpa_*)은 4.5 만점으로 입력받는다
+USER_GPA_SCALE = 4.5
+# 학기 비트: 0 = 신입생, 1~8 = 대학 N학기 (8은 '8학기 이상')
+MAX_SEMESTER = 8
+ALL_YEARS_MASK = (1 << (MAX_SEMESTER + 1)) - 1
+
+NO_REQUIREMENT_PATTERN = re.compile(r"^(?:-|없음|해당\s*없음|제한\s*없음|무관|성적\s*무관|소득\s*무관|별도\s*기준\s*없음)?$")
+# 이 문구가 있으면 숫자를 읽었더라도 절대 기준으로 보지 않는다 (대안 조건/예외)
+AMBIGUOUS_PATTERN = re.compile(r"또는|이거나|혹은|단[,\s]|예외|제외|우대|권장|가산|고려|참고|석차|백분위|상위\s*\d+\s*%")
+
+GPA_SCALE_PATTERN = re.compile(r"(4\.[035])\s*(?:점\s*)?만점|/\s*(4\.[035])")
+GPA_PATTERN = re.compile(r"(?<![\d./])([0-4]\.\d{1,2})(?!\s*(?:점\s*)?만점)(?![\d.])(?=[^,;]{0,20}?이상)")
+PERCENT_PATTERN = re.compile(r"(?<![\d.])(\d{2,3})\s*점\s*이상")
+LETTER_PATTERN = re.compile(r"(?<![A-Za-z])([ABC])\s*([+0])?\s*(?:학점|등급)?\s*이상")
+LETTER_GRADES = {("A", "+"): 4.5, ("A", ""): 4.0, ("B", "+"): 3.5, ("B", ""): 3.0, ("C", "+"): 2.5, ("C", ""): 2.0}
+
+INCOME_RANGE_PATTERN = re.compile(r"(\d{1,2})\s*[~\-]\s*(\d{1,2})\s*(?:분위|구간)")
+INCOME_CAP_PATTERN = re.compile(r"(\d{1,2})\s*(?:분위|구간)\s*(?:이내|이하|까지|내)")
+INCOME_UNPARSED_HINT = re.compile(r"분위|구간|중위소득|기초|차상위|저소득|수급")
+
+SEMESTER_PATTERN = re.compile(r"(\d{1,2})\s*학기\s*(이상)?")
+SCHOOL_YEAR_PATTERN = re.compile(r"(\d)\s*학년\s*(이상)?")
+
+
+def _normalize(text: str | None) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "")).strip(" .·,")
+
+
+def parse_grade_criteria(text: str | None) -> tuple[float | None, float | None, bool]:
+    """성적 기준 원문 → (최소 평점, 만점 기준, 확정 여부). 기준이 없으면 (None, None, True)."""
+    t = _normalize(text)
+    if NO_REQUIREMENT_PATTERN.match(t):
+        return None, None, True
+
+    candidates = []
+    scale_match = GPA_SCALE_PATTERN.search(t)
+    scale = float(scale_match.group(1) or scale_match.group(2)) if scale_match else None
+    for m in GPA_PATTERN.finditer(t):
+        value = float(m.group(1))
+        if 0 < value <= (scale or USER_GPA_SCALE):
+            candidates.append((value, scale))
+    for m in LETTER_PATTERN.finditer(t):
+        candidates.append((LETTER_GRADES[(m.group(1), "+" if m.group(2) == "+" else "")], 4.5))
+    for m in PERCENT_PATTERN.finditer(t):
+        value = float(m.group(1))
+        if 50 <= value <= 100:
+            candidates.append((value, 100.0))
+
+    if not candidates or AMBIGUOUS_PATTERN.search(t):
+        return None, None, False
+    # 직전학기/전체 등 기준이 여러 개면 가장 낮은 값을 바닥으로 본다 (명백한 미달만 제외하기 위해)
+    if len({c[1] for c in candidates}) > 1:
+        return None, None, False
+    value, scale = min(candidates)
+    return value, scale, True
+
+
+def parse_income_criteria(text: str | None) -> tuple[int | None, bool]:
+    """소득 기준 원문 → (최대 소득분위, 확정 여부). 기준이 없으면 (None, True)."""
+    t = _normalize(text)
+    if NO_REQUIREMENT_PATTERN.match(t):
+        return None, True
+
+    caps = [int(m.group(2)) for m in INCOME_RANGE_PATTERN.finditer(t)]
+    caps += [int(m.group(1)) for m in INCOME_CAP_PATTERN.finditer(t)]
+    caps = [c for c in caps if 1 <= c <= 10]
+    if not caps:
+        # 소득 관련 문구가 있는데 분위를 못 읽었으면(중위소득 %, 기초/차상위 등) 미해석, 아니면 소득 기준이 아닌 내용
+        return None, not INCOME_UNPARSED_HINT.search(t)
+    if AMBIGUOUS_PATTERN.search(t):
+        return None, False
+    # 신입생/재학생별 기준처럼 여러 개면 가장 넓은 값
+    return max(caps), True
+
+
+def academic_year_mask(text: str | None) -> int:
+    """
+    학년 구분 문자열 → 학기 비트마스크. 제한이 없거나 읽을 수 없으면 0.
+    예) "대학신입생, 대학2학기" → 0b101, "대학8학기이상" → 1 << 8, "3학년 이상" → 5~8학기
+    """
+    t = _normalize(text).replace(" ", "")
+    if not t or NO_REQUIREMENT_PATTERN.match(t):
+        return 0
+    mask = 0
+    if "신입생" in t:
+        mask |= 1
+    for m in SEMESTER_PATTERN.finditer(t):
+        n = min(int(m.group(1)), MAX_SEMESTER)
+        if n >= 1:
+            mask |= ALL_YEARS_MASK & ~((1 << n) - 1) if m.group(2) else 1 << n
+    for m in SCHOOL_YEAR_PATTERN.finditer(t):
+        year = int(m.group(1))
+        if 1 <= year <= 4:
+            first = 2 * year - 1
+            mask |= ALL_YEARS_MASK & ~((1 << first) - 1) if m.group(2) else (1 << first) | (1 << (first + 1))
+    return mask
+
+
+def backfill_thresholds(apps, schema_editor):
+    Scholarship = apps.get_model("scholarships", "Scholarship")
+    fields = ["min_gpa", "gpa_scale", "max_income_decile", "academic_year_mask", "eligibility_confidence"]
+    batch = []
+    for scholarship in Scholarship.objects.only(
+        "id", "grade_criteria_details", "income_criteria_details", "academic_year_type"
+    ).iterator(chunk_size=1000):
+        min_gpa, gpa_scale, grade_ok = parse_grade_criteria(scholarship.grade_criteria_details)
+        max_decile, income_ok = parse_income_criteria(scholarship.income_criteria_details)
+        scholarship.min_gpa = min_gpa
+        scholarship.gpa_scale = gpa_scale
+        scholarship.max_income_decile = max_decile
+        scholarship.academic_year_mask = academic_year_mask(scholarship.academic_year_type)
+        scholarship.eligibility_confidence = CONFIDENCE_HIGH if grade_ok and income_ok else CONFIDENCE_LOW
+        batch.append(scholarship)
+        if len(batch) >= 1000:
+            Scholarship.objects.bulk_update(batch, fields)
+            batch = []
+    Scholarship.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0018_scholarship_eligibility_thresholds'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_thresholds, migrations.RunPython.noop),
+    ]
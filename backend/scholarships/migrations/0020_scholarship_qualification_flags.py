@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0019_backfill_eligibility_thresholds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarship',
+            name='targets_multicultural',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='다문화 가정 대상'),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='targets_multiple_children',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='다자녀 가정 대상'),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='targets_national_merit',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='국가유공자 대상'),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='targets_single_parent',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='한부모 가정 대상'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:21
+
+import re
+
+from django.db import migrations
+
+# 마이그레이션 시점의 플래그 정의를 고정한다 (settings.SCHOLARSHIP_QUALIFICATION_FLAGS에 과거 모델에 없는 컬럼이
+# 설정되어 있어도 이 마이그레이션은 0020에서 만든 컬럼만 채운다)
+FLAGS = {
+    "targets_multicultural": ["다문화"],
+    "targets_single_parent": ["한부모"],
+    "targets_multiple_children": ["다자녀"],
+    "targets_national_merit": ["국가유공자", "보훈"],
+}
+SOURCE_FIELDS = ("specific_qualification_details", "income_criteria_details")
+NEGATION = r"(?![^,.\n]{0,8}(?:제외|불가|제한|아닌))"
+
+
+def backfill_flags(apps, schema_editor):
+    Scholarship = apps.get_model("scholarships", "Scholarship")
+    patterns = {
+        flag: re.compile("(?:" + "|".join(re.escape(k) for k in keywords) + ")" + NEGATION)
+        for flag, keywords in FLAGS.items()
+    }
+    fields = list(FLAGS)
+    batch = []
+    for scholarship in Scholarship.objects.only("id", *SOURCE_FIELDS).iterator(chunk_size=1000):
+        for flag, pattern in patterns.items():
+            setattr(scholarship, flag, any(pattern.search(getattr(scholarship, f) or "") for f in SOURCE_FIELDS))
+        batch.append(scholarship)
+        if len(batch) >= 1000:
+            Scholarship.objects.bulk_update(batch, fields)
+            batch = []
+    Scholarship.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0020_scholarship_qualification_flags'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_flags, migrations.RunPython.noop),
+    ]
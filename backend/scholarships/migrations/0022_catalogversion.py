@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:49
+
+from django.db import migrations, models
+from django.db.models import Max
+
+# 이전 구현이 Redis에만 두던 카탈로그 버전 키
+LEGACY_VERSION_KEY = "recommendation:catalog_version"
+
+
+def seed_version(apps, schema_editor):
+    """
+    지금까지 쓰인 어떤 버전보다 큰 값에서 시작한다. 그래야 예전 버전으로 저장된 사전 계산 결과나
+    사용자 추천 캐시(키에 버전 포함)가 새 버전과 우연히 같아져 다시 쓰이는 일이 없다.
+    """
+    CatalogVersion = apps.get_model("scholarships", "CatalogVersion")
+    PrecomputedRecommendation = apps.get_model("scholarships", "PrecomputedRecommendation")
+    used = PrecomputedRecommendation.objects.aggregate(v=Max("catalog_version"))["v"] or 0
+    try:
+        from django.core.cache import cache
+        used = max(used, int(cache.get(LEGACY_VERSION_KEY) or 0))
+    except Exception:
+        pass
+    CatalogVersion.objects.update_or_create(pk=1, defaults={"version": used + 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0021_backfill_qualification_flags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=1, verbose_name='버전')),
+                ('pending_changes', models.PositiveIntegerField(default=0, help_text='아직 버전에 반영하지 않은 단건 변경 수 (주기 작업이 모아서 한 번에 올림)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': '카탈로그 버전',
+                'verbose_name_plural': '카탈로그 버전',
+            },
+        ),
+        migrations.RunPython(seed_version, migrations.RunPython.noop),
+    ]
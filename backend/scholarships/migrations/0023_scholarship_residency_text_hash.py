@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0022_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarship',
+            name='residency_text_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64, verbose_name='지역 조건 원문 해시'),
+        ),
+    ]
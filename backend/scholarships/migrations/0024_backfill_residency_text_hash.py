@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:57
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations
+
+
+# 마이그레이션 시점의 정규화 규칙을 고정한다 (scholarships.region_cache.normalize_residency_text와 같은 값)
+def text_hash(text):
+    normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "")).strip(" .·,")
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def backfill_hashes(apps, schema_editor):
+    Scholarship = apps.get_model("scholarships", "Scholarship")
+    batch = []
+    for scholarship in Scholarship.objects.only("id", "residency_requirement_details").iterator(chunk_size=1000):
+        scholarship.residency_text_hash = text_hash(scholarship.residency_requirement_details)
+        batch.append(scholarship)
+        if len(batch) >= 1000:
+            Scholarship.objects.bulk_update(batch, ["residency_text_hash"])
+            batch = []
+    Scholarship.objects.bulk_update(batch, ["residency_text_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0023_scholarship_residency_text_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+    ]
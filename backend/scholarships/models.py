@@ -31,8 +31,13 @@ class RawScholarship(models.Model):
     support_details = models.TextField(null=True, blank=True, verbose_name="지원금액 상세")
     recommendation_required = models.BooleanField(default=False, verbose_name="추천서 필요 여부")
     url = models.URLField(max_length=500, null=True, blank=True, verbose_name="홈페이지 주소")
+    content_hash = models.CharField(max_length=64, null=True, blank=True, verbose_name="내용 해시")  # 정규화된 API 필드의 SHA-256 (변경 감지용)
 
     class Meta:
+        indexes = [
+            # sync_scholarships 2단계의 마감일 필터(recruitment_end >= 오늘)용
+            models.Index(fields=["recruitment_end"]),
+        ]
         verbose_name = "원본 장학금"
         verbose_name_plural = "원본 장학금 목록"
 
@@ -53,12 +58,30 @@ class Scholarship(models.Model):
     academic_year_type = models.CharField(max_length=255, null=True, blank=True, verbose_name="학년 유형")  # 학년 유형 (예: 1학년, 2학년, 대학원)
     major_field = models.CharField(max_length=255, null=True, blank=True, verbose_name="학과 구분")  # 학과 구분 (예: 공과대학, 인문사회계열, 특정 학과명)
     residency_requirement_details = models.TextField(null=True, blank=True, verbose_name="지역 조건 상세")  # 지역 조건 상세 설명 (예: "서울시 특정 구 거주자")
+    residency_text_hash = models.CharField(max_length=64, blank=True, default="", db_index=True, verbose_name="지역 조건 원문 해시")  # region_cache.residency_text_hash (RegionResolution.text_hash와 같은 값)
     grade_criteria_details = models.TextField(null=True, blank=True, verbose_name="성적 기준 상세")  # 성적 기준 상세 (예: "직전 학기 평점 3.5 이상")
     income_criteria_details = models.TextField(null=True, blank=True, verbose_name="소득 기준 상세")  # 소득 기준 상세 (예: "소득 분위 8분위 이내")
     specific_qualification_details = models.TextField(null=True, blank=True, verbose_name="특정 자격 조건 상세")  # 특정 자격 조건 (예: "국가유공자 자녀", "다문화 가정 자녀")
     eligibility_restrictions = models.TextField(null=True, blank=True, verbose_name="자격 제한")  # 자격 제한 (예: "휴학생 제외")
     region = models.CharField(max_length=512, blank=True, help_text="전처리된 지역 정보 (쉼표로 구분)")
     is_region_processed = models.BooleanField(default=False, help_text="지역 정보 전처리 완료 여부")
+    regions = models.ManyToManyField("Region", blank=True, related_name="scholarships", verbose_name="대상 지역")  # region 문자열을 정규화한 결과 (지역 필터링용)
+
+    # 성적/소득/학년 기준을 수집 시점에 정형화한 값 (scholarships/eligibility.py, 비어 있으면 기준 없음 또는 미해석)
+    min_gpa = models.FloatField(null=True, blank=True, verbose_name="최소 평점")
+    gpa_scale = models.FloatField(null=True, blank=True, verbose_name="평점 만점 기준")  # 4.0/4.3/4.5/100, 없으면 명시 안 됨
+    max_income_decile = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="최대 소득분위")
+    academic_year_mask = models.PositiveIntegerField(default=0, verbose_name="대상 학기 비트마스크")  # bit 0 = 신입생, bit N = N학기 (0이면 제한 없음)
+    eligibility_confidence = models.CharField(
+        max_length=10, blank=True, default="",
+        choices=[("high", "높음 (규칙)"), ("medium", "중간 (GPT)"), ("low", "낮음 (일부 미해석)")],
+        verbose_name="자격 기준 신뢰도",
+    )
+    # 특정 자격 대상 여부 (scholarships/qualifications.py의 키워드로 수집 시 판정)
+    targets_multicultural = models.BooleanField(default=False, db_index=True, verbose_name="다문화 가정 대상")
+    targets_single_parent = models.BooleanField(default=False, db_index=True, verbose_name="한부모 가정 대상")
+    targets_multiple_children = models.BooleanField(default=False, db_index=True, verbose_name="다자녀 가정 대상")
+    targets_national_merit = models.BooleanField(default=False, db_index=True, verbose_name="국가유공자 대상")
 
     # 기타 정보
     managing_organization_type = models.CharField(max_length=255, null=True, blank=True, verbose_name="운영 기관 구분")  # 운영 기관 구분
@@ -106,6 +129,119 @@ class Scholarship(models.Model):
         }
 
 
+class RegionResolution(models.Model):
+    """지역 조건 원문(정규화) → 정형화된 지역 문자열 캐시. 같은 원문을 가진 장학금은 GPT를 한 번만 호출합니다."""
+    SOURCE_RULE = "rule"
+    SOURCE_GPT = "gpt"
+    SOURCE_MANUAL = "manual"
+    SOURCE_CHOICES = [
+        (SOURCE_RULE, "규칙 기반"),
+        (SOURCE_GPT, "GPT"),
+        (SOURCE_MANUAL, "관리자 지정"),
+    ]
+
+    text_hash = models.CharField(max_length=64, unique=True, verbose_name="원문 해시")  # 정규화된 원문의 SHA-256
+    normalized_text = models.TextField(verbose_name="정규화된 원문")
+    region = models.CharField(max_length=512, blank=True, verbose_name="지역")
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default=SOURCE_GPT, verbose_name="출처")
+    is_override = models.BooleanField(default=False, help_text="관리자가 지정한 값 (자동 처리로 덮어쓰지 않음)")
+    hit_count = models.PositiveIntegerField(default=0, verbose_name="DB 조회 적중 수")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "지역 해석 캐시"
+        verbose_name_plural = "지역 해석 캐시 목록"
+
+    def __str__(self):
+        return f"{self.normalized_text[:30]} → {self.region}"
+
+
+class Region(models.Model):
+    """
+    행정구역 참조 테이블. code는 상위 코드에 점(.)으로 이어 붙인 경로(materialized path)입니다.
+    예) 전국 "KR" → 경기도 "KR.09" → 경기도 수원시 "KR.09.013"
+    어떤 지역의 상위 지역 코드는 모두 자기 코드의 접두사이므로(region_tree.ancestor_codes), 자격 판정은 조상 코드와 겹치는지만 보면 됩니다.
+    """
+    code = models.CharField(max_length=32, unique=True, verbose_name="경로 코드")
+    name = models.CharField(max_length=50, verbose_name="지역명")
+    full_name = models.CharField(max_length=100, unique=True, verbose_name="전체 지역명")  # 예) "경기도 수원시"
+    parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE, related_name="children", verbose_name="상위 지역")
+    depth = models.PositiveSmallIntegerField(default=0, help_text="0=전국, 1=시/도, 2=시/군/구")
+
+    class Meta:
+        ordering = ["code"]
+        verbose_name = "지역"
+        verbose_name_plural = "지역 목록"
+
+    def __str__(self):
+        return self.full_name
+
+
+class SyncChangeSet(models.Model):
+    """sync_scholarships 1회 실행의 변경 내역(product_id 목록). 후속 작업은 이 델타만 처리하면 됩니다."""
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name="시작 시각")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="종료 시각")
+    is_complete = models.BooleanField(default=False, help_text="모든 페이지를 수집했는지 여부 (False면 disappeared는 비어 있음)")
+
+    inserted = models.JSONField(default=list, verbose_name="신규")
+    updated = models.JSONField(default=list, verbose_name="변경")
+    unchanged = models.JSONField(default=list, verbose_name="변경 없음")
+    disappeared = models.JSONField(default=list, verbose_name="사라짐")
+
+    class Meta:
+        ordering = ["-started_at"]
+        get_latest_by = "started_at"
+        verbose_name = "동기화 변경 내역"
+        verbose_name_plural = "동기화 변경 내역 목록"
+
+    def __str__(self):
+        return (
+            f"{self.started_at:%Y-%m-%d %H:%M} 동기화 "
+            f"(+{len(self.inserted)} ~{len(self.updated)} ={len(self.unchanged)} -{len(self.disappeared)})"
+        )
+
+    def changed_product_ids(self) -> list[str]:
+        """신규 + 변경된 product_id 목록."""
+        return list(self.inserted) + list(self.updated)
+
+
+class CatalogVersion(models.Model):
+    """
+    장학금 카탈로그 버전 (행 하나, pk=1). 사용자 추천 캐시, 카탈로그 스냅샷, PrecomputedRecommendation이 모두 이 값을 키로 쓴다.
+    원본은 DB에 두고 Redis는 읽기 캐시로만 써서, Redis가 비워져도 버전이 되돌아가 옛 결과가 다시 유효해지지 않는다.
+    """
+    version = models.PositiveIntegerField(default=1, verbose_name="버전")
+    pending_changes = models.PositiveIntegerField(default=0, help_text="아직 버전에 반영하지 않은 단건 변경 수 (주기 작업이 모아서 한 번에 올림)")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "카탈로그 버전"
+        verbose_name_plural = "카탈로그 버전"
+
+    def __str__(self):
+        return f"v{self.version} (대기 {self.pending_changes})"
+
+
+class PrecomputedRecommendation(models.Model):
+    """
+    precompute_recommendations가 코호트별로 미리 계산한 추천 결과.
+    코호트 = 추천 결과에 영향을 주는 프로필 항목(지역, 학교/학년/전공, 성적, 소득, 특정 자격)이 같은 사용자 묶음.
+    """
+    cohort_key = models.CharField(max_length=64, unique=True, verbose_name="코호트 키")
+    catalog_version = models.PositiveIntegerField(default=0, verbose_name="카탈로그 버전")  # 계산 당시 버전과 같을 때만 사용
+    scholarships = models.JSONField(default=list, verbose_name="추천 장학금")  # 응답 형식 그대로 직렬화된 목록
+    user_count = models.PositiveIntegerField(default=0, verbose_name="사용자 수")
+    computed_at = models.DateTimeField(auto_now=True, verbose_name="계산 시각")
+
+    class Meta:
+        verbose_name = "사전 계산된 추천"
+        verbose_name_plural = "사전 계산된 추천 목록"
+
+    def __str__(self):
+        return f"{self.cohort_key[:12]} ({self.user_count}명, v{self.catalog_version})"
+
+
 class Wishlist(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="사용자")
     scholarship = models.ForeignKey(Scholarship, on_delete=models.CASCADE, verbose_name="장학금")
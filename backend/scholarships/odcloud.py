@@ -0,0 +1,152 @@
+# scholarships/odcloud.py
+"""
+공공데이터포털(odcloud) 장학금 API 페이지 수집기.
+
+- 하나의 keep-alive 세션(커넥션 풀)을 모든 요청이 공유합니다.
+- 첫 페이지 응답의 totalCount로 나머지 페이지를 계획하고, 최대 concurrency개 페이지를 동시에 요청합니다.
+- 페이지마다 지수 백오프(+지터) 재시도를 적용합니다.
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://api.odcloud.kr/api/15028252/v1/uddi:ccd5ddd5-754a-4eb8-90f0-cb9bce54870b"
+
+# 재시도 대상 HTTP 상태 코드 (레이트 리밋 / 일시적 서버 오류)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class PageFetchError(Exception):
+    """재시도를 모두 소진한 뒤에도 페이지를 가져오지 못한 경우."""
+
+    def __init__(self, page: int, cause: Exception):
+        super().__init__(f"{page} 페이지 요청 실패: {cause}")
+        self.page = page
+        self.cause = cause
+
+
+class OdcloudPageFetcher:
+    def __init__(
+        self,
+        service_key: str | None,
+        api_url: str = API_URL,
+        per_page: int = 100,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30,
+        record_dir: str | None = None,
+    ):
+        self.service_key = service_key or ""
+        self.api_url = api_url
+        self.per_page = per_page
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.record_dir = record_dir
+
+        # 동시 요청 수만큼 커넥션을 유지하는 단일 세션
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._stats_lock = threading.Lock()
+        self.request_count = 0
+        self.retry_count = 0
+
+    def close(self):
+        self.session.close()
+
+    def page_url(self, page: int) -> str:
+        # serviceKey는 이미 인코딩된 값일 수 있으므로 params로 넘기지 않고 그대로 붙인다.
+        return f"{self.api_url}?serviceKey={self.service_key}&page={page}&perPage={self.per_page}&returnType=JSON"
+
+    def fetch_page(self, page: int) -> dict:
+        """한 페이지를 가져온다. 일시적 오류는 백오프 후 재시도한다."""
+        attempt = 0
+        while True:
+            try:
+                with self._stats_lock:
+                    self.request_count += 1
+                response = self.session.get(self.page_url(page), timeout=self.timeout)
+                if response.status_code in RETRY_STATUS:
+                    raise requests.exceptions.HTTPError(
+                        f"{response.status_code} 응답", response=response
+                    )
+                response.raise_for_status()
+                payload = response.json()
+                self._record(page, payload)
+                return payload
+            except (requests.exceptions.RequestException, ValueError) as e:
+                status_code = getattr(getattr(e, "response", None), "status_code", None)
+                retryable = status_code is None or status_code in RETRY_STATUS
+                if not retryable or attempt >= self.max_retries:
+                    raise PageFetchError(page, e) from e
+                with self._stats_lock:
+                    self.retry_count += 1
+                time.sleep(self.backoff * (2 ** attempt) + random.uniform(0, self.backoff))
+                attempt += 1
+
+    def iter_pages(self):
+        """
+        (page, data, error) 튜플을 페이지 순서대로 내보낸다.
+        실패한 페이지는 data=None, error=PageFetchError 로 전달되며 나머지 페이지 수집은 계속된다.
+        """
+        try:
+            first = self.fetch_page(1)
+        except PageFetchError as e:
+            yield 1, None, e
+            return
+
+        first_data = first.get("data", []) or []
+        yield 1, first_data, None
+
+        total_count = first.get("totalCount")
+        if isinstance(total_count, int) and total_count >= 0:
+            last_page = max(1, math.ceil(total_count / self.per_page))
+            yield from self._fetch_planned(range(2, last_page + 1))
+        else:
+            # totalCount가 없으면 빈 페이지가 나올 때까지 순차 수집
+            if not first_data:
+                return
+            page = 2
+            while True:
+                try:
+                    data = self.fetch_page(page).get("data", []) or []
+                except PageFetchError as e:
+                    yield page, None, e
+                    return
+                if not data:
+                    return
+                yield page, data, None
+                page += 1
+
+    def _fetch_planned(self, pages):
+        def task(page):
+            try:
+                return page, self.fetch_page(page).get("data", []) or [], None
+            except PageFetchError as e:
+                return page, None, e
+
+        if not pages:
+            return
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="odcloud") as pool:
+            # map은 동시에 실행하되 결과는 페이지 순서대로 돌려준다.
+            yield from pool.map(task, pages)
+
+    def _record(self, page: int, payload: dict):
+        if not self.record_dir:
+            return
+        os.makedirs(self.record_dir, exist_ok=True)
+        path = os.path.join(self.record_dir, f"page_{page:04d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
@@ -0,0 +1,224 @@
+# scholarships/prompting.py
+"""
+GPT 최종 랭킹 프롬프트 빌더 (토큰 예산 기반).
+
+- 짧은 키와 공백 없는 JSON으로 직렬화하고, 장학금 ID 대신 1부터 시작하는 번호를 보냅니다 (응답 번호 → product_id 복원).
+- 자유 서술 필드는 필드별 토큰 예산까지만 남기고, "※ 자세한 사항은 홈페이지 참조" 같은 상투 문구는 지웁니다.
+- 여러 후보에 똑같이 반복되는 긴 문구는 공통 문구(refs)로 한 번만 보내고 "@번호"로 가리킵니다.
+- 점수 순 후보 중 전체 토큰 수가 예산(settings.RECOMMENDATION_PROMPT_TOKEN_BUDGET) 안에 드는 만큼만 넣습니다 (로컬 토크나이저로 계산).
+"""
+import json
+import re
+from collections import Counter
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .llm import fake_responder
+from .qualifications import matched_qualification_labels, qualification_flags, user_qualification_flags
+from .tokens import count_tokens
+
+PROMPT_TOKEN_BUDGET = getattr(settings, "RECOMMENDATION_PROMPT_TOKEN_BUDGET", 3000)
+MIN_CANDIDATES = 5
+MAX_CANDIDATES = 30
+
+# 장학금 필드 → (짧은 키, 토큰 예산)
+CANDIDATE_FIELDS = [
+    ("name", "n", 30),
+    ("product_type", "t", 10),
+    ("university_type", "u", 20),
+    ("academic_year_type", "y", 30),
+    ("major_field", "m", 20),
+    ("region", "r", 30),
+    ("grade_criteria_details", "g", 60),
+    ("income_criteria_details", "i", 60),
+    ("specific_qualification_details", "q", 80),
+]
+KEY_LEGEND = "n=이름, t=유형, u=대학, y=학년, m=학과, r=지역, g=성적기준, i=소득기준, q=특정자격, s=사용자와 함께 해당하는 특정자격"
+
+# 값이 이것뿐이면 키를 아예 생략한다 (생략 = 제한 없음)
+EMPTY_VALUES = {"", "-", "없음", "해당없음", "해당 없음", "제한없음", "제한 없음", "무관"}
+BOILERPLATE_PATTERNS = [
+    re.compile(r"※?\s*(?:기타\s*)?(?:자세한|세부|상세한?)\s*(?:사항|내용)은?\s*[^.\n]{0,40}?(?:참조|참고|확인)(?:\s*바랍니다|하시기\s*바랍니다|요망)?\.?"),
+    re.compile(r"※?\s*[^.\n]{0,20}(?:홈페이지|공고문)\s*(?:참조|참고)\.?"),
+]
+# 이 길이(글자) 이상이면서 두 후보 이상에 반복되는 값은 공통 문구로 뺀다
+REF_MIN_CHARS = 20
+
+USER_FIELDS = [
+    ("region", "지역"),
+    ("university_type", "대학"),
+    ("major_field", "학과"),
+    ("academic_year_type", "학년"),
+    ("semester", "수료학기"),
+    ("gpa_last_semester", "직전학기평점"),
+    ("gpa_overall", "전체평점"),
+    ("income_level", "소득분위"),
+]
+USER_NOTE_TOKENS = 60
+
+
+class RankingPrompt(NamedTuple):
+    prompt: str
+    scholarships: list     # 프롬프트에 들어간 후보 (점수 순)
+    product_ids: dict      # 프롬프트 번호 → product_id
+    tokens: int
+
+
+def compact_text(text, token_budget: int) -> str:
+    """공백/상투 문구를 정리하고 token_budget 토큰 이내로 자른다 (잘렸으면 끝에 …)."""
+    v = str(text or "")
+    for pattern in BOILERPLATE_PATTERNS:
+        v = pattern.sub(" ", v)
+    v = re.sub(r"\s+", " ", v).strip(" ,.·")
+    tokens = count_tokens(v)
+    if tokens <= token_budget:
+        return v
+    # 비율로 줄여 가며 예산에 맞춘다 (대부분 한두 번에 끝남)
+    while v and tokens > token_budget:
+        v = v[:max(1, int(len(v) * token_budget / tokens) - 1)].rstrip()
+        tokens = count_tokens(v + "…")
+    return v + "…"
+
+
+def dumps(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def compact_user(user_profile) -> dict:
+    region = " ".join(filter(None, [(user_profile.region or "").strip(), (user_profile.district or "").strip()]))
+    values = {label: getattr(user_profile, field, None) for field, label in USER_FIELDS}
+    values["지역"] = region
+    out = {k: v for k, v in values.items() if v not in (None, "", 0, 0.0)}
+    specs = qualification_flags()
+    labels = [specs[flag]["label"] for flag in user_qualification_flags(user_profile)]
+    if labels:
+        out["특정자격"] = labels
+    note = compact_text(getattr(user_profile, "additional_info", ""), USER_NOTE_TOKENS)
+    if note:
+        out["추가정보"] = note
+    return out
+
+
+def compact_candidates(scholarships, user_flags) -> list[dict]:
+    """후보를 짧은 키 dict로 (id = 1부터 시작하는 후보 번호, 제한 없음 값은 키 생략)."""
+    rows = []
+    for number, s in enumerate(scholarships, start=1):
+        row = {"id": number}
+        for field, key, budget in CANDIDATE_FIELDS:
+            value = compact_text(getattr(s, field, ""), budget)
+            if value not in EMPTY_VALUES:
+                row[key] = value
+        matched = matched_qualification_labels(s, user_flags)
+        if matched:
+            row["s"] = matched
+        rows.append(row)
+    return rows
+
+
+def dedupe_repeated(rows: list[dict]) -> tuple[list[dict], dict]:
+    """두 후보 이상에 반복되는 긴 값을 공통 문구로 빼고 "@번호"로 바꾼다."""
+    counts = Counter(
+        v for row in rows for k, v in row.items() if isinstance(v, str) and k != "id" and len(v) >= REF_MIN_CHARS
+    )
+    refs = {}
+    ref_of = {}
+    for value, n in counts.most_common():
+        if n < 2:
+            break
+        ref = f"@{len(refs) + 1}"
+        refs[ref] = value
+        ref_of[value] = ref
+    if not refs:
+        return rows, {}
+    return [{k: ref_of.get(v, v) if isinstance(v, str) else v for k, v in row.items()} for row in rows], refs
+
+
+PROMPT_TEMPLATE = """당신은 사용자 프로필과 장학금 자격 조건을 비교해 개인화된 추천 사유를 쓰는 AI 카피라이터입니다.
+
+[사용자]
+{user}
+
+[후보 장학금] 키: {legend}. 생략된 키는 제한 없음. "@번호" 값은 [공통 문구] 참고.
+{candidates}
+{refs}
+[업무] 후보 중 가장 적합한 상위 5개를 적합도 순으로 고르세요.
+규칙 (이 규칙에 해당하는 사실만 근거로, 추측 금지):
+1. 지역: 사용자 지역과 r이 구체적으로 일치할수록 우선, 전국은 그 다음.
+2. 성적: 사용자 평점이 g 기준을 충족하면 가점.
+3. 소득: 사용자 소득분위가 i 기준에 부합하면 가점.
+4. 특정자격: s가 있으면 사용자가 그 자격의 지원 대상이므로 높은 가점, 사유에 반드시 언급.
+5. 기타: 전공, 학년 등 일치 여부를 종합 고려.
+
+[출력] 다른 설명 없이 JSON 배열만. 각 항목은 {{"id": 후보 번호, "reason": "지역/성적/소득/특정자격이 어떻게 부합하는지 구체적인 한국어 사유"}}.
+예: [{{"id":3,"reason":"거주하시는 '경기도 파주시' 지역 조건에 부합하며, 직전 학기 성적(4.1)이 요구 기준(3.5 이상)을 충족합니다."}}]
+"""
+
+
+def build_ranking_prompt(user_profile, ranked_scholarships, token_budget: int | None = None) -> RankingPrompt:
+    """
+    점수 순 후보(최대 MAX_CANDIDATES)로 프롬프트를 만든다. 후보를 순서대로 넣다가 예산을 넘으면 멈추되
+    최소 MIN_CANDIDATES개는 넣는다.
+    """
+    budget = token_budget or PROMPT_TOKEN_BUDGET
+    scholarships = list(ranked_scholarships)[:MAX_CANDIDATES]
+    user_flags = user_qualification_flags(user_profile)
+    user_block = dumps(compact_user(user_profile))
+    all_rows = compact_candidates(scholarships, user_flags)
+
+    def render(count):
+        rows, refs = dedupe_repeated(all_rows[:count])
+        refs_block = f"\n[공통 문구]\n{dumps(refs)}\n" if refs else ""
+        prompt = PROMPT_TEMPLATE.format(
+            user=user_block, legend=KEY_LEGEND, candidates="\n".join(dumps(r) for r in rows), refs=refs_block
+        )
+        return prompt, count_tokens(prompt)
+
+    # 예산 안에 들어가는 가장 큰 후보 수를 이분 탐색 (공통 문구 처리 때문에 후보별 토큰을 단순 합산할 수 없다)
+    low = min(MIN_CANDIDATES, len(all_rows))
+    prompt, tokens = render(low)
+    high = len(all_rows)
+    while low < high:
+        mid = (low + high + 1) // 2
+        mid_prompt, mid_tokens = render(mid)
+        if mid_tokens <= budget:
+            low, prompt, tokens = mid, mid_prompt, mid_tokens
+        else:
+            high = mid - 1
+    count = low
+
+    included = scholarships[:count]
+    return RankingPrompt(prompt, included, {i: s.product_id for i, s in enumerate(included, start=1)}, tokens)
+
+
+def resolve_product_id(item, product_ids: dict):
+    """GPT 응답 항목의 후보 번호(id)를 product_id로 바꾼다. 알 수 없는 번호면 None."""
+    if not isinstance(item, dict):
+        return None
+    try:
+        return product_ids.get(int(item.get("id")))
+    except (TypeError, ValueError):
+        return None
+
+
+@fake_responder("ranking")
+def _fake_ranking_response(messages) -> str:
+    """FakeBackend용: 프롬프트 후보(점수 순)의 앞 5개를 그대로 고르고 항목 기반 사유를 붙인다."""
+    lines = messages[-1]["content"].splitlines()
+    refs = json.loads(lines[lines.index("[공통 문구]") + 1]) if "[공통 문구]" in lines else {}
+    picks = []
+    for line in lines:
+        if not line.startswith('{"id":'):
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue
+        region = refs.get(row.get("r"), row.get("r"))
+        facts = [f"지역({region})" if region else "전국 대상"]
+        if row.get("s"):
+            facts.append(f"특정자격({', '.join(row['s'])})")
+        picks.append({"id": row["id"], "reason": f"{' · '.join(facts)} 조건에 부합하는 '{row.get('n', '')}' 장학금입니다."})
+        if len(picks) >= 5:
+            break
+    return dumps(picks)
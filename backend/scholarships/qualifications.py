@@ -0,0 +1,82 @@
+# scholarships/qualifications.py
+"""
+특정 자격(다문화/한부모/다자녀/국가유공자) 대상 여부를 수집 시점에 키워드로 판정해 Scholarship 플래그 컬럼에 저장합니다.
+
+GPT 랭킹 프롬프트가 매 요청 원문에서 찾던 키워드를 미리 찾아두는 것이라,
+특정 자격 일치는 결정적인 점수 항목(scoring.py의 special_status)과 추천 사유(reasons.py)가 됩니다.
+후보 필터링에는 쓰지 않습니다 (특정 자격이 없는 사용자도 일반 장학금은 받을 수 있으므로 가점만 준다).
+
+플래그 ↔ UserScholarship 필드 / 키워드 / 검사할 원문 필드는 DEFAULT_QUALIFICATION_FLAGS에 정의되어 있고,
+settings에 SCHOLARSHIP_QUALIFICATION_FLAGS(같은 형태의 dict)를 두면 그 값으로 대체됩니다 (기본 settings에는 없음).
+(플래그 자체는 Scholarship 컬럼이므로 새 플래그를 추가하려면 모델 필드와 마이그레이션도 필요합니다.)
+"""
+import re
+
+from django.conf import settings
+
+DEFAULT_QUALIFICATION_FLAGS = {
+    "targets_multicultural": {
+        "label": "다문화 가정",
+        "user_field": "is_multi_cultural_family",
+        "keywords": ["다문화"],
+        "fields": ["specific_qualification_details", "income_criteria_details"],
+    },
+    "targets_single_parent": {
+        "label": "한부모 가정",
+        "user_field": "is_single_parent_family",
+        # "가정형편/경제사정 곤란"은 일반 저소득 장학금에도 쓰이므로 한부모 대상으로 보지 않는다
+        "keywords": ["한부모"],
+        "fields": ["specific_qualification_details", "income_criteria_details"],
+    },
+    "targets_multiple_children": {
+        "label": "다자녀 가정",
+        "user_field": "is_multiple_children_family",
+        "keywords": ["다자녀"],
+        "fields": ["specific_qualification_details", "income_criteria_details"],
+    },
+    "targets_national_merit": {
+        "label": "국가유공자",
+        "user_field": "is_national_merit",
+        "keywords": ["국가유공자", "보훈"],
+        "fields": ["specific_qualification_details", "income_criteria_details"],
+    },
+}
+
+# "다문화 가정 제외"처럼 키워드 바로 뒤에 부정 표현이 오면 대상이 아니라 제외 조건이다
+_NEGATION = r"(?![^,.\n]{0,8}(?:제외|불가|제한|아닌))"
+
+
+def qualification_flags() -> dict:
+    return getattr(settings, "SCHOLARSHIP_QUALIFICATION_FLAGS", DEFAULT_QUALIFICATION_FLAGS)
+
+
+def _pattern(keywords) -> re.Pattern:
+    return re.compile("(?:" + "|".join(re.escape(k) for k in keywords) + ")" + _NEGATION)
+
+
+def extract_qualification_flags(scholarship) -> dict[str, bool]:
+    """Scholarship(또는 같은 필드를 가진 객체)의 원문에서 플래그 값을 계산한다."""
+    flags = {}
+    for flag, spec in qualification_flags().items():
+        pattern = _pattern(spec["keywords"])
+        flags[flag] = any(pattern.search(getattr(scholarship, f, "") or "") for f in spec["fields"])
+    return flags
+
+
+def apply_qualification_flags(scholarship) -> dict[str, bool]:
+    """플래그를 계산해 인스턴스에 채운다 (저장은 호출 측)."""
+    flags = extract_qualification_flags(scholarship)
+    for flag, value in flags.items():
+        setattr(scholarship, flag, value)
+    return flags
+
+
+def user_qualification_flags(user_profile) -> list[str]:
+    """사용자가 해당하는 특정 자격의 플래그 이름 목록."""
+    return [flag for flag, spec in qualification_flags().items() if getattr(user_profile, spec["user_field"], False)]
+
+
+def matched_qualification_labels(scholarship, user_flags: list[str]) -> list[str]:
+    """프롬프트/추천 사유에 쓸, 사용자와 장학금이 함께 해당하는 특정 자격 이름."""
+    specs = qualification_flags()
+    return [specs[flag]["label"] for flag in user_flags if getattr(scholarship, flag, False)]
@@ -0,0 +1,189 @@
+# scholarships/ranking_cache.py
+"""
+GPT 최종 랭킹 결과의 코호트 캐시 (사용자 간 공유).
+
+지역/대학/학년/전공/소득분위/평점 구간/가정 형편 플래그가 같은 사용자들은 후보군과 프롬프트가 사실상 같으므로
+GPT 랭킹 결과를 한 번만 받아 함께 씁니다.
+
+- 키 = 정규화한 프로필 특성 벡터(ranking_features) + 프롬프트에 들어간 후보 product_id(정렬) + 카탈로그 버전.
+  평점은 GPA_BUCKET 단위로 내림해 묶고, 추가 정보(자유 서술)가 있으면 그 해시도 키에 넣습니다.
+- 저장 = [(product_id, 사유 템플릿)]. 사유에서 사용자 고유 값(평점, 소득분위, 지역, 전공 ...)은 "{gpa_last_semester}" 같은
+  자리표시자로 바꿔 두었다가, 캐시를 읽는 사용자 값으로 다시 채웁니다.
+- 프로세스 내 LRU(+TTL)를 먼저 보고, 없으면 Redis(django cache, TTL)를 봅니다.
+- 적중/실패 수는 캐시 카운터(counters.CacheCounters)에 누적되며 get_metrics()로 적중률과 함께 조회합니다.
+"""
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .counters import CacheCounters
+from .eligibility import user_eligibility
+from .recommendation_cache import cohort_features, get_catalog_version
+
+CACHE_PREFIX = "ranking"
+CACHE_TIMEOUT = getattr(settings, "RECOMMENDATION_RANKING_CACHE_TIMEOUT", 60 * 60 * 6)
+LOCAL_MAX_ENTRIES = getattr(settings, "RECOMMENDATION_RANKING_CACHE_SIZE", 1024)
+GPA_BUCKET = 0.25
+METRICS = ("local_hit", "shared_hit", "miss")
+
+# 사유 템플릿 자리표시자 → 사용자 값 (긴 값부터 바꾼다)
+PERSONAL_FIELDS = ("region_full", "gpa_last_semester", "gpa_overall", "income_level", "major_field", "semester", "district", "region")
+
+
+class LRUCache:
+    """스레드 안전한 프로세스 내 LRU 캐시. 항목마다 만료 시각(TTL)이 있다."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = LRUCache(LOCAL_MAX_ENTRIES, CACHE_TIMEOUT)
+
+
+def _gpa_bucket(value):
+    return math.floor(value / GPA_BUCKET) * GPA_BUCKET if value else None
+
+
+def ranking_features(user_profile) -> dict:
+    """GPT 랭킹 결과를 공유해도 되는 사용자끼리 같아지는 특성 벡터."""
+    features = cohort_features(user_profile)
+    features["major_field"] = (features["major_field"] or "").lower() or None
+    features["income_level"] = user_eligibility(user_profile).income_decile
+    features["gpa_last_semester"] = _gpa_bucket(getattr(user_profile, "gpa_last_semester", None))
+    features["gpa_overall"] = _gpa_bucket(getattr(user_profile, "gpa_overall", None))
+    note = features["additional_info"]
+    features["additional_info"] = hashlib.sha256(note.encode("utf-8")).hexdigest()[:16] if note else None
+    return features
+
+
+def ranking_cache_key(user_profile, candidate_product_ids, catalog_version: int | None = None) -> str:
+    if catalog_version is None:
+        catalog_version = get_catalog_version()
+    payload = json.dumps(
+        {"profile": ranking_features(user_profile), "candidates": sorted(candidate_product_ids)},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return f"{CACHE_PREFIX}:v{catalog_version}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def _personal_values(user_profile) -> dict[str, list[str]]:
+    """자리표시자별로 사유에 나타날 수 있는 사용자 값의 표기들."""
+    region = (getattr(user_profile, "region", "") or "").strip()
+    district = (getattr(user_profile, "district", "") or "").strip()
+    values = {
+        "region_full": [f"{region} {district}"] if region and district else [],
+        "region": [region] if region else [],
+        "district": [district] if district else [],
+    }
+    for field in ("gpa_last_semester", "gpa_overall"):
+        gpa = getattr(user_profile, field, None)
+        # 첫 표기가 personalize_reason에 쓰인다
+        values[field] = list(dict.fromkeys([str(gpa), f"{gpa:.2f}", f"{gpa:.1f}"])) if gpa else []
+    for field in ("income_level", "major_field", "semester"):
+        value = (getattr(user_profile, field, "") or "").strip()
+        values[field] = [value] if value else []
+    return values
+
+
+def templatize_reason(reason: str, user_profile) -> str:
+    """사유의 사용자 고유 값을 자리표시자로 바꾼다. 평점은 '3.5 이상'처럼 기준으로 쓰인 숫자는 건드리지 않는다."""
+    template = (reason or "").replace("{", "{{").replace("}", "}}")
+    values = _personal_values(user_profile)
+    replacements = sorted(
+        ((field, value) for field in PERSONAL_FIELDS for value in values[field]), key=lambda fv: len(fv[1]), reverse=True
+    )
+    for field, value in replacements:
+        if field.startswith("gpa_"):
+            pattern = rf"(?<![\d.]){re.escape(value)}(?![\d.])(?!\s*(?:점\s*)?(?:이상|만점|이하))"
+        else:
+            pattern = re.escape(value)
+        template = re.sub(pattern, "{" + field + "}", template)
+    return template
+
+
+def personalize_reason(template: str, user_profile) -> str:
+    values = {field: (v[0] if v else "") for field, v in _personal_values(user_profile).items()}
+    try:
+        return template.format_map(values)
+    except (KeyError, ValueError, IndexError):
+        return template
+
+
+_counters = CacheCounters(CACHE_PREFIX, METRICS)
+_bump = _counters.bump
+reset_metrics = _counters.reset
+
+
+def get_metrics() -> dict:
+    """누적 적중/실패 수와 적중률 (모든 워커 합산)."""
+    metrics = _counters.get()
+    total = sum(metrics.values())
+    metrics["hit_rate"] = round((metrics["local_hit"] + metrics["shared_hit"]) / total, 3) if total else 0.0
+    return metrics
+
+
+def get_cached_ranking(key: str):
+    """[(product_id, 사유 템플릿)] 또는 None."""
+    ranking = _local.get(key)
+    if ranking is not None:
+        _bump("local_hit")
+        return ranking
+    try:
+        ranking = cache.get(key)
+    except Exception:
+        ranking = None
+    if ranking is None:
+        _bump("miss")
+        return None
+    ranking = [tuple(item) for item in ranking]
+    _local.set(key, ranking)
+    _bump("shared_hit")
+    return ranking
+
+
+def store_ranking(key: str, ranking):
+    """ranking: [(product_id, 사유 템플릿)]. 빈 결과(폴백)는 저장하지 않는다."""
+    if not ranking:
+        return
+    ranking = [tuple(item) for item in ranking]
+    _local.set(key, ranking)
+    try:
+        cache.set(key, ranking, timeout=CACHE_TIMEOUT)
+    except Exception:
+        pass
@@ -0,0 +1,32 @@
+# scholarships/ratelimit.py
+"""스레드 간에 공유하는 토큰 버킷 레이트 리미터 (OpenAI 분당 요청 한도에 맞춰 호출 속도를 제한)."""
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, capacity: int | None = None):
+        self.rate = max(rate_per_minute, 1e-6) / 60.0  # 초당 충전되는 토큰 수
+        self.capacity = capacity if capacity is not None else max(1, int(self.rate))  # 허용 버스트 크기
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.wait_time = 0.0  # acquire()에서 기다린 누적 시간 (리포트용)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """토큰이 생길 때까지 블로킹한다."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.wait_time += now - started
+                    return
+                needed = (tokens - self._tokens) / self.rate
+            time.sleep(needed)
@@ -0,0 +1,78 @@
+# scholarships/reasons.py
+"""
+GPT 없이 만드는 추천 사유 (빠른 모드 / GPT 장애 시 폴백).
+
+점수 계산기(scoring.py)가 어떤 특성에서 점수를 줬는지(지역 일치 단계, 전공, 평점·소득 여유, 특정 자격, 마감 임박)를
+보고 정해진 문장 틀로 사유를 씁니다. 같은 입력이면 항상 같은 문장이 나옵니다.
+"""
+import datetime
+
+from .eligibility import USER_GPA_SCALE, user_eligibility
+from .qualifications import qualification_flags, user_qualification_flags
+from .region_tree import user_region_full_name
+
+REASON_TEMPLATES = {
+    "region_local": "거주하시는 '{region}' 지역을 대상으로 하는 장학금입니다.",
+    "region_parent": "거주하시는 지역이 속한 '{region}' 전체를 대상으로 하는 장학금입니다.",
+    "nationwide": "전국 대학생을 대상으로 하는 장학금입니다.",
+    "major_match": "'{major}' 전공이 지원 대상 학과에 포함됩니다.",
+    "open_major": "전공 제한이 없어 지원할 수 있습니다.",
+    "gpa_margin": "평점({gpa})이 요구 기준({min_gpa} 이상)을 충족합니다.",
+    "income_margin": "소득분위({decile}분위)가 지원 기준({max_decile}분위 이내)에 부합합니다.",
+    "special_status": "{labels} 대상 장학금으로 특정 자격 조건에 해당합니다.",
+    "deadline": "모집 마감이 {days}일 남았으니 서둘러 지원하세요.",
+    "deadline_today": "오늘 모집이 마감되니 서둘러 지원하세요.",
+}
+FALLBACK_REASON = "프로필의 지역·학년·전공 조건에 맞는 장학금입니다."
+
+
+def _fmt_number(value: float) -> str:
+    return f"{value:g}"
+
+
+def fast_reason(entry, features: dict[str, float], user_profile, today: datetime.date | None = None) -> str:
+    """스냅샷 항목과 그 항목의 점수 특성 값(CatalogSnapshot.explain)으로 사유 문장을 만든다."""
+    sentences = []
+
+    if features.get("nationwide"):
+        sentences.append(REASON_TEMPLATES["nationwide"])
+    elif features.get("region_depth", 0) >= 1:
+        full_name = user_region_full_name(getattr(user_profile, "region", ""), getattr(user_profile, "district", ""))
+        sentences.append(REASON_TEMPLATES["region_local"].format(region=full_name))
+    elif features.get("region_depth", 0) > 0:
+        sentences.append(REASON_TEMPLATES["region_parent"].format(region=(getattr(user_profile, "region", "") or "").strip()))
+
+    user_flags = user_qualification_flags(user_profile)
+    specs = qualification_flags()
+    labels = [specs[flag]["label"] for flag in user_flags if flag in entry.qualification_flags]
+    if labels:
+        sentences.append(REASON_TEMPLATES["special_status"].format(labels=", ".join(labels)))
+
+    if features.get("major_match"):
+        sentences.append(REASON_TEMPLATES["major_match"].format(major=(getattr(user_profile, "major_field", "") or "").strip()))
+    elif features.get("open_major"):
+        sentences.append(REASON_TEMPLATES["open_major"])
+
+    user = user_eligibility(user_profile)
+    if features.get("gpa_margin") and entry.min_gpa is not None:
+        min_gpa = _fmt_number(entry.min_gpa)
+        if entry.gpa_scale and entry.gpa_scale != USER_GPA_SCALE:
+            min_gpa = f"{min_gpa}/{_fmt_number(entry.gpa_scale)}"
+        sentences.append(REASON_TEMPLATES["gpa_margin"].format(gpa=_fmt_number(user.gpa), min_gpa=min_gpa))
+    if features.get("income_margin") and entry.max_income_decile is not None:
+        sentences.append(REASON_TEMPLATES["income_margin"].format(decile=user.income_decile, max_decile=entry.max_income_decile))
+
+    if features.get("deadline") and entry.recruitment_end:
+        days = (entry.recruitment_end - (today or datetime.date.today())).days
+        sentences.append(REASON_TEMPLATES["deadline_today"] if days == 0 else REASON_TEMPLATES["deadline"].format(days=days))
+
+    return " ".join(sentences) or FALLBACK_REASON
+
+
+def fast_reasons(snapshot, user_profile, ids) -> dict[int, str]:
+    """id별 사유 (스냅샷에 없는 id는 FALLBACK_REASON)."""
+    explained = snapshot.explain(user_profile, ids)
+    return {
+        pk: fast_reason(*explained[pk], user_profile) if pk in explained else FALLBACK_REASON
+        for pk in ids
+    }
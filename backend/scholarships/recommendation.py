@@ -1,42 +1,106 @@
 # scholarships/recommendation.py
 
-import openai
 import json
 import re
 from datetime import datetime
-from django.db.models import QuerySet, Q, Case, When, Value
+from django.db.models import QuerySet, Case, When, Value
 from django.conf import settings
 from scholarships.models import Scholarship
+from scholarships.catalog import get_catalog_snapshot
+from scholarships.prompting import build_ranking_prompt, resolve_product_id
+from scholarships.llm import LLMError, get_llm_client
+from scholarships.reasons import fast_reasons
+from scholarships.ranking_cache import (
+    get_cached_ranking,
+    personalize_reason,
+    ranking_cache_key,
+    store_ranking,
+    templatize_reason,
+)
 from userinfor.models import UserScholarship
-from django.db import models
 
-# --- API 키 설정 ---
-openai.api_key = settings.OPENAI_API_KEY
+# 최종 랭킹 방식: gpt = GPT가 선택·사유 작성 / fast = 점수 순 + 템플릿 사유 (GPT 호출 없음, GPT 실패 시 폴백)
+MODE_GPT = "gpt"
+MODE_FAST = "fast"
+RECOMMENDATION_MODES = (MODE_GPT, MODE_FAST)
+
+SYSTEM_PROMPT = "당신은 장학금 추천 시스템입니다. 사용자의 요청에 따라 정확한 JSON 형식으로만 응답해야 합니다."
+# 사용자가 기다리는 호출이므로 재시도까지 포함해 이 시간 안에 끝나지 않으면 점수 순 결과로 폴백
+RANKING_DEADLINE = getattr(settings, "LLM_RANKING_DEADLINE_SECONDS", 20)
+
 
 # --- GPT 상호작용 헬퍼 함수 ---
+def _ranking_messages(prompt: str) -> list:
+    return [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]
+
+
 def call_gpt(prompt: str) -> str:
-    """OpenAI GPT 모델을 호출하고 응답 텍스트를 반환합니다."""
+    """공용 LLM 클라이언트로 GPT를 호출하고 응답 텍스트를 반환합니다. 실패(서킷 열림 포함) 시 빈 문자열."""
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "당신은 장학금 추천 시스템입니다. 사용자의 요청에 따라 정확한 JSON 형식으로만 응답해야 합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1
+        response = get_llm_client().complete(
+            _ranking_messages(prompt), purpose="ranking", deadline=RANKING_DEADLINE, temperature=0.1
         )
-        gpt_response_content = response['choices'][0]['message']['content']
-        
-        print("DEBUG: [GPT 응답 원본]")
-        print(gpt_response_content)
-        
-        return gpt_response_content
-    except openai.error.OpenAIError as e:
-        print(f"DEBUG: 오류: OpenAI API 호출 실패: {e}")
-        return ""
-    except Exception as e:
-        print(f"DEBUG: 오류: GPT 호출 중 알 수 없는 오류 발생: {e}")
+    except LLMError as e:
+        print(f"DEBUG: 오류: GPT 호출 실패: {e}")
         return ""
+    gpt_response_content = response.content
+
+    print("DEBUG: [GPT 응답 원본]")
+    print(gpt_response_content)
+
+    return gpt_response_content
+
+def call_gpt_stream(prompt: str):
+    """call_gpt의 스트리밍 버전. 응답 토큰(텍스트 조각)을 도착하는 대로 내보냅니다. 실패 시 조용히 끝납니다."""
+    try:
+        yield from get_llm_client().stream(
+            _ranking_messages(prompt), purpose="ranking", deadline=RANKING_DEADLINE, temperature=0.1
+        )
+    except LLMError as e:
+        print(f"DEBUG: 오류: GPT 스트리밍 호출 실패: {e}")
+
+
+class JsonObjectStream:
+    """
+    스트리밍으로 조금씩 들어오는 JSON 배열 텍스트에서, 완성된 최상위 객체({...})를 하나씩 꺼냅니다.
+    문자열 안의 중괄호/이스케이프는 무시하며, 코드 블록(```json) 같은 앞뒤 텍스트는 건너뜁니다.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.current = []
+
+    def feed(self, chunk: str) -> list:
+        objects = []
+        for ch in chunk:
+            if self.depth:
+                self.current.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if ch == '"' and self.depth:
+                self.in_string = True
+            elif ch == "{":
+                if not self.depth:
+                    self.current = [ch]
+                self.depth += 1
+            elif ch == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    try:
+                        objects.append(json.loads("".join(self.current)))
+                    except json.JSONDecodeError:
+                        pass
+                    self.current = []
+        return objects
+
 
 def extract_json_from_gpt_response(gpt_response_content: str) -> str:
     """GPT 응답 텍스트에서 JSON 배열 또는 객체를 찾습니다."""
@@ -53,22 +117,6 @@ def safe_parse_json(response_text: str):
         return []
 
 
-# --- 데이터 준비 헬퍼 함수 ---
-def _scholarship_to_simplified_dict(scholarship_obj):
-    """GPT가 상세 비교를 할 수 있도록, 원본 상세 텍스트를 전달합니다."""    
-    return {
-        "product_id": scholarship_obj.product_id,
-        "name": scholarship_obj.name, 
-        "product_type": scholarship_obj.product_type,
-        "university_type": scholarship_obj.university_type,
-        "academic_year_type": scholarship_obj.academic_year_type,
-        "major_field": scholarship_obj.major_field, 
-        "region": scholarship_obj.region,
-        "grade_criteria_details": scholarship_obj.grade_criteria_details,
-        "income_criteria_details": scholarship_obj.income_criteria_details,
-        "specific_qualification_details": scholarship_obj.specific_qualification_details,
-    }
-
 # --- 1단계: DB 사전 필터링 함수들 ---
 def filter_scholarships_by_date(scholarships_queryset: QuerySet) -> QuerySet:
     """모집 기간이 현재 날짜에 포함되는 장학금을 필터링합니다."""
@@ -80,186 +128,191 @@ def filter_scholarships_by_date(scholarships_queryset: QuerySet) -> QuerySet:
     print(f"DEBUG: [0. 날짜 필터링] 필터링 후 장학금 수: {filtered_qs.count()}")
     return filtered_qs
 
-def filter_basic(scholarships_queryset: QuerySet, user_profile: UserScholarship) -> QuerySet:
-    """사용자의 대학구분, 학년구분, 학과(전공)에 따라 장학금을 필터링합니다."""
-    print(f"DEBUG: [1. 기본 필터링] 사용자 프로필: 대학='{user_profile.university_type}', 학년='{user_profile.academic_year_type}', 전공='{user_profile.major_field}'")
-    current_filtered_qs = scholarships_queryset
-    
-    # 대학 유형 필터링
-    if user_profile.university_type and user_profile.university_type.strip():
-        all_university_types = current_filtered_qs.values_list('university_type', flat=True).distinct()
-        user_univ_type_normalized = user_profile.university_type.strip().replace('-', '~')
-        matching_types = [db_type for db_type in all_university_types if user_univ_type_normalized in db_type.replace('-', '~')]
-        if matching_types:
-            current_filtered_qs = current_filtered_qs.filter(university_type__in=matching_types)
-    
-    # 학년 유형 필터링
-    if user_profile.academic_year_type and user_profile.academic_year_type.strip():
-        all_academic_years_in_db = current_filtered_qs.values_list('academic_year_type', flat=True).distinct()
-        user_academic_year_normalized = user_profile.academic_year_type.strip().replace(' ', '')
-        matching_academic_years = [db_year for db_year in all_academic_years_in_db if user_academic_year_normalized in db_year.replace(' ', '')]
-        if matching_academic_years:
-            current_filtered_qs = current_filtered_qs.filter(academic_year_type__in=matching_academic_years)
-            
-    # 학과(전공) 필터링
-    user_major_field = getattr(user_profile, 'major_field', None)
-    if user_major_field and user_major_field.strip():
-        all_majors_in_db = current_filtered_qs.values_list('major_field', flat=True).distinct()
-        user_major_normalized = user_major_field.strip()
-        all_major_keywords = ["해당없음", "제한없음", "전공무관", "특정학과"] # '특정학과' 제외
-        q_objects = Q(major_field__icontains=user_major_normalized) | Q(major_field__in=all_major_keywords)
-        current_filtered_qs = current_filtered_qs.filter(q_objects)
-
-    print(f"DEBUG: [1. 기본 필터링] 최종 기본 필터링 적용 후 장학금 수: {current_filtered_qs.count()}")
-    return current_filtered_qs
-
-def filter_by_region_preprocessed(scholarships_queryset: QuerySet, user_profile: UserScholarship) -> QuerySet:
-    """사용자의 지역 정보와 정확히 일치하거나, 상위 지역, '전국'인 경우만 필터링합니다."""
-    user_region_do = getattr(user_profile, 'region', '') or ""
-    user_district = getattr(user_profile, 'district', '') or ""
-    
-    user_region_parts = list(filter(None, [user_region_do.strip(), user_district.strip()]))
-    full_user_region = ' '.join(user_region_parts)
-    print(f"DEBUG: [2. 지역 필터링] 조합된 사용자 지역: '{full_user_region}'")
-
-    if not full_user_region:
-        return scholarships_queryset.filter(region__icontains="전국")
-
-    exact_match_conditions = [full_user_region] + user_region_parts
-    q_objects = Q(region__in=exact_match_conditions) | Q(region__icontains="전국")
-    
-    filtered_qs = scholarships_queryset.filter(q_objects).distinct()
-    print(f"DEBUG: [2. 지역 필터링] 필터링 후 장학금 수: {filtered_qs.count()}")
-    return filtered_qs
+def filter_candidates(user_profile: UserScholarship) -> list[int]:
+    """
+    대학 유형·학년·학과·성적/소득 기준·지역 자격 조건을 인메모리 카탈로그 스냅샷으로 적용합니다 (규칙은 CatalogSnapshot.filter).
+    쿼리 없이 후보 장학금 id 목록을 돌려주고, DB는 최종 상위 N개를 읽을 때만 조회합니다.
+    """
+    candidates = get_catalog_snapshot().filter(user_profile)
+    print(f"DEBUG: [2. 후보 필터링] 스냅샷 필터링 후 장학금 수: {len(candidates)}")
+    return [e.id for e in candidates]
 
 
 # --- 2단계: GPT 최종 랭킹 함수 --- 
 
-def recommend_final_scholarships_by_gpt(filtered_scholarships_queryset: QuerySet, user_profile: UserScholarship) -> QuerySet:
-    """
-    GPT에게 최종 추천 이유까지 작성하도록 위임하고, 백엔드는 최소한의 검증(ID 유효성)만 수행하여
-    GPT의 추론 능력을 최대한 활용합니다.
-    """
-    print(f"DEBUG: [3. GPT 최종 추천] GPT 호출 전 후보군 수: {filtered_scholarships_queryset.count()}")
-    if filtered_scholarships_queryset.count() == 0:
-        return Scholarship.objects.none()
+def rank_candidates(candidate_ids: list[int], user_profile: UserScholarship) -> list[int]:
+    """후보 장학금 id를 다중 특성 점수(scholarships/scoring.py) 내림차순으로 정렬합니다 (쿼리 없음)."""
+    return get_catalog_snapshot().rank(user_profile, candidate_ids)
 
-    # --- 1. 점수제 샘플링 ---
-    user_region_do = getattr(user_profile, 'region', '') or ""
-    user_district = getattr(user_profile, 'district', '') or ""
-    full_user_region = ' '.join(filter(None, [user_region_do.strip(), user_district.strip()]))
-    user_major = getattr(user_profile, 'major_field', '') or ""
-
-    score_annotation = Case(
-        When(region=full_user_region, then=Value(10)),
-        When(region=user_region_do, then=Value(7)),
-        When(major_field__icontains=user_major, then=Value(5)),
-        When(region__icontains="전국", then=Value(1)),
-        default=Value(0),
-        output_field=models.IntegerField()
-    )
-    
-    scored_queryset = filtered_scholarships_queryset.annotate(
-        relevance_score=score_annotation
-    ).order_by('-relevance_score')
 
-    sample_size = 30
-    actual_sample_size = min(scored_queryset.count(), sample_size)
-    sampled_queryset_for_gpt = scored_queryset[:actual_sample_size]
-    
-    print(f"DEBUG: [3. GPT 최종 추천] 점수제 샘플링 후 GPT 분석 대상 수: {len(sampled_queryset_for_gpt)}")
-    sampled_scholarships_for_gpt = [_scholarship_to_simplified_dict(s) for s in sampled_queryset_for_gpt]
-    
-    # --- 2. 새로운 프롬프트 준비 ---
-    user_info_dict = user_profile.to_dict()
-    user_info_dict['region'] = full_user_region
-    user_info_dict.pop('district', None)
-    
-    prompt = f"""
-    당신은 사용자의 프로필과 장학금 자격 조건을 비교하여, 개인화된 추천 메시지를 작성하는 AI 카피라이터입니다.
-
-    [사용자 프로필]
-    {json.dumps(user_info_dict, ensure_ascii=False, indent=2)}
-
-    [분석 대상 장학금 목록]
-    {json.dumps(sampled_scholarships_for_gpt, ensure_ascii=False, indent=2)}
-
-    [업무 지시]
-    사용자 프로필과 장학금 목록을 분석하여, 가장 적합한 **상위 5개의 장학금**을 적합도 순으로 정렬하여 JSON 배열로 반환하세요.
-
-    **[매우 중요한 규칙]**
-    1.  **사실 기반 작성:** reason'을 작성할 때는 아래 규칙을 반드시 따르고, **규칙에 해당하는 내용만을 근거로** 사실에 기반하여 작성하세요. 절대 추측하거나 없는 내용을 지어내지 마세요.
-        규칙1.  **지역 조건:** 사용자의 지역('{user_info_dict.get("region")}')과 장학금의 'region'이 구체적으로 일치할수록 높은 점수를 주세요. '전국'은 그 다음입니다.
-
-        규칙2.  **성적 조건:** 사용자의 성적(gpa_last_semester, gpa_overall)과 장학금의 'grade_criteria_details'를 비교하여, 기준을 충족하면 점수를 부여하세요.
-
-        규칙3.  **소득 조건:** 사용자의 소득분위('income_level')와 장학금의 'income_criteria_details'를 비교하여, 기준에 부합하면 점수를 부여하세요. 
-
-        규칙4.  **특정 자격 조건 (가산점 항목):**
-            - 만약 사용자의 'is_multi_cultural_family'가 True이고, 장학금 설명(주로 'specific_qualification_details')에 '다문화'라는 텍스트가 있으면 높은 가산점을 주세요.
-            - 만약 사용자의 'is_single_parent_family'가 True이고, 장학금의 'income_criteria_details'에 '한부모', '가정형편', '경제사정'라는 텍스트가 있으면 높은 가산점을 주세요.
-            - 만약 사용자의 'is_multiple_children_family'가 True이고, 장학금의'income_criteria_details'에 '다자녀'라는 텍스트가 있으면 높은 가산점을 주세요.
-            - 만약 사용자의 'is_national_merit'가 True이고, 장학금의'income_criteria_details'에 '국가유공자' 또는 '보훈'이라는 텍스트가 있으면 높은 가산점을 주세요.
-
-        규칙5.  **기타 조건:** 위 조건 외에도 사용자의 전공, 학년 등이 장학금의 조건과 일치하는지 종합적으로 고려하세요.
-        
-    2.  **구체적인 이유 제시:** 'reason'에는 왜 이 장학금이 사용자에게 적합한지, 어떤 조건(예: 지역, 성적, 소득, 특정 자격)이 어떻게 부합하는지 **구체적으로** 서술하세요.
-
-    **[출력 형식]**
-    - 각 항목은 'product_id'와 'reason' 두 개의 키를 가진 JSON 객체여야 합니다.
-    - 'reason'은 사용자에게 보여줄 최종 추천 사유(한국어 문자열)입니다. 만약 규칙4로 인해 가산점을 얻은 경우, 'reason'에 그와 관련된 내용을 반드시 서술하세요. 
-    - 'product_id'는 절대 변경하지 마세요.
-
-    **[출력 예시]**
-    [
-      {{
-        "product_id": "장학금B_지자체B",
-        "reason": "거주하시는 '경기도 파주시' 지역 조건에 부합하며, 직전 학기 성적(4.1)이 요구 기준(3.5 이상)을 충족합니다."
-      }},
-      {{
-        "product_id": "장학금A_재단A",
-        "reason": "'다자녀 가정' 자격에 해당하며, '전국' 단위로 지원 가능하여 지역 제한이 없습니다."
-      }}
-    ]
-    """
+def _scholarships_in_order(ids: list) -> QuerySet:
+    """주어진 id 순서를 유지하는 쿼리셋."""
+    preserved_order = Case(*[When(id=pk, then=Value(i)) for i, pk in enumerate(ids)], default=Value(len(ids)))
+    return Scholarship.objects.filter(id__in=ids).order_by(preserved_order)
 
-    # --- 3. GPT 호출 및 결과 처리 (검증 로직 간소화) ---
-    gpt_response_content = call_gpt(prompt)
+
+def _rank_with_gpt(ranking_prompt) -> list | None:
+    """GPT를 호출해 검증을 통과한 추천 항목(product_id 포함) 목록을 반환합니다. 쓸 수 있는 응답이 없으면 None."""
+    gpt_response_content = call_gpt(ranking_prompt.prompt)
     parsed_response = safe_parse_json(gpt_response_content)
 
     if not isinstance(parsed_response, list) or not parsed_response:
-        # 폴백 시에는 점수 높은 순으로 반환
-        return scored_queryset[:min(scored_queryset.count(), 5)]
+        return None
 
-    # GPT가 반환한 ID가 유효한지(샘플링 후보군에 있는지) 최소한의 검증만 수행
+    # GPT가 반환한 후보 번호가 유효한지(프롬프트 후보군에 있는지) 최소한의 검증만 수행
     valid_recommendations = []
-    sampled_ids = [s.product_id for s in sampled_queryset_for_gpt]
     
     print("\n" + "="*25 + " GPT 응답 최소 검증 시작 " + "="*25)
     for item in parsed_response:
-        if isinstance(item, dict) and 'product_id' in item and item['product_id'] in sampled_ids:
+        pid = resolve_product_id(item, ranking_prompt.product_ids)
+        if pid is not None:
+            item['product_id'] = pid
             valid_recommendations.append(item)
-            print(f"  - ✅ 검증 성공 (ID 유효): {item['product_id']}, 이유: {item.get('reason')}")
+            print(f"  - ✅ 검증 성공 (ID 유효): {pid}, 이유: {item.get('reason')}")
         else:
-            print(f"  - ❌ 검증 실패 (ID 오류 또는 환각): {item.get('product_id')}")
+            print(f"  - ❌ 검증 실패 (번호 오류 또는 환각): {item.get('id') if isinstance(item, dict) else item}")
     print("="*25 + " GPT 응답 최소 검증 완료 " + "="*25 + "\n")
 
     if not valid_recommendations:
         print("경고: 검증을 통과한 추천 항목이 없습니다. 점수 기반 폴백 로직을 실행합니다.")
-        return scored_queryset[:min(scored_queryset.count(), 5)]
-    
-    # --- 4. 최종 결과 생성 ---
-    top_5_ids = [item['product_id'] for item in valid_recommendations[:5]]
-    
-    preserved_order = Case(*[When(product_id=pid, then=Value(i)) for i, pid in enumerate(top_5_ids)], default=Value(len(top_5_ids)))    
-    final_queryset = filtered_scholarships_queryset.filter(
-        product_id__in=top_5_ids
-    ).annotate(
-        relevance_score=score_annotation
-    ).order_by(preserved_order, '-relevance_score')
+        return None
+    return valid_recommendations
+
+
+def fast_recommendations(ranked_ids: list, user_profile: UserScholarship, fallback: bool = False) -> dict:
+    """
+    GPT 없이 점수 순 상위 5개와 템플릿 사유(reasons.py)로 최종 결과를 만듭니다 (mode=fast, GPT 실패 시 폴백).
+    반환 형태는 GPT 경로와 같습니다: {"scholarships", "reasons"(product_id → 사유), "fallback", "mode"}.
+    """
+    top_ids = ranked_ids[:5]
+    reasons_by_id = fast_reasons(get_catalog_snapshot(), user_profile, top_ids)
+    scholarships = list(_scholarships_in_order(top_ids))
+    reasons = {s.product_id: reasons_by_id.get(s.id, "") for s in scholarships}
+    return {"scholarships": scholarships, "reasons": reasons, "fallback": fallback, "mode": MODE_FAST}
 
-    print(f"DEBUG: [4. GPT 최종 추천] 최종 반환될 장학금 수: {final_queryset.count()}")
-    return final_queryset
+
+def final_recommendations(candidate_ids: list[int], user_profile: UserScholarship, mode: str = MODE_GPT) -> dict:
+    """
+    최종 추천 5개와 추천 사유. mode=gpt면 GPT에게 최종 선택과 사유 작성을 맡기고(백엔드는 ID 유효성만 검증),
+    GPT가 실패하면(타임아웃, 서킷 열림, 검증 실패) 빠른 모드 결과를 fallback=True로 돌려줍니다.
+    """
+    # --- 1. 점수제 샘플링 ---
+    ranked_ids = rank_candidates(candidate_ids, user_profile)
+    print(f"DEBUG: [3. 최종 추천] 모드: {mode}, 후보군 수: {len(ranked_ids)}")
+    if not ranked_ids:
+        return {"scholarships": [], "reasons": {}, "fallback": mode != MODE_FAST, "mode": mode}
+    if mode == MODE_FAST:
+        return fast_recommendations(ranked_ids, user_profile)
+
+    sample_size = 30
+    sampled_queryset_for_gpt = list(_scholarships_in_order(ranked_ids[:sample_size]))
+    
+    # --- 2. 새로운 프롬프트 준비 (토큰 예산 안에 드는 만큼만 후보를 넣는다) ---
+    ranking_prompt = build_ranking_prompt(user_profile, sampled_queryset_for_gpt)
+    print(f"DEBUG: [3. GPT 최종 추천] 프롬프트 후보 수: {len(ranking_prompt.scholarships)}, 프롬프트 토큰: {ranking_prompt.tokens}")
+
+    # --- 3. 코호트 랭킹 캐시: 특성 벡터와 후보군이 같은 다른 사용자가 받은 GPT 랭킹을 재사용 ---
+    ranking_key = ranking_cache_key(user_profile, ranking_prompt.product_ids.values())
+    cached_ranking = get_cached_ranking(ranking_key)
+    if cached_ranking is not None:
+        print(f"DEBUG: [3. GPT 최종 추천] 코호트 랭킹 캐시 적중 (GPT 호출 생략), 추천 {len(cached_ranking)}개")
+        valid_recommendations = [
+            {"product_id": pid, "reason": personalize_reason(template, user_profile)} for pid, template in cached_ranking
+        ]
+    else:
+        valid_recommendations = _rank_with_gpt(ranking_prompt)
+        if valid_recommendations is None:
+            # 폴백 시에는 점수 높은 순 + 템플릿 사유로 반환
+            return fast_recommendations(ranked_ids, user_profile, fallback=True)
+        store_ranking(ranking_key, [
+            (item['product_id'], templatize_reason(item.get('reason') or "", user_profile)) for item in valid_recommendations[:5]
+        ])
+
+    # --- 4. 최종 결과 생성 (후보군에 있는 ID만, 중복 없이 5개) ---
+    sampled_by_id = {s.product_id: s for s in ranking_prompt.scholarships}
+    scholarships, reasons = [], {}
+    for item in valid_recommendations:
+        pid = item['product_id']
+        if pid in sampled_by_id and pid not in reasons and len(scholarships) < 5:
+            scholarships.append(sampled_by_id[pid])
+            reasons[pid] = item.get('reason') or ""
+
+    print(f"DEBUG: [4. GPT 최종 추천] 최종 반환될 장학금 수: {len(scholarships)}")
+    return {"scholarships": scholarships, "reasons": reasons, "fallback": False, "mode": MODE_GPT}
+
+
+def recommend_final_scholarships_by_gpt(candidate_ids: list[int], user_profile: UserScholarship) -> QuerySet:
+    """final_recommendations의 장학금 목록만 순서를 유지한 쿼리셋으로 반환합니다 (사유가 필요 없는 호출 측용)."""
+    result = final_recommendations(candidate_ids, user_profile)
+    return _scholarships_in_order([s.id for s in result["scholarships"]])
+
+
+def _stream_fast(ranked_ids: list, user_profile: UserScholarship, fallback: bool = False):
+    """빠른 모드 결과를 스트리밍 이벤트(recommendation × N, done)로 내보낸다."""
+    result = fast_recommendations(ranked_ids, user_profile, fallback=fallback)
+    for rank, scholarship in enumerate(result["scholarships"], start=1):
+        yield "recommendation", {"rank": rank, "scholarship": scholarship, "reason": result["reasons"][scholarship.product_id]}
+    yield "done", result
+
+
+def stream_final_scholarships_by_gpt(candidate_ids: list[int], user_profile: UserScholarship, mode: str = MODE_GPT):
+    """
+    final_recommendations의 스트리밍 버전. (이벤트 이름, 데이터) 튜플을 순서대로 내보냅니다.
+      - "candidates": 점수제 상위 5개 장학금 목록 (상위 N개 DB 조회 한 번으로 즉시)
+      - "token": GPT 응답 텍스트 조각 (도착하는 대로, mode=gpt일 때만)
+      - "recommendation": 최종 추천 하나가 정해질 때마다 {"rank", "scholarship", "reason"}
+      - "done": 최종 목록 {"scholarships", "reasons", "fallback", "mode"} (GPT 실패 시 빠른 모드 결과, fallback=True)
+    """
+    ranked_ids = rank_candidates(candidate_ids, user_profile)
+    if mode == MODE_FAST:
+        yield "candidates", list(_scholarships_in_order(ranked_ids[:5]))
+        yield from _stream_fast(ranked_ids, user_profile)
+        return
+    sampled = list(_scholarships_in_order(ranked_ids[:30]))
+    top_by_score = sampled[:5]
+    yield "candidates", top_by_score
+    if not sampled:
+        yield "done", {"scholarships": [], "reasons": {}, "fallback": True, "mode": mode}
+        return
+
+    ranking_prompt = build_ranking_prompt(user_profile, sampled)
+    print(f"DEBUG: [3. GPT 스트리밍 추천] 프롬프트 후보 수: {len(ranking_prompt.scholarships)}, 프롬프트 토큰: {ranking_prompt.tokens}")
+    sampled_by_id = {s.product_id: s for s in ranking_prompt.scholarships}
+
+    # 코호트 랭킹 캐시가 있으면 GPT 스트림 없이 같은 이벤트로 바로 내보낸다
+    ranking_key = ranking_cache_key(user_profile, ranking_prompt.product_ids.values())
+    cached_ranking = get_cached_ranking(ranking_key)
+    if cached_ranking is not None:
+        print(f"DEBUG: [3. GPT 스트리밍 추천] 코호트 랭킹 캐시 적중 (GPT 호출 생략), 추천 {len(cached_ranking)}개")
+        ranked, reasons = [], {}
+        for pid, template in cached_ranking:
+            if pid in sampled_by_id and pid not in reasons:
+                ranked.append(sampled_by_id[pid])
+                reasons[pid] = personalize_reason(template, user_profile)
+                yield "recommendation", {"rank": len(ranked), "scholarship": sampled_by_id[pid], "reason": reasons[pid]}
+        yield "done", {"scholarships": ranked, "reasons": reasons, "fallback": False, "mode": MODE_GPT}
+        return
+
+    parser = JsonObjectStream()
+    ranked, reasons = [], {}
+    for delta in call_gpt_stream(ranking_prompt.prompt):
+        yield "token", delta
+        for item in parser.feed(delta):
+            pid = resolve_product_id(item, ranking_prompt.product_ids)
+            # 후보군에 있는 ID만, 중복 없이, 최대 5개 (final_recommendations와 같은 검증)
+            if pid not in sampled_by_id or pid in reasons or len(ranked) >= 5:
+                print(f"  - ❌ 검증 실패 (ID 오류, 중복 또는 초과): {pid}")
+                continue
+            ranked.append(sampled_by_id[pid])
+            reasons[pid] = item.get('reason') or ""
+            yield "recommendation", {"rank": len(ranked), "scholarship": sampled_by_id[pid], "reason": reasons[pid]}
+
+    if not ranked:
+        print("경고: 스트리밍 응답에서 검증을 통과한 추천 항목이 없습니다. 빠른 모드 결과로 마무리합니다.")
+        yield from _stream_fast(ranked_ids, user_profile, fallback=True)
+        return
+    store_ranking(ranking_key, [(s.product_id, templatize_reason(reasons[s.product_id], user_profile)) for s in ranked])
+    yield "done", {"scholarships": ranked, "reasons": reasons, "fallback": False, "mode": MODE_GPT}
 
 
 # --- 총괄 지휘 함수 ---
@@ -271,12 +324,26 @@ def recommend(user_id: int) -> QuerySet:
     except UserScholarship.DoesNotExist:
         print(f"오류: 사용자 ID {user_id}에 해당하는 프로필을 찾을 수 없습니다.")
         return Scholarship.objects.none()
+    return recommend_for_profile(user_profile)
 
-    scholarships = Scholarship.objects.all()
+
+def recommend_for_profile(user_profile: UserScholarship) -> QuerySet:
+    """프로필 객체로 추천을 실행합니다. (precompute_recommendations는 저장되지 않은 코호트 대표 프로필을 넘깁니다.)"""
     # scholarships = filter_scholarships_by_date(scholarships) # 1. 날짜 필터링 (필요시 활성화)
-    scholarships = filter_basic(scholarships, user_profile) # 2. 기본 자격 필터링
-    scholarships = filter_by_region_preprocessed(scholarships, user_profile) # 3. 지역 자격 필터링
-    final_recommendations = recommend_final_scholarships_by_gpt(scholarships, user_profile) # 4. 최종 랭킹
+    candidate_ids = filter_candidates(user_profile) # 2~3. 기본 + 지역 자격 필터링 (인메모리 스냅샷)
+    recommended = recommend_final_scholarships_by_gpt(candidate_ids, user_profile) # 4. 최종 랭킹
     
-    print(f"DEBUG: [전체 프로세스 완료] 최종 추천 장학금 수: {final_recommendations.count()}")
-    return final_recommendations
\ No newline at end of file
+    print("DEBUG: [전체 프로세스 완료]")
+    return recommended
+
+
+def recommend_with_reasons(user_profile: UserScholarship, mode: str = MODE_GPT) -> dict:
+    """추천 API용: 최종 장학금 목록과 사유 ({"scholarships", "reasons", "fallback", "mode"})."""
+    candidate_ids = filter_candidates(user_profile)
+    return final_recommendations(candidate_ids, user_profile, mode)
+
+
+def recommend_stream(user_profile: UserScholarship, mode: str = MODE_GPT):
+    """recommend()의 스트리밍 버전. 필터링은 같고, 최종 랭킹 단계를 stream_final_scholarships_by_gpt로 수행합니다."""
+    candidate_ids = filter_candidates(user_profile)
+    yield from stream_final_scholarships_by_gpt(candidate_ids, user_profile, mode)
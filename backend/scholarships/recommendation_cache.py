@@ -0,0 +1,186 @@
+# scholarships/recommendation_cache.py
+"""
+사용자별 추천 결과 캐시.
+
+키 = 사용자 ID + UserScholarship 필드 해시 + 카탈로그 버전.
+- 프로필이 바뀌면 해시가 달라져 자연히 새 키를 쓰고, save_scholarship_info가 이전 키를 지웁니다.
+- 장학금 데이터가 바뀌면(sync_scholarships, 지역 정형화) 카탈로그 버전을 올려 모든 사용자의 기존 항목을 무효화합니다.
+  버전의 원본은 DB(CatalogVersion)이고 Redis는 짧은 TTL의 읽기 캐시입니다.
+  요청 경로에서 생긴 단건 변경(찜 목록에서 만든 장학금 등)은 note_catalog_change()로 모아 두었다가
+  flush_catalog_changes()(Celery beat)가 한 번에 버전을 올립니다. 단건마다 올리면 야간 사전 계산이 매번 버려집니다.
+
+추천에 영향을 주는 항목만 같은 사용자들은 하나의 코호트로 묶어, precompute_recommendations가
+코호트마다 한 번만 계산한 결과(PrecomputedRecommendation)를 읽기 경로에서 그대로 사용합니다.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import CatalogVersion, PrecomputedRecommendation
+
+CACHE_PREFIX = "recommendation"
+# 예전에 Redis에만 두던 버전 키(recommendation:catalog_version)와 겹치지 않게 새 키를 쓴다
+CATALOG_VERSION_KEY = f"{CACHE_PREFIX}:catalog_version:db"
+# 버전 읽기 캐시 TTL(초). 다른 프로세스가 올린 버전은 늦어도 이 시간 안에 보인다
+CATALOG_VERSION_CACHE_TIMEOUT = getattr(settings, "RECOMMENDATION_CATALOG_VERSION_CACHE_SECONDS", 30)
+CACHE_TIMEOUT = getattr(settings, "RECOMMENDATION_CACHE_TIMEOUT", 60 * 60 * 6)
+
+
+def _cache_version(version: int):
+    try:
+        cache.set(CATALOG_VERSION_KEY, version, timeout=CATALOG_VERSION_CACHE_TIMEOUT)
+    except Exception:
+        pass
+
+
+def _evict_version():
+    try:
+        cache.delete(CATALOG_VERSION_KEY)
+    except Exception:
+        pass
+
+
+def get_catalog_version() -> int:
+    try:
+        version = cache.get(CATALOG_VERSION_KEY)
+    except Exception:
+        version = None
+    if version is None:
+        version = CatalogVersion.objects.get_or_create(pk=1)[0].version
+        _cache_version(version)
+    return int(version)
+
+
+def bump_catalog_version() -> int:
+    """장학금 카탈로그가 바뀌었음을 알린다. 기존 추천 캐시/사전 계산/스냅샷은 모두 무효가 된다 (캐시 키는 TTL로 사라짐)."""
+    with transaction.atomic():
+        CatalogVersion.objects.get_or_create(pk=1)
+        CatalogVersion.objects.filter(pk=1).update(version=F("version") + 1, pending_changes=0)
+        version = CatalogVersion.objects.values_list("version", flat=True).get(pk=1)
+        _invalidate_cached_version()
+    return version
+
+
+def _invalidate_cached_version():
+    # 캐시에 새 값을 쓰지 않고 지우기만 한다 (바깥 트랜잭션이 롤백되면 DB에 없는 버전이 캐시에 남으므로).
+    # 커밋 전에 다른 프로세스가 옛 값을 다시 캐시할 수 있어 커밋 후에도 한 번 더 지운다.
+    _evict_version()
+    transaction.on_commit(_evict_version)
+
+
+def note_catalog_change():
+    """단건 변경을 기록만 한다. 버전은 flush_catalog_changes()가 모아서 올린다."""
+    CatalogVersion.objects.get_or_create(pk=1)
+    CatalogVersion.objects.filter(pk=1).update(pending_changes=F("pending_changes") + 1)
+
+
+def flush_catalog_changes() -> int | None:
+    """기록된 단건 변경이 있으면 버전을 한 번 올리고 새 버전을, 없으면 None을 반환한다."""
+    with transaction.atomic():
+        updated = CatalogVersion.objects.filter(pk=1, pending_changes__gt=0).update(
+            version=F("version") + 1, pending_changes=0
+        )
+        if not updated:
+            return None
+        version = CatalogVersion.objects.values_list("version", flat=True).get(pk=1)
+        _invalidate_cached_version()
+    return version
+
+
+def profile_hash(user_profile) -> str:
+    payload = json.dumps(user_profile.to_dict(), ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# 필터링/랭킹 프롬프트에 쓰이는 프로필 항목 (이름, 생년월일, 학교명 등은 추천 결과에 영향이 없다고 보고 제외).
+# 추가 정보는 자유 서술이라 적은 사용자는 사실상 혼자 코호트가 되지만, 프롬프트에 들어가므로 빼면 남의 결과를 받는다.
+COHORT_FIELDS = (
+    "region",
+    "district",
+    "university_type",
+    "academic_year_type",
+    "semester",
+    "major_field",
+    "income_level",
+    "gpa_last_semester",
+    "gpa_overall",
+    "is_multi_cultural_family",
+    "is_single_parent_family",
+    "is_multiple_children_family",
+    "is_national_merit",
+    "additional_info",
+)
+
+
+def cohort_features(user_profile) -> dict:
+    features = {}
+    for field in COHORT_FIELDS:
+        value = getattr(user_profile, field, None)
+        if isinstance(value, str):
+            value = " ".join(value.split())
+        elif isinstance(value, float):
+            value = round(value, 2)
+        features[field] = value if value not in ("", None) else None
+    return features
+
+
+def cohort_key(user_profile) -> str:
+    payload = json.dumps(cohort_features(user_profile), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_precomputed_recommendations(user_profile):
+    """현재 카탈로그 버전으로 계산된 코호트 결과가 있으면 (scholarships, age_seconds), 없으면 None."""
+    row = (
+        PrecomputedRecommendation.objects.filter(
+            cohort_key=cohort_key(user_profile), catalog_version=get_catalog_version()
+        )
+        .values_list("scholarships", "computed_at")
+        .first()
+    )
+    if row is None:
+        return None
+    scholarships, computed_at = row
+    return scholarships, max(0, int(time.time() - computed_at.timestamp()))
+
+
+def recommendation_cache_key(user_profile, catalog_version: int | None = None) -> str:
+    if catalog_version is None:
+        catalog_version = get_catalog_version()
+    return f"{CACHE_PREFIX}:{user_profile.user_id}:{profile_hash(user_profile)}:v{catalog_version}"
+
+
+def get_cached_recommendations(user_profile):
+    """(scholarships, age_seconds) 또는 None."""
+    try:
+        entry = cache.get(recommendation_cache_key(user_profile))
+    except Exception:
+        return None
+    if not entry:
+        return None
+    return entry["scholarships"], max(0, int(time.time() - entry["created_at"]))
+
+
+def set_cached_recommendations(user_profile, scholarships: list):
+    if not scholarships:
+        return  # 빈 결과는 캐시하지 않는다 (데이터가 채워지면 바로 다시 계산)
+    try:
+        cache.set(
+            recommendation_cache_key(user_profile),
+            {"created_at": time.time(), "scholarships": scholarships},
+            timeout=CACHE_TIMEOUT,
+        )
+    except Exception:
+        pass
+
+
+def evict_cached_recommendations(cache_key: str):
+    try:
+        cache.delete(cache_key)
+    except Exception:
+        pass
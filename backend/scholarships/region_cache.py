@@ -0,0 +1,137 @@
+# scholarships/region_cache.py
+"""
+지역 조건 원문 → 지역 문자열 해석 결과의 content-addressed 캐시.
+
+정규화한 원문의 SHA-256을 키로 Redis(django cache) → DB(RegionResolution) 순서로 조회하고,
+둘 다 없을 때만 규칙 기반 파서 → GPT 순서로 해석해 결과를 저장합니다.
+배치 명령(process_scholarship_regions)과 요청 경로(AddToWishlistFromAPI)가 같은 캐시를 공유합니다.
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Callable, NamedTuple
+
+from django.core.cache import cache
+from django.db.models import F
+
+from .counters import CacheCounters
+from .models import RegionResolution, Scholarship
+from .regions import resolve_regions_locally
+
+CACHE_PREFIX = "region_resolution"
+CACHE_TIMEOUT = 60 * 60 * 24 * 7  # Redis에는 7일만 두고, 원본은 DB에 영구 보관
+METRICS = ("redis_hit", "db_hit", "miss", "rule", "gpt")
+
+
+class ResolvedRegion(NamedTuple):
+    region: str
+    source: str  # "redis" | "db" | "rule" | "gpt"
+
+
+def normalize_residency_text(text: str | None) -> str:
+    """공백·유니코드 표기 차이만 다른 '거의 같은' 원문이 같은 키를 갖도록 정규화한다."""
+    v = unicodedata.normalize("NFKC", text or "")
+    v = re.sub(r"\s+", " ", v).strip(" .·,")
+    return v
+
+
+def residency_text_hash(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def apply_residency_text_hash(scholarship) -> str:
+    """지역 조건 원문의 해시를 인스턴스에 채운다 (저장은 호출 측). 캐시 항목으로 장학금을 찾을 때 쓰는 인덱스 컬럼."""
+    scholarship.residency_text_hash = residency_text_hash(normalize_residency_text(scholarship.residency_requirement_details))
+    return scholarship.residency_text_hash
+
+
+def _cache_key(text_hash: str) -> str:
+    return f"{CACHE_PREFIX}:{text_hash}"
+
+
+_counters = CacheCounters(CACHE_PREFIX, METRICS)
+_bump = _counters.bump
+get_metrics = _counters.get
+reset_metrics = _counters.reset
+
+
+def cache_put(text_hash: str, region: str):
+    try:
+        cache.set(_cache_key(text_hash), region, CACHE_TIMEOUT)
+    except Exception:
+        pass
+
+
+def cache_evict(text_hashes):
+    try:
+        cache.delete_many([_cache_key(h) for h in text_hashes])
+    except Exception:
+        pass
+
+
+def scholarship_ids_for_hashes(text_hashes) -> list[int]:
+    """이 원문 해시들로 해석되는 장학금 id (캐시 항목을 고치거나 지울 때 다시 연결해야 하는 장학금)."""
+    wanted = list(set(text_hashes))
+    if not wanted:
+        return []
+    return list(Scholarship.objects.filter(residency_text_hash__in=wanted).values_list("id", flat=True))
+
+
+def lookup_residency_region(text: str | None) -> tuple[str, ResolvedRegion | None]:
+    """
+    캐시(Redis → DB)와 규칙 기반 파서로 해석을 시도한다. (정규화된 원문, 결과) 를 반환하며
+    결과가 None이면 GPT 호출이 필요하다.
+    """
+    normalized = normalize_residency_text(text)
+    text_hash = residency_text_hash(normalized)
+
+    # 1) Redis
+    try:
+        cached = cache.get(_cache_key(text_hash))
+    except Exception:
+        cached = None
+    if cached is not None:
+        _bump("redis_hit")
+        return normalized, ResolvedRegion(cached, "redis")
+
+    # 2) DB
+    row = RegionResolution.objects.filter(text_hash=text_hash).values_list("region", flat=True).first()
+    if row is not None:
+        RegionResolution.objects.filter(text_hash=text_hash).update(hit_count=F("hit_count") + 1)
+        cache_put(text_hash, row)
+        _bump("db_hit")
+        return normalized, ResolvedRegion(row, "db")
+
+    # 3) 규칙 기반
+    _bump("miss")
+    region = resolve_regions_locally(normalized)
+    if region is None:
+        return normalized, None
+    return normalized, ResolvedRegion(store_residency_region(normalized, region, RegionResolution.SOURCE_RULE), RegionResolution.SOURCE_RULE)
+
+
+def store_residency_region(normalized: str, region: str, source: str) -> str:
+    """해석 결과를 DB/Redis에 저장하고 최종 값을 반환한다. 빈 값(호출 실패)은 저장하지 않는다."""
+    if not region:
+        return region
+    _bump(source)
+    text_hash = residency_text_hash(normalized)
+    # 그 사이 다른 워커(또는 관리자)가 먼저 저장했다면 그 값을 따른다
+    row, _ = RegionResolution.objects.get_or_create(
+        text_hash=text_hash,
+        defaults={"normalized_text": normalized, "region": region, "source": source},
+    )
+    cache_put(text_hash, row.region)
+    return row.region
+
+
+def resolve_residency_region(text: str | None, gpt_fallback: Callable[[str], str]) -> ResolvedRegion:
+    """
+    캐시를 거쳐 지역 문자열을 반환한다. gpt_fallback은 규칙으로 확정되지 않을 때만 호출되며,
+    빈 문자열(호출 실패)을 돌려주면 캐시에 저장하지 않아 다음 실행에서 다시 시도한다.
+    """
+    normalized, resolved = lookup_residency_region(text)
+    if resolved is not None:
+        return resolved
+    region = gpt_fallback(normalized) or ""
+    return ResolvedRegion(store_residency_region(normalized, region, RegionResolution.SOURCE_GPT), RegionResolution.SOURCE_GPT)
@@ -0,0 +1,197 @@
+# scholarships/region_extraction.py
+"""
+지역 조건 원문을 정형화된 지역 문자열로 바꾸는 LLM 추출기.
+
+호출은 공용 LLM 클라이언트(llm.py)를 거치며, 벤치마크 시에는 FakeRegionExtractor(FakeBackend: 고정 지연 + 결정적 응답)로
+바꿔 네트워크 없이 처리량을 잴 수 있습니다. settings.LLM_BACKEND = "fake"면 기본 추출기도 같은 가짜 응답을 씁니다.
+
+extract_batch는 여러 원문을 한 요청에 묶어 보내고 id별 JSON 배열로 결과를 받습니다.
+긴 시스템 프롬프트를 항목마다 다시 보내지 않으므로 요청 수와 프롬프트 토큰이 크게 줄어듭니다.
+"""
+import json
+import random
+import re
+import threading
+
+from .llm import FakeBackend, LLMClient, LLMError, fake_responder, get_llm_client
+from .regions import NATIONWIDE, resolve_regions_locally
+from .tokens import count_tokens
+
+REGION_RULES = """
+당신은 한국 행정구역 전문가이며, 장학금 공고문에서 지역 조건을 분석하는 AI입니다.
+주어진 텍스트에서 해당하는 모든 지역명을 '특별시/광역시/도' 뿐만 아니라 '시/군/구' 단위까지 포함하여, **가장 구체적인 전체 경로(full path)로** 쉼표(,)로 구분된 단일 문자열로 반환해야 합니다.
+
+**규칙 및 예시:**
+1.  **전체 경로로 변환:** '영월군' -> '강원도 영월군', '수원시' -> '경기도 수원시'
+2.  **약어 변환:** '서울' -> '서울특별시', '충남' -> '충청남도'
+3.  **복합 경로 처리:** '충청남북도' -> '충청남도,충청북도'
+4.  **구체적인 주소 유지:**
+    - "강원도 영월군 주천면" -> "강원도 영월군 주천면"
+    - "전라남도 화순군 거주" -> "전라남도 화순군"
+5.  **예외 조건 처리:**
+    - "서울, 광역시 제외 전국" -> 경기도,강원도,충청북도,충청남도,전라북도,전라남도,경상북도,경상남도,제주특별자치도,세종특별자치시
+    - "온라인 과정 이수자" 또는 "해외 유학생" -> "온라인" 또는 "해외"
+6.  **지역명 미포함 시:** 특정 지역이 명시되지 않았으면 "전국"으로 간주합니다.
+"""
+
+REGION_SYSTEM_PROMPT = REGION_RULES + """7.  **출력 형식:** 다른 설명 없이 오직 쉼표로 구분된 지역명 문자열만 반환하세요.
+
+이제 분석을 시작합니다.
+"""
+
+REGION_BATCH_SYSTEM_PROMPT = REGION_RULES + """7.  **출력 형식:** 입력은 [{"id": 번호, "text": "지역 조건"}] 형태의 JSON 배열입니다.
+    각 항목에 대해 위 규칙으로 변환한 결과를 다른 설명 없이 [{"id": 번호, "region": "쉼표로 구분된 지역명"}] 형태의 JSON 배열로만 반환하세요.
+    입력의 모든 id를 빠짐없이 한 번씩 포함해야 합니다.
+
+이제 분석을 시작합니다.
+"""
+
+# 배치 응답에서 항목 하나가 차지하는 출력 토큰 추정치 (id/키 포함)
+OUTPUT_TOKENS_PER_ITEM = 40
+# 배치 입력에서 항목마다 붙는 JSON 구조 오버헤드
+ITEM_OVERHEAD_TOKENS = 12
+
+
+def plan_batches(texts, token_budget: int = 4000, max_items: int = 50, model: str = "gpt-4o"):
+    """
+    원문 목록을 배치로 나눈다. 배치마다 (시스템 프롬프트 + 입력 항목 + 예상 출력) 토큰이
+    token_budget을 넘지 않고, 항목 수는 max_items 이하가 되도록 순서대로 채운다.
+    예산보다 큰 원문 하나는 단독 배치가 된다.
+    """
+    base = count_tokens(REGION_BATCH_SYSTEM_PROMPT, model)
+    batch, used = [], base
+    for text in texts:
+        cost = count_tokens(text, model) + ITEM_OVERHEAD_TOKENS + OUTPUT_TOKENS_PER_ITEM
+        if batch and (used + cost > token_budget or len(batch) >= max_items):
+            yield batch
+            batch, used = [], base
+        batch.append(text)
+        used += cost
+    if batch:
+        yield batch
+
+
+def parse_batch_response(content: str, expected_ids) -> dict:
+    """
+    배치 응답(JSON 배열)을 {id: region}으로 바꾼다.
+    요청하지 않은 id, 빈 region, 형식이 맞지 않는 항목은 버린다 → 호출 측에서 누락으로 보고 재요청한다.
+    """
+    content = re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip())
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        return {}
+    if isinstance(payload, dict):
+        payload = payload.get("results") or payload.get("items") or []
+    if not isinstance(payload, list):
+        return {}
+
+    expected = set(expected_ids)
+    results = {}
+    for item in payload:
+        if not isinstance(item, dict):
+            continue
+        try:
+            item_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        region = item.get("region")
+        if item_id in expected and isinstance(region, str) and region.strip():
+            results[item_id] = region.strip().split("\n")[0]
+    return results
+
+
+class OpenAIRegionExtractor:
+    """공용 LLM 클라이언트(llm.py)로 지역을 추출한다. timeout은 재시도를 포함한 호출 하나의 데드라인(초)."""
+
+    def __init__(self, model: str = "gpt-4o", timeout: float = 30, log=None, client=None):
+        self.model = model
+        self.timeout = timeout
+        self.log = log or print
+        self.client = client or get_llm_client()
+        self._stats_lock = threading.Lock()
+        self.request_count = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def _record_usage(self, response):
+        with self._stats_lock:
+            self.request_count += 1
+            self.prompt_tokens += response.prompt_tokens
+            self.completion_tokens += response.completion_tokens
+
+    def extract(self, text: str) -> str:
+        """실패하면 빈 문자열을 반환한다."""
+        try:
+            response = self.client.complete(
+                [
+                    {"role": "system", "content": REGION_SYSTEM_PROMPT},
+                    {"role": "user", "content": text},
+                ],
+                purpose="region",
+                deadline=self.timeout,
+                model=self.model,
+                temperature=0.0,
+            )
+        except LLMError as e:
+            self.log(f"GPT API 호출 중 오류 발생: {e}")
+            return ""
+        self._record_usage(response)
+        return response.content.strip().split("\n")[0]
+
+    def extract_batch(self, items: dict) -> dict:
+        """
+        items: {id(int): 원문}. 응답에 포함된 항목만 {id: region}으로 돌려준다.
+        누락된 id는 결과에 없으므로 호출 측이 다시 큐에 넣는다. 호출 자체가 실패하면 빈 dict.
+        """
+        payload = json.dumps([{"id": i, "text": t} for i, t in items.items()], ensure_ascii=False)
+        try:
+            response = self.client.complete(
+                [
+                    {"role": "system", "content": REGION_BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": payload},
+                ],
+                purpose="region_batch",
+                deadline=self.timeout,
+                model=self.model,
+                temperature=0.0,
+                max_tokens=OUTPUT_TOKENS_PER_ITEM * len(items) + 50,
+            )
+        except LLMError as e:
+            self.log(f"GPT 배치 호출 중 오류 발생 ({len(items)}건): {e}")
+            return {}
+        self._record_usage(response)
+        return parse_batch_response(response.content, items.keys())
+
+
+def _local_region(text: str) -> str:
+    return resolve_regions_locally(text) or NATIONWIDE
+
+
+@fake_responder("region")
+def _fake_region_response(messages) -> str:
+    return _local_region(messages[-1]["content"])
+
+
+@fake_responder("region_batch")
+def _fake_region_batch_response(messages) -> str:
+    items = json.loads(messages[-1]["content"])
+    return json.dumps([{"id": item["id"], "region": _local_region(item["text"])} for item in items], ensure_ascii=False)
+
+
+class FakeRegionExtractor(OpenAIRegionExtractor):
+    """
+    네트워크 없이 처리량을 재기 위한 가짜 추출기. FakeBackend(latency초 지연 + 규칙 기반 결정적 응답)를 쓰는
+    전용 클라이언트로 OpenAIRegionExtractor와 같은 경로(재시도/서킷/토큰 집계)를 탄다.
+    drop_rate를 주면 배치 응답에서 그 비율만큼 항목을 빠뜨려 재요청 경로를 시험할 수 있다.
+    """
+
+    def __init__(self, latency: float = 1.0, drop_rate: float = 0.0, model: str = "gpt-4o", max_concurrency: int = 64):
+        super().__init__(
+            model=model, client=LLMClient(backend=FakeBackend(latency=latency), max_concurrency=max_concurrency)
+        )
+        self.drop_rate = drop_rate
+
+    def extract_batch(self, items: dict) -> dict:
+        results = super().extract_batch(items)
+        return {i: r for i, r in results.items() if random.random() >= self.drop_rate}
@@ -0,0 +1,136 @@
+# scholarships/region_tree.py
+"""
+정형화된 지역 문자열(Scholarship.region) ↔ Region 계층 테이블 연결.
+
+- sync_region_table(): REGIONS 표로 전국/시·도/시·군·구 노드를 만든다 (이미 있는 노드의 코드는 바꾸지 않음).
+- link_scholarship_regions(): 장학금별 region 문자열을 파싱해 Scholarship.regions(M2M)를 다시 채운다.
+- ancestor_codes() / user_region_full_name(): 사용자 지역의 조상 코드를 구한다 (catalog.CatalogSnapshot의 지역 필터).
+
+데이터 마이그레이션(0016)은 이 모듈을 가져오지 않고 당시 표와 규칙을 고정한 사본을 씁니다.
+"""
+from .models import Region, Scholarship
+from .regions import REGIONS, SIDO_ALIASES, COMPOUND_ALIASES, NATIONWIDE
+
+ROOT_CODE = "KR"
+
+# 이름/약칭 → 정식 시/도명
+_SIDO_BY_NAME = {sido: sido for sido in REGIONS}
+for _sido, _aliases in SIDO_ALIASES.items():
+    for _alias in _aliases:
+        _SIDO_BY_NAME.setdefault(_alias, _sido)
+
+# 시/군/구명 → 그 이름을 가진 시/도 목록 (시/도 없이 "수원시"만 온 경우, 유일할 때만 사용)
+_SIDOS_BY_DISTRICT = {}
+for _sido, _districts in REGIONS.items():
+    for _district in _districts:
+        _SIDOS_BY_DISTRICT.setdefault(_district, []).append(_sido)
+
+
+def region_paths(region: str | None) -> set[tuple[str, ...]]:
+    """
+    정형화된 지역 문자열을 경로 집합으로 바꾼다. 빈 튜플은 전국.
+    예) "서울특별시,경기도 수원시" → {("서울특별시",), ("경기도", "수원시")}
+    "강원도 영월군 주천면"처럼 표에 없는 하위 단위는 알려진 가장 깊은 단위(강원도 영월군)로 올리고,
+    "온라인"/"해외"처럼 행정구역이 아닌 토큰은 버린다.
+    """
+    paths = set()
+    for token in (region or "").split(","):
+        words = token.split()
+        if not words:
+            continue
+        head = words[0]
+        if head == NATIONWIDE:
+            paths.add(())
+            continue
+
+        if head in COMPOUND_ALIASES:
+            paths.update((sido,) for sido in COMPOUND_ALIASES[head])
+            continue
+
+        sido = _SIDO_BY_NAME.get(head)
+        if sido is None:
+            sidos = _SIDOS_BY_DISTRICT.get(head, [])
+            if len(sidos) == 1:
+                paths.add((sidos[0], head))
+            continue
+
+        if len(words) > 1 and words[1] in REGIONS[sido]:
+            paths.add((sido, words[1]))
+        else:
+            paths.add((sido,))
+    return paths
+
+
+def path_full_name(path: tuple[str, ...]) -> str:
+    return " ".join(path) if path else NATIONWIDE
+
+
+def sync_region_table() -> dict[str, int]:
+    """REGIONS 표의 노드를 모두 만들고 {전체 지역명: id}를 반환한다. 새 노드는 형제 중 마지막 코드 다음 번호를 받는다."""
+    nodes = {r.full_name: r for r in Region.objects.all()}
+
+    def ensure(path, parent, width):
+        full_name = path_full_name(path)
+        node = nodes.get(full_name)
+        if node is not None:
+            return node
+        if parent is None:
+            code = ROOT_CODE
+        else:
+            siblings = [n.code for n in nodes.values() if n.parent_id == parent.id]
+            last = max((int(c.rsplit(".", 1)[1]) for c in siblings), default=0)
+            code = f"{parent.code}.{last + 1:0{width}d}"
+        node = Region.objects.create(
+            code=code,
+            name=path[-1] if path else NATIONWIDE,
+            full_name=full_name,
+            parent=parent,
+            depth=len(path),
+        )
+        nodes[full_name] = node
+        return node
+
+    root = ensure((), None, 0)
+    for sido, districts in REGIONS.items():
+        sido_node = ensure((sido,), root, 2)
+        for district in districts:
+            ensure((sido, district), sido_node, 3)
+    return {name: node.id for name, node in nodes.items()}
+
+
+def link_scholarship_regions(region_by_scholarship: dict[int, str], region_ids: dict[str, int] | None = None) -> int:
+    """
+    {scholarship_id: region 문자열}로 Scholarship.regions를 다시 채운다 (기존 연결은 지우고 새로 넣음).
+    region_ids를 넘기지 않으면 Region 테이블에서 읽는다. 만든 연결 수를 반환한다.
+    """
+    if not region_by_scholarship:
+        return 0
+    through = Scholarship.regions.through
+    if region_ids is None:
+        region_ids = dict(Region.objects.values_list("full_name", "id"))
+
+    links = []
+    for scholarship_id, region in region_by_scholarship.items():
+        for path in region_paths(region):
+            region_id = region_ids.get(path_full_name(path))
+            if region_id is not None:
+                links.append(through(scholarship_id=scholarship_id, region_id=region_id))
+
+    ids = list(region_by_scholarship)
+    for i in range(0, len(ids), 500):
+        through.objects.filter(scholarship_id__in=ids[i:i + 500]).delete()
+    through.objects.bulk_create(links, batch_size=500, ignore_conflicts=True)
+    return len(links)
+
+
+def ancestor_codes(code: str) -> list[str]:
+    """경로 코드의 모든 조상 코드 (자기 자신 포함). 예) "KR.09.013" → ["KR", "KR.09", "KR.09.013"]"""
+    parts = code.split(".")
+    return [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+def user_region_full_name(region: str | None, district: str | None) -> str:
+    """사용자 지역(시/도 + 시/군/구)을 Region.full_name 형태로. 모르는 값이면 "전국"."""
+    paths = region_paths(" ".join(filter(None, [(region or "").strip(), (district or "").strip()])))
+    return path_full_name(max(paths, key=len, default=()))
+
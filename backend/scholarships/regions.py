@@ -0,0 +1,249 @@
+# scholarships/regions.py
+"""
+규칙 기반 한국 행정구역 파서.
+
+장학금의 '지역거주여부 상세내용'은 대부분 "서울", "충남", "경기도 수원시" 같은 단순한 지역명이라
+GPT 없이도 결정적으로 정형화할 수 있습니다. 시/도 · 시/군/구 이름(약칭, "충청남북도" 같은 복합 표기, "수도권" 같은 권역 포함)으로
+트라이를 만들어 최장 일치로 훑고, 애매하거나 "…제외 전국" 같은 예외 문구가 있으면 None을 돌려 GPT로 넘깁니다.
+아는 지역명이 없어도 "농어촌", "지방"처럼 지역 범위를 뜻하는 표현이 있으면 전국으로 보지 않고 GPT로 넘깁니다.
+
+출력 형식은 GPT 프롬프트와 같습니다: 가장 구체적인 전체 경로를 쉼표로 이은 문자열 (예: "서울특별시,경기도 수원시").
+"""
+import re
+from typing import NamedTuple
+
+NATIONWIDE = "전국"
+
+# frontend/src/data/regions.js 와 같은 표 (사용자 프로필의 region/district 값과 이름을 맞춘다)
+REGIONS = {
+    "서울특별시": ["강남구", "강동구", "강북구", "강서구", "관악구", "광진구", "구로구", "금천구", "노원구", "도봉구", "동대문구", "동작구", "마포구", "서대문구", "서초구", "성동구", "성북구", "송파구", "양천구", "영등포구", "용산구", "은평구", "종로구", "중구", "중랑구"],
+    "부산광역시": ["강서구", "금정구", "기장군", "남구", "동구", "동래구", "부산진구", "북구", "사상구", "사하구", "서구", "수영구", "연제구", "영도구", "중구", "해운대구"],
+    "대구광역시": ["군위군", "남구", "달서구", "달성군", "동구", "북구", "서구", "수성구", "중구"],
+    "인천광역시": ["강화군", "계양구", "남동구", "동구", "미추홀구", "부평구", "서구", "연수구", "옹진군", "중구"],
+    "광주광역시": ["광산구", "남구", "동구", "북구", "서구"],
+    "대전광역시": ["대덕구", "동구", "서구", "유성구", "중구"],
+    "울산광역시": ["남구", "동구", "북구", "울주군", "중구"],
+    "세종특별자치시": ["세종시"],
+    "경기도": ["가평군", "고양시", "과천시", "광명시", "광주시", "구리시", "군포시", "김포시", "남양주시", "동두천시", "부천시", "성남시", "수원시", "시흥시", "안산시", "안성시", "안양시", "양주시", "양평군", "여주시", "연천군", "오산시", "용인시", "의왕시", "의정부시", "이천시", "파주시", "평택시", "포천시", "하남시", "화성시"],
+    "강원도": ["강릉시", "고성군", "동해시", "삼척시", "속초시", "양구군", "양양군", "영월군", "원주시", "인제군", "정선군", "철원군", "춘천시", "태백시", "평창군", "홍천군", "화천군", "횡성군"],
+    "충청북도": ["괴산군", "단양군", "보은군", "영동군", "옥천군", "음성군", "제천시", "진천군", "청주시", "충주시"],
+    "충청남도": ["계룡시", "공주시", "금산군", "논산시", "당진시", "보령시", "부여군", "서산시", "서천군", "아산시", "예산군", "천안시", "청양군", "태안군", "홍성군"],
+    "전라북도": ["고창군", "군산시", "김제시", "남원시", "무주군", "부안군", "순창군", "완주군", "익산시", "임실군", "장수군", "전주시", "정읍시", "진안군"],
+    "전라남도": ["강진군", "고흥군", "곡성군", "광양시", "구례군", "나주시", "담양군", "목포시", "무안군", "보성군", "순천시", "신안군", "여수시", "영광군", "영암군", "완도군", "장성군", "장흥군", "진도군", "함평군", "해남군", "화순군"],
+    "경상북도": ["경산시", "경주시", "고령군", "구미시", "군위군", "김천시", "문경시", "봉화군", "상주시", "성주군", "안동시", "영덕군", "영양군", "영주시", "영천시", "예천군", "울릉군", "울진군", "의성군", "청도군", "청송군", "칠곡군", "포항시"],
+    "경상남도": ["거제시", "거창군", "고성군", "김해시", "남해군", "밀양시", "사천시", "산청군", "양산시", "의령군", "진주시", "창녕군", "창원시", "통영시", "하동군", "함안군", "함양군", "합천군"],
+    "제주특별자치도": ["서귀포시", "제주시"],
+}
+
+# 시/도 약칭 및 별칭
+SIDO_ALIASES = {
+    "서울특별시": ["서울", "서울시"],
+    "부산광역시": ["부산", "부산시"],
+    "대구광역시": ["대구", "대구시"],
+    "인천광역시": ["인천", "인천시"],
+    "광주광역시": [],  # "광주"/"광주시"는 경기도 광주시와 겹치므로 아래에서 따로 처리
+    "대전광역시": ["대전", "대전시"],
+    "울산광역시": ["울산", "울산시"],
+    "세종특별자치시": ["세종", "세종시"],
+    "경기도": ["경기"],
+    "강원도": ["강원", "강원특별자치도"],
+    "충청북도": ["충북"],
+    "충청남도": ["충남"],
+    "전라북도": ["전북", "전북특별자치도"],
+    "전라남도": ["전남"],
+    "경상북도": ["경북"],
+    "경상남도": ["경남"],
+    "제주특별자치도": ["제주", "제주도"],
+}
+
+# "충청남북도"처럼 여러 시/도를 한 번에 가리키는 표기
+COMPOUND_ALIASES = {
+    "충청남북도": ["충청남도", "충청북도"],
+    "충청도": ["충청남도", "충청북도"],
+    "전라남북도": ["전라남도", "전라북도"],
+    "전라도": ["전라남도", "전라북도"],
+    "경상남북도": ["경상남도", "경상북도"],
+    "경상도": ["경상남도", "경상북도"],
+    "충남북": ["충청남도", "충청북도"],
+    "전남북": ["전라남도", "전라북도"],
+    "경남북": ["경상남도", "경상북도"],
+    # 권역
+    "수도권": ["서울특별시", "인천광역시", "경기도"],
+    "충청권": ["대전광역시", "세종특별자치시", "충청북도", "충청남도"],
+    "호남권": ["광주광역시", "전라북도", "전라남도"],
+    "영남권": ["부산광역시", "대구광역시", "울산광역시", "경상북도", "경상남도"],
+    "동남권": ["부산광역시", "울산광역시", "경상남도"],
+    "부울경": ["부산광역시", "울산광역시", "경상남도"],
+    "대경권": ["대구광역시", "경상북도"],
+    "강원권": ["강원도"],
+    "제주권": ["제주특별자치도"],
+}
+
+# 시 이름에서 '시'를 뗀 약칭 중 일반 명사와 겹쳐 오인식 위험이 큰 것 (화성=Mars, 이천=2000, 상주=거주 ...)
+UNSAFE_SHORT_NAMES = {"화성", "오산", "원주", "동해", "공주", "상주", "진주", "양산", "구리", "이천", "고양", "영주", "광주"}
+
+# 이 문구가 있으면 규칙으로 판단하지 않고 GPT로 넘긴다
+EXCLUSION_PATTERN = re.compile(r"제외|이외|외\s*지역|타\s*지역|불가|아닌|미만\s*거주|비\s*수도권")
+SPECIAL_SCOPE_PATTERN = re.compile(r"온라인|해외|국외|외국|북한|이탈주민")
+# 지역명이 없는데 거주 요건처럼 보이는 문구 (관내, 본 시 등) → 판단 보류
+LOCAL_HINT_PATTERN = re.compile(r"관내|본\s*[시군구도]|당해|해당\s*지역|소재지|출신|주민|거주")
+# 읍/면/동/리 단위까지 적힌 주소는 GPT가 전체 경로를 유지하도록 넘긴다
+# 트라이에 없는 지역 범위 표현 (모르는 권역, 지방, 농어촌 ...) → 전국으로 보지 않고 GPT로 넘긴다
+REGIONAL_SCOPE_PATTERN = re.compile(r"[가-힣]권(?![가-힣])|지역|지방|농어촌|도서\s*벽지|읍\s*[·,/]?\s*면")
+# "지역 무관", "지역 제한 없음"처럼 지역 제한이 없다는 뜻의 문구
+NO_REGION_LIMIT_PATTERN = re.compile(r"지역\s*(?:무관|상관\s*없|제한\s*(?:없|무))")
+SUB_DISTRICT_PATTERN = re.compile(r"^\s*[가-힣0-9]{1,10}(?:읍|면|동|리)(?![가-힣])")
+EMPTY_TEXTS = {"", "해당없음", "해당 없음", "없음", "제한없음", "제한 없음", "무관", "지역무관", "지역 무관", "전국", "-"}
+
+
+class RegionParseResult(NamedTuple):
+    regions: str | None  # None이면 규칙으로 확정하지 못함 → GPT 폴백 필요
+    reason: str          # 판단 근거/보류 사유 (커버리지 리포트용)
+
+
+class _Entry(NamedTuple):
+    candidates: tuple[str, ...]  # 가능한 전체 경로 ("경기도 수원시" 등)
+    default: str | None          # 문맥 없이 단독으로 쓰였을 때의 해석 (없으면 애매함)
+    is_sido: bool
+
+
+class RegionResolver:
+    def __init__(self, regions: dict[str, list[str]] = REGIONS):
+        self._trie: dict = {}
+        self._build(regions)
+
+    # ---------- 트라이 구성 ----------
+    def _add(self, alias: str, candidate: str, is_sido: bool):
+        node = self._trie
+        for ch in alias:
+            node = node.setdefault(ch, {})
+        prev = node.get(None)
+        if prev is None:
+            node[None] = _Entry((candidate,), candidate, is_sido)
+        elif candidate not in prev.candidates:
+            # 같은 이름이 여러 지역에 있으면 후보를 합치고 단독 해석은 없앤다 (시/도 문맥으로만 결정)
+            node[None] = _Entry(prev.candidates + (candidate,), None, prev.is_sido and is_sido)
+
+    def _build(self, regions):
+        sido_aliases = set()
+        for sido, aliases in SIDO_ALIASES.items():
+            for alias in [sido, *aliases]:
+                self._add(alias, sido, is_sido=True)
+                sido_aliases.add(alias)
+        for alias, sidos in COMPOUND_ALIASES.items():
+            self._add(alias, ",".join(sidos), is_sido=True)
+
+        for sido, districts in regions.items():
+            for name in districts:
+                path = sido if sido == "세종특별자치시" else f"{sido} {name}"
+                self._add(name, path, is_sido=False)
+                short = name[:-1]
+                if name.endswith("시") and len(short) >= 2 and short not in UNSAFE_SHORT_NAMES and short not in sido_aliases:
+                    self._add(short, path, is_sido=False)
+
+        # 광주: "광주시"는 광주광역시/경기도 광주시 모두 가능(문맥 필요),
+        # 단독 "광주"는 광주광역시로 보되 "경기 광주"처럼 경기도 문맥이 있으면 경기도 광주시
+        self._add("광주시", "광주광역시", is_sido=False)
+        self._add("광주", "광주광역시", is_sido=False)
+        self._add("광주", "경기도 광주시", is_sido=False)
+        node = self._trie
+        for ch in "광주":
+            node = node[ch]
+        node[None] = node[None]._replace(default="광주광역시")
+
+    # ---------- 매칭 ----------
+    def _scan(self, text: str):
+        """왼쪽부터 최장 일치로 겹치지 않는 (start, end, entry) 목록을 만든다."""
+        matches = []
+        i, n = 0, len(text)
+        while i < n:
+            node = self._trie
+            best = None
+            j = i
+            while j < n and text[j] in node:
+                node = node[text[j]]
+                j += 1
+                if None in node:
+                    best = (i, j, node[None])
+            if best:
+                matches.append(best)
+                i = best[1]
+            else:
+                i += 1
+        return matches
+
+    def resolve(self, text: str | None) -> RegionParseResult:
+        normalized = re.sub(r"\s+", " ", (text or "")).strip()
+        if normalized in EMPTY_TEXTS:
+            return RegionParseResult(NATIONWIDE, "empty")
+        if EXCLUSION_PATTERN.search(normalized):
+            return RegionParseResult(None, "exclusion")
+        if SPECIAL_SCOPE_PATTERN.search(normalized):
+            return RegionParseResult(None, "special_scope")
+
+        matches = []
+        for start, end, entry in self._scan(normalized):
+            following = normalized[end:end + 1]
+            # "서울대", "부산대학교"처럼 학교 이름의 일부이면 지역 조건이 아니다
+            if following == "대":
+                return RegionParseResult(None, "school_name")
+            # 앞뒤가 한글로 붙어 있는 약칭(2글자 이하)은 다른 단어의 일부일 수 있다 (예: "경기력")
+            if end - start <= 2 and following and "가" <= following <= "힣" and following not in "시도군구에의및와과내거지출소전":
+                continue
+            if not entry.is_sido and SUB_DISTRICT_PATTERN.match(normalized[end:]):
+                return RegionParseResult(None, "sub_district")
+            matches.append(entry)
+
+        if not matches:
+            if "전국" in normalized or NO_REGION_LIMIT_PATTERN.search(normalized):
+                return RegionParseResult(NATIONWIDE, "no_region")
+            if REGIONAL_SCOPE_PATTERN.search(normalized):
+                return RegionParseResult(None, "unknown_scope")
+            if not LOCAL_HINT_PATTERN.search(normalized):
+                return RegionParseResult(NATIONWIDE, "no_region")
+            return RegionParseResult(None, "unknown_local")
+        if "전국" in normalized:
+            return RegionParseResult(None, "mixed_nationwide")
+
+        # 시/도 문맥 (애매한 시/군/구 이름 해석에 사용)
+        mentioned_sidos = {
+            sido
+            for e in matches if e.is_sido and len(e.candidates) == 1
+            for sido in e.candidates[0].split(",")
+        }
+
+        resolved: list[str] = []
+        for entry in matches:
+            if len(entry.candidates) == 1:
+                picked = entry.candidates[0]
+            else:
+                in_context = [c for c in entry.candidates if c.split(" ")[0] in mentioned_sidos]
+                if len(in_context) == 1:
+                    picked = in_context[0]
+                elif entry.default:
+                    picked = entry.default
+                else:
+                    return RegionParseResult(None, "ambiguous")
+            for path in picked.split(","):
+                if path not in resolved:
+                    resolved.append(path)
+
+        # "경기도 수원시"처럼 하위 지역이 있으면 상위 시/도 단독 항목은 뺀다
+        specific_sidos = {p.split(" ")[0] for p in resolved if " " in p}
+        resolved = [p for p in resolved if " " in p or p not in specific_sidos]
+        return RegionParseResult(",".join(resolved), "matched")
+
+
+_resolver = None
+
+
+def get_resolver() -> RegionResolver:
+    global _resolver
+    if _resolver is None:
+        _resolver = RegionResolver()
+    return _resolver
+
+
+def resolve_regions_locally(text: str | None) -> str | None:
+    """규칙으로 확정되면 정형화된 지역 문자열을, 애매하면 None(GPT 폴백 필요)을 반환합니다."""
+    return get_resolver().resolve(text).regions
@@ -0,0 +1,145 @@
+# scholarships/scoring.py
+"""
+후보 장학금 점수 계산기 (NumPy).
+
+카탈로그 스냅샷(catalog.py)의 컬럼을 배열로 들고 있다가, 사용자 한 명에 대해 가중치가 붙은 특성들을 더해
+후보 전체의 점수를 한 번의 벡터 연산으로 계산합니다. 첫 일치에서 멈추던 Case/When 점수와 달리 특성이 누적됩니다.
+
+특성 (모두 0~1, 가중치는 settings.RECOMMENDATION_SCORE_WEIGHTS로 조정):
+- region_depth:   사용자 지역 경로 중 장학금이 대상으로 하는 가장 깊은 단계 (전국 0 → 시/도 0.5 → 시/군/구 1)
+- nationwide:     전국 대상 장학금
+- major_match:    학과 구분에 사용자 전공이 들어 있음
+- open_major:     전공 무관(해당없음/제한없음 ...)
+- gpa_margin:     최소 평점 대비 사용자 평점 여유 (만점 대비 0.25 이상이면 1)
+- income_margin:  최대 소득분위 대비 여유 (딱 맞으면 0.1, 분위당 0.1씩)
+- special_status: 사용자와 함께 해당하는 특정 자격 플래그 수
+- deadline:       마감이 가까울수록 (horizon일 이내, 마감 당일 1 → horizon일 뒤 0, 지난 공고 0)
+"""
+import datetime
+
+import numpy as np
+from django.conf import settings
+
+from .eligibility import USER_GPA_SCALE, user_eligibility
+from .qualifications import qualification_flags, user_qualification_flags
+
+DEFAULT_SCORE_WEIGHTS = {
+    "region_depth": 10.0,
+    "nationwide": 1.0,
+    "major_match": 5.0,
+    "open_major": 1.0,
+    "gpa_margin": 3.0,
+    "income_margin": 3.0,
+    "special_status": 8.0,
+    "deadline": 2.0,
+}
+DEADLINE_HORIZON_DAYS = 60
+
+
+def score_weights() -> dict:
+    return {**DEFAULT_SCORE_WEIGHTS, **getattr(settings, "RECOMMENDATION_SCORE_WEIGHTS", {})}
+
+
+class ScoringMatrix:
+    def __init__(self, entries, open_major_keywords=()):
+        n = len(entries)
+        self.size = n
+        self.ids = np.fromiter((e.id for e in entries), dtype=np.int64, count=n)
+
+        # 학과: 고유 값마다 한 번만 문자열 비교하고 inverse 인덱스로 펼친다
+        majors, self.major_inverse = np.unique([e.major_field_key for e in entries] or [""], return_inverse=True)
+        self.major_keys = majors.tolist()
+        self.major_open = np.array([m in open_major_keywords for m in self.major_keys], dtype=bool)
+
+        # 지역: Region.code → 그 코드를 대상으로 하는 장학금 위치 (역색인)
+        positions_by_code = {}
+        for i, e in enumerate(entries):
+            for code in e.region_codes:
+                positions_by_code.setdefault(code, []).append(i)
+        self.positions_by_code = {code: np.array(p, dtype=np.int64) for code, p in positions_by_code.items()}
+
+        # 성적: 사용자 평점(4.5 만점)과 비교할 수 있도록 만점 대비 비율로. 비교할 수 없으면 NaN
+        self.min_gpa_ratio = np.array(
+            [
+                e.min_gpa / (e.gpa_scale or USER_GPA_SCALE)
+                if e.min_gpa is not None and (e.gpa_scale or USER_GPA_SCALE) <= USER_GPA_SCALE else np.nan
+                for e in entries
+            ],
+            dtype=np.float64,
+        )
+        self.max_income_decile = np.array(
+            [e.max_income_decile if e.max_income_decile is not None else np.nan for e in entries], dtype=np.float64
+        )
+        self.deadline_ordinal = np.array(
+            [e.recruitment_end.toordinal() if e.recruitment_end else np.nan for e in entries], dtype=np.float64
+        )
+
+        self.flag_names = list(qualification_flags())
+        self.flags = np.array(
+            [[f in e.qualification_flags for f in self.flag_names] for e in entries], dtype=np.float64
+        ).reshape(n, len(self.flag_names))
+
+    def features(self, user_profile, user_codes, today: datetime.date | None = None) -> dict[str, np.ndarray]:
+        """카탈로그 전체에 대한 특성 배열 (모두 길이 size). user_codes는 사용자 지역의 조상 코드 (전국 → 시/도 → 시/군/구 순)."""
+        n = self.size
+        features = {}
+
+        depth = np.full(n, -1.0)
+        for d, code in enumerate(user_codes):  # 얕은 단계부터 덮어써서 가장 깊은 일치가 남는다
+            positions = self.positions_by_code.get(code)
+            if positions is not None:
+                depth[positions] = d
+        max_depth = max(len(user_codes) - 1, 1)
+        features["region_depth"] = np.clip(depth, 0, None) / max_depth
+        features["nationwide"] = (depth == 0).astype(np.float64)
+
+        user_major = (getattr(user_profile, "major_field", "") or "").strip().lower()
+        if user_major:
+            match = np.array([user_major in key for key in self.major_keys], dtype=np.float64)
+            features["major_match"] = match[self.major_inverse]
+        else:
+            features["major_match"] = np.zeros(n)
+        features["open_major"] = self.major_open[self.major_inverse].astype(np.float64)
+
+        user = user_eligibility(user_profile)
+        with np.errstate(invalid="ignore"):
+            if user.gpa is not None:
+                margin = user.gpa / USER_GPA_SCALE - self.min_gpa_ratio
+                features["gpa_margin"] = np.nan_to_num(np.clip(margin * 4, 0, 1))
+            else:
+                features["gpa_margin"] = np.zeros(n)
+            if user.income_decile is not None:
+                margin = (self.max_income_decile - user.income_decile + 1) / 10
+                features["income_margin"] = np.nan_to_num(np.clip(margin, 0, 1))
+            else:
+                features["income_margin"] = np.zeros(n)
+
+            days = self.deadline_ordinal - (today or datetime.date.today()).toordinal()
+            features["deadline"] = np.nan_to_num(
+                np.where((days >= 0) & (days <= DEADLINE_HORIZON_DAYS), 1 - days / DEADLINE_HORIZON_DAYS, 0)
+            )
+
+        user_flags = set(user_qualification_flags(user_profile))
+        flag_vector = np.array([f in user_flags for f in self.flag_names], dtype=np.float64)
+        features["special_status"] = self.flags @ flag_vector if user_flags else np.zeros(n)
+        return features
+
+    def score(self, user_profile, user_codes, weights: dict | None = None, today: datetime.date | None = None) -> np.ndarray:
+        weights = weights or score_weights()
+        total = np.zeros(self.size)
+        for name, values in self.features(user_profile, user_codes, today).items():
+            weight = weights.get(name, 0.0)
+            if weight:
+                total += weight * values
+        return total
+
+    def rank(self, user_profile, user_codes, positions=None, weights: dict | None = None, today: datetime.date | None = None) -> np.ndarray:
+        """
+        점수 내림차순으로 정렬한 카탈로그 위치 배열. positions를 주면 그 후보들만 정렬한다.
+        동점은 입력 순서(스냅샷은 id 순)를 유지한다.
+        """
+        scores = self.score(user_profile, user_codes, weights, today)
+        if positions is None:
+            return np.argsort(-scores, kind="stable")
+        positions = np.asarray(positions, dtype=np.int64)
+        return positions[np.argsort(-scores[positions], kind="stable")]
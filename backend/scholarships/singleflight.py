@@ -0,0 +1,183 @@
+# scholarships/singleflight.py
+"""
+GPT를 호출하는 추천 엔드포인트의 과부하 방지.
+
+1) single-flight: 같은 추천 계산(같은 사용자·프로필·카탈로그 버전 = 추천 캐시 키)이 동시에 여러 번 들어오면
+   (더블 클릭, 프론트 재시도) Redis 락(cache.add)을 잡은 요청 하나만 계산하고, 나머지는 그 결과가
+   추천 캐시에 들어올 때까지 기다렸다가 그대로 씁니다.
+2) 동시 처리 게이트: 워커 프로세스당 GPT 대기 요청 수를 제한합니다. 자리가 없으면 줄 세우지 않고
+   503 + Retry-After로 바로 돌려보내, GPT 지연이 길어져도 다른 API를 처리할 스레드가 남도록 합니다.
+   자리는 실제로 계산하는 요청(락을 잡은 요청)만 잡습니다. 합류한 요청은 자리 없이 결과를 기다리므로
+   중복 요청이 게이트를 채우거나 503을 받지 않습니다.
+
+대기/합류/거절 횟수는 캐시 카운터(counters.CacheCounters)로 누적되며 get_metrics()로 조회합니다.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from .counters import CacheCounters
+
+CACHE_PREFIX = "singleflight"
+# 락 TTL: 계산하던 워커가 죽어도 이 시간이 지나면 다른 요청이 계산을 넘겨받는다
+LOCK_TIMEOUT = getattr(settings, "RECOMMENDATION_SINGLEFLIGHT_LOCK_SECONDS", 60)
+# 다른 요청의 계산 결과를 기다리는 최대 시간 (넘으면 직접 계산)
+WAIT_TIMEOUT = getattr(settings, "RECOMMENDATION_SINGLEFLIGHT_WAIT_SECONDS", 30)
+POLL_INTERVAL = 0.2
+GATE_SIZE = getattr(settings, "LLM_VIEW_MAX_CONCURRENCY", 4)
+GATE_WAIT = getattr(settings, "LLM_VIEW_GATE_WAIT_SECONDS", 0.5)
+RETRY_AFTER = getattr(settings, "LLM_VIEW_RETRY_AFTER_SECONDS", 5)
+METRICS = ("leader", "waited", "coalesced", "wait_timeout", "rejected")
+
+
+_counters = CacheCounters(CACHE_PREFIX, METRICS)
+_bump = _counters.bump
+get_metrics = _counters.get
+reset_metrics = _counters.reset
+
+
+class Overloaded(Exception):
+    """계산을 맡았지만 게이트 자리가 없어 계산하지 않은 경우 (호출 측이 503으로 돌려준다)."""
+
+
+class Flight:
+    """
+    key 하나에 대한 계산 한 번. lead()로 락을 잡은 요청만 계산하고, 못 잡은 요청은 wait()으로 결과를 기다린다.
+    락은 cache.add(SETNX)로 잡고 TTL(LOCK_TIMEOUT)을 두어, 계산하던 워커가 죽어도 다음 요청이 넘겨받을 수 있다.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.lock_key = f"{CACHE_PREFIX}:lock:{key}"
+        self.token = uuid.uuid4().hex
+        self.leading = False
+
+    def lead(self) -> bool:
+        try:
+            self.leading = cache.add(self.lock_key, self.token, timeout=LOCK_TIMEOUT)
+        except Exception:
+            self.leading = True  # 캐시 장애 시에는 합류 없이 각자 계산
+        if self.leading:
+            _bump("leader")
+        return self.leading
+
+    def done(self):
+        if not self.leading:
+            return
+        self.leading = False
+        try:
+            if cache.get(self.lock_key) == self.token:  # TTL이 지나 다른 요청이 잡은 락은 지우지 않는다
+                cache.delete(self.lock_key)
+        except Exception:
+            pass
+
+    def _lock_held(self) -> bool:
+        try:
+            return cache.get(self.lock_key) is not None
+        except Exception:
+            return False
+
+    def wait(self, read_result):
+        """
+        read_result()가 값을 돌려줄 때까지 기다려 그 값을 반환한다. 락이 풀렸는데 결과가 없거나
+        (계산 실패, 저장하지 않는 결과) WAIT_TIMEOUT이 지나면 None → 호출 측이 직접 계산한다.
+        """
+        _bump("waited")
+        print(f"DEBUG: 같은 추천 계산이 진행 중이라 결과를 기다립니다 ({self.key})")
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            released = not self._lock_held()
+            result = read_result()
+            if result is not None:
+                _bump("coalesced")
+                return result
+            if released:
+                return None
+        _bump("wait_timeout")
+        return None
+
+
+def single_flight(key: str, compute, read_result, gate=None):
+    """
+    key에 대한 계산을 동시에 하나만 실행한다. 락을 잡으면 compute() 값을, 못 잡으면 먼저 시작한 계산의 결과
+    (read_result()가 읽는 값)를 반환한다. 결과를 read_result가 읽을 곳에 저장하는 것은 compute의 몫이다.
+    gate(ConcurrencyGate)를 주면 계산하는 요청만 자리를 잡고, 자리가 없으면 Overloaded.
+    """
+    flight = Flight(key)
+    if not flight.lead():
+        result = flight.wait(read_result)
+        if result is not None:
+            return result
+        flight.lead()  # 넘겨받는다 (못 잡아도 직접 계산은 한다)
+    try:
+        if gate is not None and not gate.try_acquire():
+            raise Overloaded()
+        try:
+            return compute()
+        finally:
+            if gate is not None:
+                gate.release()
+    finally:
+        flight.done()
+
+
+class ConcurrencyGate:
+    """워커 프로세스당 동시 처리 수 제한. 자리가 없으면 wait초까지만 기다린다."""
+
+    def __init__(self, size: int, wait: float = 0.0):
+        self.size = max(1, size)
+        self.wait = wait
+        self._semaphore = threading.BoundedSemaphore(self.size)
+
+    def try_acquire(self) -> bool:
+        acquired = self._semaphore.acquire(timeout=self.wait) if self.wait > 0 else self._semaphore.acquire(blocking=False)
+        if not acquired:
+            _bump("rejected")
+        return acquired
+
+    def release(self):
+        self._semaphore.release()
+
+
+llm_view_gate = ConcurrencyGate(GATE_SIZE, GATE_WAIT)
+
+
+OVERLOADED_MESSAGE = "추천 요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도해 주세요."
+
+
+def overloaded_response() -> Response:
+    response = Response(
+        {"error": OVERLOADED_MESSAGE},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response["Retry-After"] = str(RETRY_AFTER)
+    return response
+
+
+class GatedStreamingHttpResponse(StreamingHttpResponse):
+    """
+    게이트 자리(와 single-flight 락)를 응답이 끝날 때까지 잡고 있는 스트리밍 응답. WSGI 서버가 응답을 닫을 때(close)
+    반납하므로 클라이언트가 스트림 도중 끊거나 제너레이터가 시작되기 전에 닫혀도 자리와 락이 새지 않는다.
+    """
+
+    def __init__(self, *args, gate: ConcurrencyGate, flight: Flight | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._gate = gate
+        self._flight = flight
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            gate, self._gate = self._gate, None
+            if gate is not None:
+                gate.release()
+            if self._flight is not None:
+                self._flight.done()
@@ -0,0 +1,193 @@
+# scholarships/synthetic.py
+"""
+추천 벤치마크(benchmark_recommendations)용 합성 카탈로그/사용자 생성기와 정답 자격 라벨.
+
+- 사용자 프로필 값은 프론트엔드 선택지(frontend/src/data의 majorFields.js, universities.js, regions.js = regions.REGIONS와
+  Userinfor.jsx의 학년/소득분위/대학 유형)에서 뽑아 실제 입력과 같은 형태가 되게 합니다.
+- 장학금은 먼저 정답 조건(SyntheticCriteria: 지역 범위, 대학 유형, 학기, 전공, 최소 평점, 최대 소득분위, 특정 자격)을 정하고
+  그 조건을 odcloud 원문과 비슷한 문장으로 써서 만듭니다. 정형화 컬럼은 수집 파이프라인과 같은 규칙 파서
+  (apply_thresholds, apply_qualification_flags)로 채우고, 지역은 region 문자열과 Region 연결로 넣습니다.
+- is_eligible()은 정답 조건으로 사용자의 자격을 판정합니다 (추천 정확도 측정의 기준).
+
+같은 seed면 항상 같은 데이터가 나옵니다.
+"""
+import datetime
+import random
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .eligibility import academic_year_mask, apply_thresholds, user_eligibility
+from .models import Scholarship
+from .qualifications import apply_qualification_flags, user_qualification_flags
+from .region_cache import apply_residency_text_hash
+from .region_tree import path_full_name
+from .regions import NATIONWIDE, REGIONS
+
+# frontend/src/pages/Userinfor.jsx의 선택지
+ACADEMIC_YEARS = ["대학신입생", "대학1학기", "대학2학기", "대학3학기", "대학4학기", "대학5학기", "대학6학기", "대학7학기", "대학8학기이상"]
+SEMESTERS = ["신입생", "1학기", "2학기", "3학기", "4학기", "5학기", "6학기", "7학기", "8학기 이상"]
+UNIVERSITY_TYPES = ["4년제(5~6년제포함)", "전문대(2~3년제)", "해외대학"]
+# odcloud 원문은 '~' 대신 '-'를 쓴다 (CatalogEntry가 정규화)
+SOURCE_UNIVERSITY_TYPES = {t: t.replace("~", "-") for t in UNIVERSITY_TYPES}
+OPEN_MAJOR_VALUES = ["해당없음", "제한없음", "전공무관"]
+
+QUALIFICATION_TEXTS = {
+    "targets_multicultural": "다문화 가정 자녀",
+    "targets_single_parent": "한부모 가정 학생",
+    "targets_multiple_children": "다자녀 가정(3자녀 이상) 학생",
+    "targets_national_merit": "국가유공자 및 보훈대상자 자녀",
+}
+FOUNDATION_SUFFIXES = ["장학재단", "미래재단", "인재육성재단", "교육재단", "복지재단"]
+PRODUCT_TYPES = ["성적우수", "소득구분", "지역연고", "특기자", "기타"]
+
+
+def load_frontend_list(path) -> list[str]:
+    """`const xs = ["a", "b", ...]` 형태의 프론트엔드 데이터 파일에서 문자열 항목만 읽는다 (줄 끝 주석은 무시)."""
+    text = Path(path).read_text(encoding="utf-8")
+    body = text[text.index("[") + 1:text.rindex("]")]
+    return re.findall(r'^\s*"([^"]+)"', body, flags=re.MULTILINE)
+
+
+def frontend_data_dir() -> Path:
+    return Path(settings.BASE_DIR).parent / "frontend" / "src" / "data"
+
+
+class SyntheticCriteria(NamedTuple):
+    region_path: tuple            # () = 전국, (시/도,), (시/도, 시/군/구)
+    university_types: tuple       # UNIVERSITY_TYPES의 부분집합 (비어 있지 않음)
+    year_mask: int                # 0 = 학년 제한 없음
+    major: str | None             # None = 전공 무관
+    min_gpa: float | None         # 4.5 만점
+    max_income_decile: int | None
+    qualification: str | None     # 특정 자격 플래그 이름
+
+
+def _criteria(rng: random.Random, majors: list[str]) -> SyntheticCriteria:
+    sido = rng.choice(list(REGIONS))
+    scope = rng.random()
+    if scope < 0.35:
+        region_path = ()
+    elif scope < 0.7:
+        region_path = (sido,)
+    else:
+        region_path = (sido, rng.choice(REGIONS[sido]))
+
+    university_types = tuple(UNIVERSITY_TYPES) if rng.random() < 0.5 else tuple(
+        t for t in UNIVERSITY_TYPES if rng.random() < 0.6
+    ) or (UNIVERSITY_TYPES[0],)
+
+    years = [] if rng.random() < 0.5 else sorted(rng.sample(range(len(ACADEMIC_YEARS)), rng.randint(1, 5)))
+    year_mask = academic_year_mask(",".join(ACADEMIC_YEARS[i] for i in years)) if years else 0
+
+    return SyntheticCriteria(
+        region_path,
+        university_types,
+        year_mask,
+        None if rng.random() < 0.6 else rng.choice(majors),
+        None if rng.random() < 0.4 else rng.choice([2.5, 2.8, 3.0, 3.3, 3.5, 3.8, 4.0]),
+        None if rng.random() < 0.5 else rng.randint(2, 10),
+        None if rng.random() < 0.85 else rng.choice(list(QUALIFICATION_TEXTS)),
+    )
+
+
+def synthetic_scholarship(index: int, criteria: SyntheticCriteria, rng: random.Random, today: datetime.date) -> Scholarship:
+    """정답 조건을 원문 필드로 쓴 저장되지 않은 Scholarship (정형화 컬럼까지 채움)."""
+    region_name = path_full_name(criteria.region_path)
+    foundation = f"{criteria.region_path[-1] if criteria.region_path else '한국'}{rng.choice(FOUNDATION_SUFFIXES)}"
+    years = [y for i, y in enumerate(ACADEMIC_YEARS) if criteria.year_mask & (1 << i)]
+    scholarship = Scholarship(
+        product_id=f"SYN{index:05d}",
+        name=f"{foundation} {index}기 장학생",
+        product_type="지역연고" if criteria.region_path else rng.choice(PRODUCT_TYPES),
+        recruitment_start=today - datetime.timedelta(days=rng.randint(0, 30)),
+        recruitment_end=today + datetime.timedelta(days=rng.randint(0, 60)),
+        university_type=",".join(SOURCE_UNIVERSITY_TYPES[t] for t in criteria.university_types),
+        academic_year_type=",".join(years) if years else "해당없음",
+        major_field=criteria.major or rng.choice(OPEN_MAJOR_VALUES),
+        residency_requirement_details=f"{region_name} 거주자" if criteria.region_path else NATIONWIDE,
+        grade_criteria_details=f"직전학기 평점 {criteria.min_gpa:.1f} 이상" if criteria.min_gpa else "해당없음",
+        income_criteria_details=f"소득 {criteria.max_income_decile}분위 이내" if criteria.max_income_decile else "해당없음",
+        specific_qualification_details=QUALIFICATION_TEXTS[criteria.qualification] if criteria.qualification else "해당없음",
+        eligibility_restrictions="휴학생 제외",
+        region=region_name,
+        is_region_processed=True,
+        managing_organization_type="장학재단",
+        foundation_name=foundation,
+        selection_method_details="서류 심사 후 면접",
+        number_of_recipients_details=f"{rng.randint(1, 50)}명",
+        required_documents_details="재학증명서, 성적증명서",
+        support_details=f"학기당 {rng.choice([100, 150, 200, 300, 500])}만원",
+    )
+    apply_thresholds(scholarship)
+    apply_qualification_flags(scholarship)
+    apply_residency_text_hash(scholarship)
+    return scholarship
+
+
+def synthetic_catalog(count: int, seed: int = 0, majors: list[str] | None = None, today: datetime.date | None = None):
+    """[(Scholarship, SyntheticCriteria)] count개."""
+    rng = random.Random(seed)
+    majors = majors or load_frontend_list(frontend_data_dir() / "majorFields.js")
+    today = today or datetime.date.today()
+    catalog = []
+    for index in range(count):
+        criteria = _criteria(rng, majors)
+        catalog.append((synthetic_scholarship(index, criteria, rng, today), criteria))
+    return catalog
+
+
+def synthetic_profile_values(count: int, seed: int = 0, majors: list[str] | None = None, universities: list[str] | None = None) -> list[dict]:
+    """UserScholarship 필드 값 dict count개 (user 제외)."""
+    rng = random.Random(seed + 1)
+    data_dir = frontend_data_dir()
+    majors = majors or load_frontend_list(data_dir / "majorFields.js")
+    universities = universities or load_frontend_list(data_dir / "universities.js")
+    profiles = []
+    for index in range(count):
+        sido = rng.choice(list(REGIONS))
+        year = rng.randrange(len(ACADEMIC_YEARS))
+        gpa = round(rng.uniform(2.0, 4.5), 2)
+        profiles.append({
+            "name": f"테스트{index}",
+            "gender": rng.choice(["남성", "여성", "선택안함"]),
+            "region": sido,
+            "district": rng.choice(REGIONS[sido]),
+            "income_level": f"{rng.randint(1, 10)}분위",
+            "university_type": rng.choices(UNIVERSITY_TYPES, weights=[7, 3, 0.3])[0],
+            "university_name": rng.choice(universities),
+            "major_field": rng.choice(majors),
+            "academic_year_type": ACADEMIC_YEARS[year],
+            "semester": SEMESTERS[year],
+            "gpa_last_semester": gpa,
+            "gpa_overall": round(min(4.5, max(2.0, gpa + rng.uniform(-0.3, 0.3))), 2),
+            "is_multi_cultural_family": rng.random() < 0.05,
+            "is_single_parent_family": rng.random() < 0.08,
+            "is_multiple_children_family": rng.random() < 0.1,
+            "is_national_merit": rng.random() < 0.03,
+            "additional_info": "",
+        })
+    return profiles
+
+
+def is_eligible(criteria: SyntheticCriteria, user_profile) -> bool:
+    """정답 조건으로 본 자격 여부 (모든 조건을 만족해야 True)."""
+    user_path = (user_profile.region, user_profile.district)
+    if user_path[:len(criteria.region_path)] != criteria.region_path:
+        return False
+    if user_profile.university_type not in criteria.university_types:
+        return False
+    user = user_eligibility(user_profile)
+    if criteria.year_mask and not criteria.year_mask & user.year_bit:
+        return False
+    if criteria.major is not None and criteria.major != user_profile.major_field:
+        return False
+    if criteria.min_gpa is not None and (user.gpa is None or user.gpa + 1e-6 < criteria.min_gpa):
+        return False
+    if criteria.max_income_decile is not None and (user.income_decile is None or user.income_decile > criteria.max_income_decile):
+        return False
+    if criteria.qualification is not None and criteria.qualification not in user_qualification_flags(user_profile):
+        return False
+    return True
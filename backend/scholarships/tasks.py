@@ -0,0 +1,69 @@
+# scholarships/tasks.py
+"""
+Celery 백그라운드 작업.
+
+실행: celery -A ScholarMate_backend worker -l info
+"""
+from celery import shared_task
+from django.core.management import call_command
+from django.db import transaction
+
+from .models import Scholarship
+from .region_cache import resolve_residency_region
+from .region_extraction import OpenAIRegionExtractor
+from .region_tree import link_scholarship_regions
+from .recommendation_cache import flush_catalog_changes as flush_pending_catalog_changes, note_catalog_change
+
+
+class RegionExtractionError(Exception):
+    """GPT가 지역을 돌려주지 못한 경우 (타임아웃, API 오류 등) → 재시도 대상."""
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(RegionExtractionError,),
+    retry_backoff=10,       # 10s, 20s, 40s ... (지터 포함)
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=5,
+    acks_late=True,
+    ignore_result=True,
+)
+def process_scholarship_region(self, scholarship_id: int):
+    """장학금 한 건의 지역 조건 원문을 정형화해 region / regions / is_region_processed를 채운다."""
+    text = (
+        Scholarship.objects.filter(id=scholarship_id, is_region_processed=False)
+        .values_list("residency_requirement_details", flat=True)
+        .first()
+    )
+    if text is None:
+        return "skipped"  # 삭제되었거나 이미 처리됨 (process_scholarship_regions 등)
+
+    region = resolve_residency_region(text, OpenAIRegionExtractor(timeout=15).extract).region
+    if not region:
+        raise RegionExtractionError(f"장학금 {scholarship_id} 지역 해석 실패")
+
+    with transaction.atomic():
+        updated = Scholarship.objects.filter(id=scholarship_id, is_region_processed=False).update(
+            region=region, is_region_processed=True
+        )
+        if updated:
+            link_scholarship_regions({scholarship_id: region})
+    if updated:
+        # 단건마다 버전을 올리면 모든 추천 캐시와 야간 사전 계산이 버려지므로 모아 두었다가 flush_catalog_changes가 올린다
+        note_catalog_change()
+    return region
+
+
+@shared_task(ignore_result=True)
+def flush_catalog_changes():
+    """요청 경로에서 쌓인 카탈로그 변경을 한 번의 버전 증가로 반영한다 (CELERY_BEAT_SCHEDULE)."""
+    version = flush_pending_catalog_changes()
+    if version is not None:
+        print(f"DEBUG: 카탈로그 버전 → {version} (대기 중이던 단건 변경 반영)")
+
+
+@shared_task(ignore_result=True)
+def precompute_recommendations():
+    """야간 추천 사전 계산 (CELERY_BEAT_SCHEDULE). Celery 워커 프로세스는 자식 프로세스를 만들 수 없어 스레드 풀을 쓴다."""
+    call_command("precompute_recommendations", executor="thread")
@@ -1,3 +1,489 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+import openai
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import catalog, ranking_cache, region_cache, singleflight
+from .eligibility import (
+    CONFIDENCE_HIGH,
+    CONFIDENCE_LOW,
+    UserEligibility,
+    academic_year_mask,
+    fails_thresholds,
+    parse_grade_criteria,
+    parse_income_criteria,
+)
+from .catalog import get_catalog_snapshot
+from .recommendation import MODE_FAST, recommend_with_reasons
+from .llm import CircuitBreaker, FakeBackend, LLMClient, LLMError, LLMUnavailable, set_llm_client
+from .bulk import BulkUpserter
+from .management.commands.sync_scholarships import SCHOLARSHIP_COPY_FIELDS, Command as SyncCommand
+from .models import RawScholarship, RegionResolution, Scholarship
+from .qualifications import extract_qualification_flags
+from .singleflight import ConcurrencyGate, Flight, GatedStreamingHttpResponse, Overloaded, overloaded_response, single_flight
+from .recommendation_cache import bump_catalog_version, cohort_features, cohort_key, recommendation_cache_key, flush_catalog_changes, get_catalog_version, note_catalog_change
+from .region_cache import apply_residency_text_hash, normalize_residency_text, residency_text_hash, store_residency_region
+from .regions import NATIONWIDE, RegionResolver
+from .region_tree import link_scholarship_regions, sync_region_table
+from userinfor.models import UserScholarship
+
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "scholarships-tests"}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RecommendationStreamTests(TestCase):
+    url = "/api/recommendation/stream/"
+
+    def setUp(self):
+        # 카탈로그 버전 캐시/스냅샷이 이전 테스트(롤백된 DB)의 값을 들고 있지 않도록
+        cache.clear()
+        catalog._snapshot = None
+        self.previous_client = set_llm_client(LLMClient(backend=FakeBackend()))
+        region_ids = sync_region_table()
+        scholarships = [
+            Scholarship.objects.create(
+                product_id=f"T{i}", name=f"테스트 장학금 {i}", product_type="성적우수",
+                recruitment_end=datetime.date.today() + datetime.timedelta(days=10 + i),
+                university_type="4년제(5-6년제포함)", academic_year_type="해당없음", major_field="해당없음",
+                grade_criteria_details="해당없음", income_criteria_details="해당없음",
+                region="전국", is_region_processed=True,
+            )
+            for i in range(6)
+        ]
+        link_scholarship_regions({s.id: s.region for s in scholarships}, region_ids)
+        bump_catalog_version()
+
+        self.user = get_user_model().objects.create(username="stream")
+        UserScholarship.objects.create(
+            user=self.user, region="서울특별시", district="강남구", university_type="4년제(5~6년제포함)",
+            major_field="공학계열", academic_year_type="대학3학기", income_level="5분위", gpa_last_semester=3.5,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        set_llm_client(self.previous_client)
+
+    def _stream(self, query=""):
+        response = self.client.get(self.url + query, HTTP_ACCEPT="text/event-stream")
+        body = b"".join(response.streaming_content).decode() if response.streaming else response.content.decode()
+        response.close()
+        return response, body
+
+    def test_event_stream_accept_header(self):
+        for query in ("?mode=fast", "?mode=gpt"):
+            response, body = self._stream(query)
+            self.assertEqual(response.status_code, 200, query)
+            self.assertTrue(response["Content-Type"].startswith("text/event-stream"), query)
+            self.assertIn("event: done", body, query)
+
+    def test_fast_mode_reads_only_the_top_results(self):
+        profile = UserScholarship.objects.get(user=self.user)
+        get_catalog_snapshot()
+        # 후보 필터링/점수 정렬은 스냅샷에서, DB는 최종 상위 5개를 읽는 한 번뿐
+        with self.assertNumQueries(1):
+            result = recommend_with_reasons(profile, MODE_FAST)
+        self.assertEqual(len(result["scholarships"]), 5)
+
+    def test_event_stream_error_is_sse(self):
+        response, body = self._stream("?mode=unknown")
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(body.startswith("event: error"))
+
+    @mock.patch.object(singleflight, "POLL_INTERVAL", 0.01)
+    @mock.patch.object(singleflight, "WAIT_TIMEOUT", 0.05)
+    def test_takeover_does_not_compute_without_the_lock(self):
+        # 다른 요청이 락을 계속 잡고 결과를 남기지 않으면, 넘겨받지 못한 스트림은 계산하지 않고 에러로 끝난다
+        profile = UserScholarship.objects.get(user=self.user)
+        other = Flight(recommendation_cache_key(profile))
+        self.assertTrue(other.lead())
+        try:
+            response, body = self._stream("?mode=gpt")
+        finally:
+            other.done()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("event: error", body)
+        self.assertNotIn("event: candidates", body)
+
+
+class QualificationFlagTests(TestCase):
+    def test_hardship_is_not_single_parent(self):
+        flags = extract_qualification_flags(Scholarship(income_criteria_details="가정형편이 어려운 자", specific_qualification_details=""))
+        self.assertFalse(flags["targets_single_parent"])
+        flags = extract_qualification_flags(Scholarship(specific_qualification_details="한부모 가정 자녀"))
+        self.assertTrue(flags["targets_single_parent"])
+        flags = extract_qualification_flags(Scholarship(specific_qualification_details="한부모 가정 제외"))
+        self.assertFalse(flags["targets_single_parent"])
+
+
+class EligibilityParserTests(SimpleTestCase):
+    def test_parse_grade_criteria(self):
+        cases = {
+            "해당없음": (None, None, True),
+            "직전학기 평점 3.0 이상": (3.0, None, True),
+            "4.3 만점 기준 3.5 이상": (3.5, 4.3, True),
+            "B+ 학점 이상": (3.5, 4.5, True),
+            "80점 이상": (80.0, 100.0, True),
+            "직전학기 3.0 이상, 전체 평점 3.2 이상": (3.0, None, True),
+            "평점 3.0 이상 또는 석차 상위 30%": (None, None, False),
+        }
+        for text, expected in cases.items():
+            self.assertEqual(parse_grade_criteria(text), expected, text)
+
+    def test_parse_income_criteria(self):
+        cases = {
+            "해당없음": (None, True),
+            "소득 8분위 이내": (8, True),
+            "학자금 지원구간 1~6구간": (6, True),
+            "신입생 10분위 이내, 재학생 8분위 이내": (10, True),
+            "성적우수자": (None, True),
+            "기초생활수급자 및 차상위계층": (None, False),
+            "중위소득 150% 이하": (None, False),
+        }
+        for text, expected in cases.items():
+            self.assertEqual(parse_income_criteria(text), expected, text)
+
+    def test_academic_year_mask(self):
+        cases = {
+            "해당없음": 0,
+            "대학신입생, 대학2학기": 0b101,
+            "대학3학기": 1 << 3,
+            "대학8학기이상": 1 << 8,
+            "3학년 이상": 0b111100000,
+        }
+        for text, expected in cases.items():
+            self.assertEqual(academic_year_mask(text), expected, text)
+
+    def test_fails_thresholds(self):
+        entry = Scholarship(
+            min_gpa=3.5, gpa_scale=4.5, max_income_decile=8, academic_year_mask=0b11110, eligibility_confidence=CONFIDENCE_HIGH
+        )
+        self.assertFalse(fails_thresholds(entry, UserEligibility(3.6, 8, 1 << 3)))
+        self.assertTrue(fails_thresholds(entry, UserEligibility(3.0, 8, 1 << 3)))
+        self.assertTrue(fails_thresholds(entry, UserEligibility(3.6, 9, 1 << 3)))
+        self.assertTrue(fails_thresholds(entry, UserEligibility(3.6, 8, 1 << 6)))
+        # 사용자 값을 모르면 제외하지 않는다
+        self.assertFalse(fails_thresholds(entry, UserEligibility(None, None, 0)))
+        # 4.3 만점 기준은 사용자 평점(4.5 만점)을 환산해 비교한다
+        entry = Scholarship(min_gpa=3.5, gpa_scale=4.3, eligibility_confidence=CONFIDENCE_LOW)
+        self.assertFalse(fails_thresholds(entry, UserEligibility(3.7, None, 0)))
+        self.assertTrue(fails_thresholds(entry, UserEligibility(3.5, None, 0)))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RegionResolutionAdminTests(TestCase):
+    def setUp(self):
+        cache.clear()  # 카탈로그 버전 캐시가 이전 테스트(롤백된 DB)의 값을 들고 있지 않도록
+        sync_region_table()
+        text = "서울특별시 거주자"
+        normalized = normalize_residency_text(text)
+        store_residency_region(normalized, "서울특별시", RegionResolution.SOURCE_RULE)
+        self.resolution = RegionResolution.objects.get(text_hash=residency_text_hash(normalized))
+        self.scholarship = Scholarship(
+            product_id="R1", name="지역 장학금", residency_requirement_details=text, region="서울특별시", is_region_processed=True,
+        )
+        apply_residency_text_hash(self.scholarship)
+        self.scholarship.save()
+        # 같은 해시를 쓰지 않는 장학금은 다시 연결하지 않는다
+        other = Scholarship(product_id="R2", name="다른 장학금", residency_requirement_details="부산 거주자", region="부산광역시", is_region_processed=True)
+        apply_residency_text_hash(other)
+        other.save()
+        link_scholarship_regions({self.scholarship.id: self.scholarship.region})
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "pw"))
+
+    def test_override_relinks_scholarships(self):
+        version = get_catalog_version()
+        url = reverse("admin:scholarships_regionresolution_change", args=[self.resolution.pk])
+        response = self.client.post(url, {"region": "서울특별시 강남구", "source": "rule", "is_override": ""})
+        self.assertEqual(response.status_code, 302)
+        self.scholarship.refresh_from_db()
+        self.assertEqual(self.scholarship.region, "서울특별시 강남구")
+        self.assertEqual(list(self.scholarship.regions.values_list("full_name", flat=True)), ["서울특별시 강남구"])
+        self.assertEqual(Scholarship.objects.get(product_id="R2").region, "부산광역시")
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_purge_resets_scholarships_and_skips_overrides(self):
+        pinned = RegionResolution.objects.create(
+            text_hash="0" * 64, normalized_text="관리자 지정", region="부산광역시", source="manual", is_override=True
+        )
+        version = get_catalog_version()
+        response = self.client.post(
+            reverse("admin:scholarships_regionresolution_changelist"),
+            {"action": "purge_entries", "_selected_action": [self.resolution.pk, pinned.pk]},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(RegionResolution.objects.filter(pk=self.resolution.pk).exists())
+        self.assertTrue(RegionResolution.objects.filter(pk=pinned.pk).exists())
+        self.scholarship.refresh_from_db()
+        self.assertFalse(self.scholarship.is_region_processed)
+        self.assertGreater(get_catalog_version(), version)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CacheCounterTests(SimpleTestCase):
+    def test_module_metrics(self):
+        for module in (region_cache, ranking_cache, singleflight):
+            module.reset_metrics()
+            module._bump(module.METRICS[0])
+            module._bump(module.METRICS[0])
+            metrics = module.get_metrics()
+            self.assertEqual(metrics[module.METRICS[0]], 2, module.__name__)
+            self.assertTrue(all(metrics[m] == 0 for m in module.METRICS[1:]), module.__name__)
+            module.reset_metrics()
+            self.assertEqual(module.get_metrics()[module.METRICS[0]], 0, module.__name__)
+        ranking_cache._bump("miss")
+        self.assertEqual(ranking_cache.get_metrics()["hit_rate"], 0.0)
+        ranking_cache._bump("local_hit")
+        self.assertEqual(ranking_cache.get_metrics()["hit_rate"], 0.5)
+        ranking_cache.reset_metrics()
+
+
+@override_settings(CACHES=TEST_CACHES)
+@mock.patch.object(singleflight, "POLL_INTERVAL", 0.01)
+@mock.patch.object(singleflight, "WAIT_TIMEOUT", 0.1)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_lead_wait_done(self):
+        leader, follower = Flight("k"), Flight("k")
+        self.assertTrue(leader.lead())
+        self.assertFalse(follower.lead())
+        self.assertEqual(follower.wait(lambda: "result"), "result")
+        # 결과 없이 락이 풀리면 기다리지 않고 None → 넘겨받는다
+        leader.done()
+        self.assertIsNone(follower.wait(lambda: None))
+        self.assertTrue(follower.lead())
+        follower.done()
+        self.assertIsNone(cache.get(follower.lock_key))
+
+    def test_done_keeps_a_lock_taken_over_by_another_request(self):
+        leader = Flight("k")
+        self.assertTrue(leader.lead())
+        cache.set(leader.lock_key, "other-token")  # TTL이 지나 다른 요청이 잡은 락
+        leader.done()
+        self.assertEqual(cache.get(leader.lock_key), "other-token")
+
+    def test_wait_times_out_while_lock_is_held(self):
+        leader, follower = Flight("k"), Flight("k")
+        leader.lead()
+        self.assertIsNone(follower.wait(lambda: None))
+        self.assertEqual(singleflight.get_metrics()["wait_timeout"], 1)
+        leader.done()
+
+    def test_single_flight_releases_gate_and_lock(self):
+        gate = ConcurrencyGate(1)
+        self.assertEqual(single_flight("k", lambda: 42, lambda: None, gate=gate), 42)
+        self.assertIsNone(cache.get(Flight("k").lock_key))
+        self.assertTrue(gate.try_acquire())
+        with self.assertRaises(Overloaded):
+            single_flight("k", lambda: 42, lambda: None, gate=gate)
+        self.assertIsNone(cache.get(Flight("k").lock_key))
+        gate.release()
+
+    def test_gate(self):
+        gate = ConcurrencyGate(2)
+        self.assertTrue(gate.try_acquire())
+        self.assertTrue(gate.try_acquire())
+        self.assertFalse(gate.try_acquire())
+        self.assertEqual(singleflight.get_metrics()["rejected"], 1)
+        gate.release()
+        self.assertTrue(gate.try_acquire())
+
+    def test_gated_response_releases_on_close(self):
+        gate, flight = ConcurrencyGate(1), Flight("k")
+        flight.lead()
+        self.assertTrue(gate.try_acquire())
+        # 스트림을 읽기 전에 닫혀도 자리와 락을 반납한다
+        response = GatedStreamingHttpResponse(iter([b"data"]), gate=gate, flight=flight)
+        response.close()
+        response.close()  # 두 번 닫혀도 자리를 두 번 반납하지 않는다
+        self.assertIsNone(cache.get(flight.lock_key))
+        self.assertTrue(gate.try_acquire())
+        self.assertFalse(gate.try_acquire())
+
+    def test_overloaded_response(self):
+        response = overloaded_response()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], str(singleflight.RETRY_AFTER))
+
+
+class _FailingBackend:
+    def __init__(self, error):
+        self.error = error
+
+    def complete(self, messages, model, timeout, purpose=None, **params):
+        raise self.error
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_state_transitions(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+        # reset_seconds가 지나면 반열림: 시험 호출 하나만 통과
+        breaker._opened_at -= 30
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()  # 시험 호출 실패 → 다시 열림
+        self.assertEqual(breaker.state, "open")
+        breaker._opened_at -= 30
+        self.assertTrue(breaker.allow())
+        breaker.record_success()  # 시험 호출 성공 → 닫힘
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+    def test_release_lets_the_next_call_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.release()
+        self.assertTrue(breaker.allow())
+
+    def test_unexpected_error_releases_the_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+        client = LLMClient(backend=_FailingBackend(ValueError("bad payload")), max_retries=0, breaker=breaker)
+        with self.assertRaises(ValueError):
+            client.complete([{"role": "user", "content": "x"}])
+        self.assertFalse(breaker._probing)
+        self.assertEqual(client.stats["failed"], 1)
+        # 시험 호출이 풀렸으므로 다음 호출이 LLMUnavailable 없이 다시 시험한다
+        client.backend = FakeBackend()
+        client.complete([{"role": "user", "content": "x"}])
+        self.assertEqual(breaker.state, "closed")
+
+    def test_transient_errors_open_the_circuit(self):
+        client = LLMClient(
+            backend=_FailingBackend(openai.error.Timeout("slow")), max_retries=0,
+            breaker=CircuitBreaker(failure_threshold=1, reset_seconds=30),
+        )
+        with self.assertRaises(LLMError):
+            client.complete([{"role": "user", "content": "x"}])
+        with self.assertRaises(LLMUnavailable):
+            client.complete([{"role": "user", "content": "x"}])
+        self.assertEqual(client.stats["short_circuited"], 1)
+
+
+class SyncUrlTests(TestCase):
+    def _sync_raw(self, item):
+        command = SyncCommand()
+        command.hashed_fields = SCHOLARSHIP_COPY_FIELDS + ["url"]
+        command.raw_url_field = "url"
+        writer = BulkUpserter(
+            RawScholarship, update_fields=command.hashed_fields + ["content_hash"], fingerprint_field="content_hash",
+            track_keys=True, prepare=command.preserve_raw_urls,
+        )
+        command.add_raw_item(writer, item, "url")
+        return writer.close()
+
+    def test_missing_homepage_keeps_stored_url(self):
+        item = {"상품명": "테스트 장학금", "운영기관명": "테스트재단", "학자금유형구분": "성적우수"}
+        self._sync_raw({**item, "홈페이지": "www.example.com"})
+        writer = self._sync_raw(item)
+        self.assertEqual(RawScholarship.objects.get().url, "https://www.example.com")
+        self.assertEqual(writer.unchanged_keys, ["테스트 장학금_테스트재단"])
+
+        writer = self._sync_raw({**item, "홈페이지": "https://new.example.com"})
+        self.assertEqual(RawScholarship.objects.get().url, "https://new.example.com")
+        self.assertEqual(writer.updated_keys, ["테스트 장학금_테스트재단"])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BenchmarkScoringTests(TestCase):
+    def test_live_refuses_empty_catalog(self):
+        bump_catalog_version()
+        with self.assertRaises(CommandError):
+            call_command("benchmark_scoring", live=True, users=1)
+
+
+class CohortKeyTests(SimpleTestCase):
+    def profile(self, **values):
+        base = dict(region="서울특별시", university_type="4년제(5~6년제포함)", major_field="공학계열", semester="3학기")
+        return UserScholarship(**{**base, **values})
+
+    def test_prompt_fields_split_cohorts(self):
+        # 프롬프트에 들어가는 학기/추가 정보가 다르면 사전 계산 결과를 공유하지 않는다
+        base = cohort_key(self.profile())
+        self.assertNotEqual(cohort_key(self.profile(semester="5학기")), base)
+        self.assertNotEqual(cohort_key(self.profile(additional_info="장애인 가구")), base)
+        self.assertEqual(cohort_key(self.profile(additional_info="  ")), base)
+        self.assertEqual(
+            cohort_key(self.profile(additional_info="장애인  가구\n")), cohort_key(self.profile(additional_info="장애인 가구"))
+        )
+
+    def test_features_rebuild_the_profile(self):
+        # precompute_recommendations는 코호트 특성으로 대표 프로필을 만든다
+        features = cohort_features(self.profile(additional_info="장애인 가구"))
+        rebuilt = UserScholarship(**{k: v for k, v in features.items() if v is not None})
+        self.assertEqual(rebuilt.semester, "3학기")
+        self.assertEqual(rebuilt.additional_info, "장애인 가구")
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CatalogVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_version_survives_cache_flush(self):
+        version = bump_catalog_version()
+        cache.clear()
+        self.assertEqual(get_catalog_version(), version)
+        self.assertEqual(bump_catalog_version(), version + 1)
+
+    def test_single_changes_are_batched(self):
+        version = get_catalog_version()
+        note_catalog_change()
+        note_catalog_change()
+        self.assertEqual(get_catalog_version(), version)
+        self.assertEqual(flush_catalog_changes(), version + 1)
+        self.assertIsNone(flush_catalog_changes())
+        self.assertEqual(get_catalog_version(), version + 1)
+
+
+class RegionResolverTests(SimpleTestCase):
+    resolver = RegionResolver()
+
+    def assertResolves(self, cases):
+        for text, expected in cases.items():
+            self.assertEqual(self.resolver.resolve(text).regions, expected, text)
+
+    def test_simple_names(self):
+        self.assertResolves({
+            "서울": "서울특별시",
+            "충남, 대전": "충청남도,대전광역시",
+            "경기도 수원시": "경기도 수원시",
+            "경기 광주": "경기도 광주시",
+            "광주": "광주광역시",
+            "충청남북도": "충청남도,충청북도",
+        })
+
+    def test_region_groups(self):
+        self.assertResolves({
+            "수도권 소재 대학 재학생": "서울특별시,인천광역시,경기도",
+            "영남권 대학": "부산광역시,대구광역시,울산광역시,경상북도,경상남도",
+            "호남권": "광주광역시,전라북도,전라남도",
+            "부울경 지역 고교 졸업자": "부산광역시,울산광역시,경상남도",
+        })
+
+    def test_nationwide(self):
+        self.assertResolves({
+            "": NATIONWIDE,
+            "해당없음": NATIONWIDE,
+            "지역 제한 없음": NATIONWIDE,
+            "성적우수자": NATIONWIDE,
+        })
+
+    def test_unresolved_goes_to_gpt(self):
+        for text in ("농어촌 지역", "도서벽지 거주자", "지방 소재 대학", "비수도권 대학", "서울 제외 전국", "서울대학교 재학생", "관내 거주자"):
+            self.assertIsNone(self.resolver.resolve(text).regions, text)
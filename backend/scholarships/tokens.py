@@ -0,0 +1,41 @@
+# scholarships/tokens.py
+"""
+프롬프트 토큰 수 추정.
+
+tiktoken이 설치되어 있으면 실제 토크나이저로 세고, 없으면 UTF-8 바이트 수 기반 근사치를 사용합니다.
+(한글은 글자당 3바이트 ≒ 1토큰이라 근사치는 약간 크게 잡히는 쪽이며, 예산 계산에는 그 편이 안전합니다.)
+"""
+import math
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성
+    tiktoken = None
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text.encode("utf-8")) / 3)
+
+
+def count_message_tokens(messages, model: str = "gpt-4o") -> int:
+    """ChatCompletion messages 전체의 토큰 수 (메시지당 포맷 오버헤드 4토큰 포함)."""
+    return sum(count_tokens(m.get("content") or "", model) + 4 for m in messages) + 2
@@ -6,7 +6,8 @@ from .views import (
     AddToWishlistFromAPI,
     remove_from_wishlist,  
     MyCalendarView,
-    get_recommended_scholarships_api
+    get_recommended_scholarships_api,
+    stream_recommended_scholarships_api,
 )
 
 urlpatterns = [
@@ -17,4 +18,5 @@ urlpatterns = [
     path('wishlist/delete/<int:pk>/', remove_from_wishlist, name='wishlist-delete'),
     path("calendar/", MyCalendarView.as_view(), name="my-calendar"),
     path('recommendation/', get_recommended_scholarships_api, name='recommend-scholarships-api'),
+    path('recommendation/stream/', stream_recommended_scholarships_api, name='recommend-scholarships-stream'),
 ]
\ No newline at end of file
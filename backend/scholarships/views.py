@@ -1,16 +1,19 @@
 # scholarships/views.py
+import json
 from datetime import datetime, date
-from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.dateparse import parse_date
 from django.forms.models import model_to_dict
+from django.db import transaction
 from django.db.models import Q
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 
 from .models import Scholarship, Wishlist, RawScholarship
 from .serializers import (
@@ -20,12 +23,27 @@ from .serializers import (
     RawScholarshipSerializer,
 )
 from userinfor.models import UserScholarship
-from .recommendation import recommend
+from .recommendation import MODE_FAST, MODE_GPT, RECOMMENDATION_MODES, recommend_stream, recommend_with_reasons
+from .tasks import process_scholarship_region
+from .region_cache import apply_residency_text_hash
+from .recommendation_cache import (
+    get_cached_recommendations,
+    set_cached_recommendations,
+    get_precomputed_recommendations,
+    recommendation_cache_key,
+)
+from .singleflight import (
+    OVERLOADED_MESSAGE,
+    Flight,
+    GatedStreamingHttpResponse,
+    Overloaded,
+    llm_view_gate,
+    overloaded_response,
+    single_flight,
+)
 
 import re
 from urllib.parse import urlparse
-import openai
-openai.api_key = settings.OPENAI_API_KEY
 
 
 # -------------------- 유틸: URL 정규화/추출 --------------------
@@ -105,37 +123,6 @@ def _resolve_url_from_product_id(pid: str | int) -> str | None:
 # -------------------------------------------------------------
 
 
-def get_processed_region_from_text(text: str) -> str:
-    """주어진 텍스트를 GPT로 분석하여 정형화된 지역명을 반환합니다."""
-    if not text or text.strip().lower() in ["", "해당없음"]:
-        return "전국"
-
-    if not openai.api_key:
-        print("경고: OpenAI API 키가 설정되지 않아 지역 처리를 건너뜁니다.")
-        return ""
-
-    system_prompt = """
-    당신은 한국 행정구역 전문가이며, 장학금 공고문에서 지역 조건을 분석하는 AI입니다.
-    주어진 텍스트에서 해당하는 모든 지역명을 '특별시/광역시/도' 뿐만 아니라 '시/군/구' 단위까지 포함하여, **가장 구체적인 전체 경로(full path)로** 쉼표(,)로 구분된 단일 문자열로 반환하세요.
-    지역이 명시되지 않으면 '전국'으로.
-    """
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text},
-            ],
-            temperature=0.0,
-            timeout=15,
-        )
-        result = response.choices[0].message["content"].strip()
-        return result.split("\n")[0]
-    except Exception as e:
-        print(f"오류: GPT 지역 처리 중 오류 발생 - {e}")
-        return ""
-
-
 # ======================= 리스트(전체 장학금) =======================
 class ScholarshipListView(APIView):
     permission_classes = [AllowAny]
@@ -212,6 +199,18 @@ class UserWishlistAPIView(APIView):
         return Response(WishlistSerializer(items, many=True).data)
 
 
+def enqueue_region_processing(scholarship_id: int):
+    """브로커에 연결할 수 없어도 요청은 실패시키지 않는다 (is_region_processed=False라 process_scholarship_regions가 나중에 처리)."""
+    try:
+        # 브로커 장애 시 요청이 오래 붙잡히지 않도록 발행 재시도는 짧게
+        process_scholarship_region.apply_async(
+            args=[scholarship_id],
+            retry_policy={"max_retries": 1, "interval_start": 0, "interval_step": 0.2, "interval_max": 0.2},
+        )
+    except Exception as e:
+        print(f"경고: 지역 처리 작업 등록 실패 (장학금 {scholarship_id}) - {e}")
+
+
 class AddToWishlistFromAPI(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -251,6 +250,7 @@ class AddToWishlistFromAPI(APIView):
             scholarship.support_details = data.get("support_details", "")
             scholarship.specific_qualification_details = data.get("specific_qualification_details", "")
             scholarship.residency_requirement_details = residency_text
+            apply_residency_text_hash(scholarship)
             scholarship.selection_method_details = (
                 data.get("selection_method_details", "") or data.get("선발방법 상세내용", "")
             )
@@ -284,14 +284,12 @@ class AddToWishlistFromAPI(APIView):
                     scholarship.url = u
                     break
 
-            try:
-                processed_region = get_processed_region_from_text(residency_text)
-            except Exception:
-                processed_region = ""
-            scholarship.region = processed_region
-            scholarship.is_region_processed = True
+            # 지역 정형화(GPT 호출 가능)는 요청 경로에서 하지 않고 Celery 작업으로 넘긴다
+            scholarship.region = ""
+            scholarship.is_region_processed = False
 
             scholarship.save()
+            transaction.on_commit(lambda: enqueue_region_processing(scholarship.id))
 
         wishlist, created_w = Wishlist.objects.get_or_create(user=request.user, scholarship=scholarship)
         return Response({"status": "added" if created_w else "exists"}, status=status.HTTP_200_OK)
@@ -317,6 +315,55 @@ class MyCalendarView(APIView):
         return Response(serializer.data)
 
 
+def _serialize_recommendations(rec) -> list:
+    """recommend() 결과를 응답용 dict 목록으로 바꾸고 URL을 채운다."""
+    # (1) 추천 결과가 product_id들의 리스트/이터러블인 경우
+    try:
+        if rec and all(isinstance(x, (str, int)) for x in rec):
+            qs = Scholarship.objects.filter(product_id__in=rec)
+            data = ScholarshipSerializer(qs, many=True).data
+            for d in data:
+                # 1차: 직렬화 값/내부키에서 추출
+                d["url"] = _extract_url(d) or d.get("url") or None
+                # 2차: 비어있으면 RawScholarship에서 폴백
+                if not d.get("url"):
+                    d["url"] = _resolve_url_from_product_id(d.get("product_id"))
+            return [dict(d) for d in data]
+    except Exception:
+        # 형태 판별 실패 시 아래 일반 경로로 진행
+        pass
+
+    # (2) 모델/딕셔너리 혼합 목록
+    out = []
+    for row in (rec or []):
+        # 직렬화
+        if hasattr(row, "_meta"):  # Django 모델
+            try:
+                d = ScholarshipSerializer(row).data if isinstance(row, Scholarship) else model_to_dict(row)
+            except Exception:
+                d = model_to_dict(row)
+        elif isinstance(row, dict):
+            d = dict(row)
+        else:
+            d = {"name": str(row)}
+
+        # URL 주입: 추출 → 폴백(RawScholarship) → 기존값
+        d["url"] = _extract_url(row) or _extract_url(d) or d.get("url") or None
+        if not d.get("url"):
+            d["url"] = _resolve_url_from_product_id(d.get("product_id"))
+
+        out.append(dict(d))
+    return out
+
+
+def _serialize_with_reasons(result: dict) -> list:
+    """final_recommendations / 스트리밍 done 결과 → 응답용 dict 목록 (항목마다 reason 포함)."""
+    out = _serialize_recommendations(result["scholarships"])
+    for d in out:
+        d["reason"] = result["reasons"].get(d.get("product_id"), "")
+    return out
+
+
 # ======================= 추천 장학금(API) =======================
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -335,47 +382,54 @@ def get_recommended_scholarships_api(request):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        rec = recommend(request.user.id)
+        mode = request.query_params.get("mode") or MODE_GPT
+        if mode not in RECOMMENDATION_MODES:
+            return Response({"error": f"mode는 {', '.join(RECOMMENDATION_MODES)} 중 하나여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 빠른 모드: GPT 없이 점수 순 + 템플릿 사유 (캐시/게이트 없이 바로 계산)
+        if mode == MODE_FAST:
+            result = recommend_with_reasons(user_profile, MODE_FAST)
+            out = _serialize_with_reasons(result)
+            print(f"DEBUG: 빠른 모드 추천 장학금 개수: {len(out)}")
+            return Response({"scholarships": out, "cached": False, "cache_age": 0, "mode": MODE_FAST, "fallback": False}, status=status.HTTP_200_OK)
+
+        # 프로필·카탈로그가 그대로면 이전 추천 결과를 그대로 돌려준다 (GPT 호출 생략)
+        cached = get_cached_recommendations(user_profile)
+        if cached is not None:
+            out, age = cached
+            print(f"DEBUG: 추천 캐시 적중 ({age}s 전 계산), 장학금 개수: {len(out)}")
+            return Response({"scholarships": out, "cached": True, "cache_age": age, "mode": MODE_GPT, "fallback": False}, status=status.HTTP_200_OK)
+
+        # 야간 배치(precompute_recommendations)가 같은 코호트로 계산해 둔 결과
+        precomputed = get_precomputed_recommendations(user_profile)
+        if precomputed is not None:
+            out, age = precomputed
+            print(f"DEBUG: 사전 계산 결과 사용 ({age}s 전 계산), 장학금 개수: {len(out)}")
+            return Response({"scholarships": out, "cached": True, "cache_age": age, "mode": MODE_GPT, "fallback": False}, status=status.HTTP_200_OK)
+
+        def compute():
+            result = recommend_with_reasons(user_profile)
+            out = _serialize_with_reasons(result)
+            if not result["fallback"]:
+                set_cached_recommendations(user_profile, out)
+            return {"scholarships": out, "cached": False, "cache_age": 0, "mode": result["mode"], "fallback": result["fallback"]}
+
+        def read_cached():
+            cached = get_cached_recommendations(user_profile)
+            if cached is None:
+                return None
+            return {"scholarships": cached[0], "cached": True, "cache_age": cached[1], "mode": MODE_GPT, "fallback": False}
 
-        # (1) 추천 결과가 product_id들의 리스트/이터러블인 경우
+        # 같은 계산(더블 클릭, 재시도)이 진행 중이면 게이트 자리 없이 그 결과를 기다렸다가 함께 쓴다.
+        # 계산을 맡은 요청만 워커당 동시 처리 상한(게이트)을 보고, 넘으면 줄 세우지 않고 503
         try:
-            if rec and all(isinstance(x, (str, int)) for x in rec):
-                qs = Scholarship.objects.filter(product_id__in=rec)
-                data = ScholarshipSerializer(qs, many=True).data
-                for d in data:
-                    # 1차: 직렬화 값/내부키에서 추출
-                    d["url"] = _extract_url(d) or d.get("url") or None
-                    # 2차: 비어있으면 RawScholarship에서 폴백
-                    if not d.get("url"):
-                        d["url"] = _resolve_url_from_product_id(d.get("product_id"))
-                return Response({"scholarships": data}, status=status.HTTP_200_OK)
-        except Exception:
-            # 형태 판별 실패 시 아래 일반 경로로 진행
-            pass
-
-        # (2) 모델/딕셔너리 혼합 목록
-        out = []
-        for row in (rec or []):
-            # 직렬화
-            if hasattr(row, "_meta"):  # Django 모델
-                try:
-                    d = ScholarshipSerializer(row).data if isinstance(row, Scholarship) else model_to_dict(row)
-                except Exception:
-                    d = model_to_dict(row)
-            elif isinstance(row, dict):
-                d = dict(row)
-            else:
-                d = {"name": str(row)}
-
-            # URL 주입: 추출 → 폴백(RawScholarship) → 기존값
-            d["url"] = _extract_url(row) or _extract_url(d) or d.get("url") or None
-            if not d.get("url"):
-                d["url"] = _resolve_url_from_product_id(d.get("product_id"))
-
-            out.append(d)
-
-        print(f"DEBUG: 추천 장학금 개수: {len(out)}")
-        return Response({"scholarships": out}, status=status.HTTP_200_OK)
+            payload = single_flight(recommendation_cache_key(user_profile), compute, read_cached, gate=llm_view_gate)
+        except Overloaded:
+            print("DEBUG: GPT 추천 동시 처리 상한 초과 → 503")
+            return overloaded_response()
+
+        print(f"DEBUG: 추천 장학금 개수: {len(payload['scholarships'])} (모드: {payload['mode']})")
+        return Response(payload, status=status.HTTP_200_OK)
 
     except Exception as e:
         import traceback
@@ -385,3 +439,123 @@ def get_recommended_scholarships_api(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
+
+# ======================= 추천 장학금(SSE 스트리밍) =======================
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Accept: text/event-stream(EventSource)으로 온 요청이 406이 되지 않도록 하는 렌더러.
+    스트림 본문은 StreamingHttpResponse가 직접 쓰므로, 여기서는 404/400/503 같은 오류 응답만 SSE error 이벤트로 바꾼다.
+    """
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return _sse("error", data).encode(self.charset)
+
+
+def _stream_events(user_profile, mode: str):
+    """recommend_stream 이벤트 → SSE 문자열. 오류는 error 이벤트로 보낸다."""
+    try:
+        for event, data in recommend_stream(user_profile, mode):
+            if event == "candidates":
+                yield _sse(event, {"scholarships": _serialize_recommendations(data)})
+            elif event == "token":
+                yield _sse(event, {"text": data})
+            elif event == "recommendation":
+                scholarship = _serialize_recommendations([data["scholarship"]])[0]
+                yield _sse(event, {"rank": data["rank"], "scholarship": scholarship, "reason": data["reason"]})
+            elif event == "done":
+                out = _serialize_with_reasons(data)
+                if data["mode"] == MODE_GPT and not data["fallback"]:
+                    set_cached_recommendations(user_profile, out)
+                yield _sse(event, {"scholarships": out, "fallback": data["fallback"], "cached": False, "cache_age": 0, "mode": data["mode"]})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield _sse("error", {"error": f"장학금 추천 중 오류가 발생했습니다. 다시 시도해 주세요. ({e})"})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def stream_recommended_scholarships_api(request):
+    """
+    추천 결과를 Server-Sent Events로 보낸다.
+    점수 순 후보(candidates)를 DB 조회 직후 바로 보내고, GPT 응답 조각(token)과 완성된 추천(recommendation)을
+    도착하는 대로 보낸 뒤 최종 목록(done)으로 끝난다. 캐시가 있으면 done 하나만 보낸다.
+    """
+    try:
+        user_profile = UserScholarship.objects.get(user=request.user)
+    except UserScholarship.DoesNotExist:
+        return Response(
+            {"error": "사용자 프로필을 찾을 수 없습니다. 장학금 추천을 위해 프로필을 먼저 작성해주세요."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    mode = request.query_params.get("mode") or MODE_GPT
+    if mode not in RECOMMENDATION_MODES:
+        return Response({"error": f"mode는 {', '.join(RECOMMENDATION_MODES)} 중 하나여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    cached = None
+    if mode == MODE_GPT:
+        cached = get_cached_recommendations(user_profile) or get_precomputed_recommendations(user_profile)
+    # 같은 계산(재연결, 다른 탭)이 진행 중이면 합류한다. 계산을 맡은(락을 잡은) 스트림만 게이트 자리를 잡고,
+    # 자리와 락은 응답이 닫힐 때 반납한다. 합류한 스트림은 자리 없이 결과를 기다린다.
+    flight = None
+    if mode == MODE_GPT and cached is None:
+        flight = Flight(recommendation_cache_key(user_profile))
+        if flight.lead() and not llm_view_gate.try_acquire():
+            flight.done()
+            print("DEBUG: GPT 추천 동시 처리 상한 초과 → 503")
+            return overloaded_response()
+
+    def events():
+        if cached is not None:
+            out, age = cached
+            yield _sse("done", {"scholarships": out, "fallback": False, "cached": True, "cache_age": age, "mode": MODE_GPT})
+            return
+        if flight is None:  # 빠른 모드
+            yield from _stream_events(user_profile, mode)
+            return
+        if flight.leading:
+            yield from _stream_events(user_profile, mode)
+            return
+        waited = flight.wait(lambda: get_cached_recommendations(user_profile))
+        if waited is None and not flight.lead():
+            # 넘겨받으려는 사이 다른 요청이 먼저 락을 잡았다 → 그 계산을 한 번 더 기다리고, 그래도 없으면 에러
+            waited = flight.wait(lambda: get_cached_recommendations(user_profile))
+            if waited is None:
+                yield _sse("error", {"error": OVERLOADED_MESSAGE})
+                return
+        if waited is not None:
+            out, age = waited
+            yield _sse("done", {"scholarships": out, "fallback": False, "cached": True, "cache_age": age, "mode": MODE_GPT})
+            return
+        # 먼저 계산하던 요청이 결과를 남기지 못해 넘겨받았다 (이때는 자리를 잡아야 계산)
+        try:
+            if not llm_view_gate.try_acquire():
+                yield _sse("error", {"error": OVERLOADED_MESSAGE})
+                return
+            try:
+                yield from _stream_events(user_profile, mode)
+            finally:
+                llm_view_gate.release()
+        finally:
+            flight.done()
+
+    if flight is not None and flight.leading:
+        response = GatedStreamingHttpResponse(
+            events(), gate=llm_view_gate, flight=flight, content_type="text/event-stream; charset=utf-8"
+        )
+    else:
+        response = StreamingHttpResponse(events(), content_type="text/event-stream; charset=utf-8")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx가 응답을 모았다가 보내지 않도록
+    return response
@@ -6,6 +6,7 @@ from rest_framework import status
 from .models import UserScholarship
 from django.contrib.auth.models import User
 from django.utils.dateparse import parse_date # parse_date 임포트
+from scholarships.recommendation_cache import recommendation_cache_key, evict_cached_recommendations
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -107,12 +108,16 @@ def save_scholarship_info(request):
         if "is_national_merit" in data: update_fields["is_national_merit"] = data["is_national_merit"]
         elif "national_merit" in data: update_fields["is_national_merit"] = data["national_merit"] # 하위 호환성
         
+        # 변경 전 프로필 기준의 추천 캐시 키 (저장 후 지운다)
+        previous_cache_key = recommendation_cache_key(scholarship_info)
+
         # UserScholarship 객체에 업데이트할 필드들을 적용
         for field, value in update_fields.items():
             setattr(scholarship_info, field, value)
 
         scholarship_info.save()
         print(f"DEBUG: [save_scholarship_info] UserScholarship 객체 저장 완료.")
+        evict_cached_recommendations(previous_cache_key)
 
         # 업데이트된 데이터를 to_dict()를 통해 반환
         return Response(scholarship_info.to_dict(), status=status.HTTP_200_OK)